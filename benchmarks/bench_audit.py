@@ -0,0 +1,88 @@
+# cameraApertureFix - scene audit benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Times cameraApertureFix.audit on a fake scene of referenced cameras, with
+# the catalog optionally extended to thousands of presets, and reports the
+# traced memory peak of classifying the filmbacks in a second pass.
+#
+#   python benchmarks/bench_audit.py --cameras 5000 --presets 5000 --latency 0.0005
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import audit, engine
+from cameraApertureFix.catalog import get_catalog, reload_catalog
+
+
+def extend_catalog(directory, preset_count):
+    rng = random.Random(1)
+    extra = {f"Bench Gate {i}": {"horizontal": rng.uniform(5.0, 70.0), "vertical": rng.uniform(4.0, 50.0)}
+             for i in range(max(preset_count - len(get_catalog()), 0))}
+    path = os.path.join(directory, "bench_presets.json")
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(extra, stream)
+    reload_catalog([path])
+
+
+def build_scene(camera_count):
+    names, index, horizontal, vertical = engine.preset_table()
+    rng = random.Random(0)
+    for i in range(camera_count):
+        preset = rng.randrange(len(names))
+        jitter = rng.choice([0.0, 0.005, 0.1, rng.uniform(0.0, 0.1)])
+        fake.add_camera(f"|shot{i // 100:03d}:cam|shot{i // 100:03d}:camShape{i}",
+                        hfa=horizontal[preset] + jitter, vfa=vertical[preset], focal_length=rng.uniform(18, 85))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scene filmback audit.")
+    parser.add_argument("--cameras", type=int, default=5000)
+    parser.add_argument("--presets", type=int, default=0, help="Extend the catalog to this many presets.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    parser.add_argument("--csv", help="Also write the audit to this CSV file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.presets: extend_catalog(directory, args.presets)
+    build_scene(args.cameras)
+    fake.latency = args.latency
+    start = time.perf_counter()
+    rows = audit.audit_scene(sort_by="status")
+    elapsed = time.perf_counter() - start
+    if args.csv: audit.write_csv(rows, args.csv)
+
+    counts = {}
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + 1
+    print(f"{len(rows)} cameras audited in {elapsed * 1000.0:.1f} ms, {fake.total_calls()} cmds calls")
+    print(", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+    hfa = np.array([row.hfa for row in rows])
+    vfa = np.array([row.vfa for row in rows])
+    tracemalloc.start()
+    engine.classify_filmbacks(hfa, vfa)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"classify_filmbacks against {len(get_catalog())} presets: {peak / 1e6:.1f} MB traced peak")
+
+
+if __name__ == "__main__":
+    main()
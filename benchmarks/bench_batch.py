@@ -0,0 +1,96 @@
+# cameraApertureFix - batch apply benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Selects a few hundred cameras on the fake cmds backend, some animated and
+# some already at the target filmback, and times the tool window's batch
+# preview and "Apply to All".
+#
+#   python benchmarks/bench_batch.py --cameras 500 --latency 0.00002
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import ui
+from cameraApertureFix.catalog import get_catalog
+
+PRESET = "Super 35mm Film"
+
+
+def find_widget(kind, label=None):
+    for widget in fake.widgets.values():
+        if widget.kind == kind and (label is None or widget.flags.get("label") == label):
+            return widget.name
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+def build_scene(camera_count, animated_every, at_target_every, key_count):
+    preset_hfa, preset_vfa = (value / 25.4 for value in get_catalog().filmback_mm(PRESET))
+    frames = np.arange(key_count, dtype=np.float64)
+    transforms = []
+    for i in range(camera_count):
+        at_target = at_target_every and i % at_target_every == 0
+        shape = fake.add_camera(f"shotCamShape{i}", hfa=preset_hfa if at_target else 1.417,
+                                vfa=preset_hfa / 1.5 if at_target else 0.945, focal_length=35.0,
+                                transform=f"shotCam{i}")
+        if animated_every and i % animated_every == 0:
+            curve = fake.add_curve(f"{shape}_focalLength", frames.tolist(), (35.0 + frames * 0.01).tolist())
+            fake.connect_curve(curve, shape + ".focalLength")
+        transforms.append(f"shotCam{i}")
+    fake.select(*transforms)
+    return preset_vfa
+
+
+def batch_summary():
+    for widget in fake.widgets.values():
+        if widget.kind == "text" and " cameras: " in str(widget.flags.get("label")):
+            return widget.flags["label"]
+
+
+def step(label, action):
+    fake.reset_calls()
+    start = time.perf_counter()
+    action()
+    fake.process_idle()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {fake.total_calls():6d} cmds calls {elapsed * 1000.0:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-camera batch apply.")
+    parser.add_argument("--cameras", type=int, default=500)
+    parser.add_argument("--animated-every", type=int, default=4, help="Every Nth camera has a focal curve.")
+    parser.add_argument("--at-target-every", type=int, default=5, help="Every Nth camera already matches.")
+    parser.add_argument("--keys", type=int, default=240)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    args = parser.parse_args()
+
+    build_scene(args.cameras, args.animated_every, args.at_target_every, args.keys)
+    ui.create_camera_tool_ui()
+    fake.process_idle()
+    fake.latency = args.latency
+
+    step("expand batch", lambda: fake.widgets[find_widget("frameLayout")].flags["expandCommand"]())
+    step("load cameras", lambda: fake.trigger(find_widget("button", "Load Cameras")))
+    step("preset", lambda: fake.trigger(find_widget("textScrollList"), PRESET))
+    print(batch_summary())
+    step("apply to all", lambda: fake.trigger(find_widget("button", "Apply to All")))
+    print(batch_summary())
+    step("apply again", lambda: fake.trigger(find_widget("button", "Apply to All")))
+
+
+if __name__ == "__main__":
+    main()
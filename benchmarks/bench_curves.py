@@ -0,0 +1,111 @@
+# cameraApertureFix - focal curve retargeting benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Compares cmds.scaleKey against cameraApertureFix.curves on synthetic
+# 100k-key focal curves, using the fake cmds backend. Keys mix fixed, auto and
+# spline tangents in blocks of 1,000 keys. As in Maya, scaleKey keeps every
+# tangent type and editing a tangent's angle or weight makes it fixed, so
+# besides the values the comparison checks that no tangent type changed and
+# that fixed tangents ended up with the same angles and weights.
+#
+#   python benchmarks/bench_curves.py --keys 100000 --cameras 8 --latency 0.0005
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import curves
+
+
+TANGENT_TYPES = ["fixed", "auto", "spline", "fixed", "fixed"]
+
+
+def build_scene(camera_count, key_count, weighted, shared):
+    fake.attrs.clear(); fake.curves.clear(); fake.connections.clear()
+    frames = np.arange(key_count, dtype=np.float64)
+    shapes = []
+    for i in range(camera_count):
+        shape = fake.add_camera(f"shotCamShape{i}")
+        curve_index = 0 if shared else i
+        curve = f"shotCamShape{curve_index}_focalLength"
+        if curve not in fake.curves:
+            values = 35.0 + 5.0 * np.sin(frames * 0.01 + i)
+            fake.add_curve(curve, frames.tolist(), values.tolist(), weighted=weighted)
+            fake.curves[curve].in_angle = [10.0] * key_count
+            fake.curves[curve].out_angle = [10.0] * key_count
+            fake.curves[curve].in_type = [TANGENT_TYPES[k // 1000 % 5] for k in range(key_count)]
+            fake.curves[curve].out_type = [TANGENT_TYPES[(k + 500) // 1000 % 5] for k in range(key_count)]
+        fake.connect_curve(curve, shape + ".focalLength")
+        shapes.append(shape)
+    return shapes
+
+
+def run_scale_key(shapes, scale):
+    for shape in shapes:
+        anim_curves = fake.listConnections(shape + ".focalLength", type="animCurve", scn=True)
+        if anim_curves: fake.scaleKey(anim_curves, valueScale=scale, valuePivot=0)
+
+
+def run_bulk(shapes, scale):
+    curves.retarget_focal_curves(shapes, [scale] * len(shapes))
+
+
+def measure(label, func, shapes, scale):
+    fake.reset_calls()
+    start = time.perf_counter()
+    func(shapes, scale)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed * 1000.0:10.1f} ms {fake.total_calls():8d} cmds calls")
+    return {name: {"values": np.array(curve.values), "types": curve.in_type + curve.out_type,
+                   "fixed": np.array(curve.in_type + curve.out_type) == "fixed",
+                   "angles": np.array(curve.in_angle + curve.out_angle),
+                   "weights": np.array(curve.in_weight + curve.out_weight)}
+            for name, curve in fake.curves.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark focal curve retargeting against cmds.scaleKey.")
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    parser.add_argument("--weighted", action="store_true", help="Use weighted, fixed tangents.")
+    parser.add_argument("--shared", action="store_true", help="All cameras share one focal curve.")
+    args = parser.parse_args()
+
+    fake.latency = args.latency
+    scale = 0.7
+    print(f"{args.cameras} cameras x {args.keys} keys, latency {args.latency * 1000.0:.2f} ms/call")
+
+    shapes = build_scene(args.cameras, args.keys, args.weighted, args.shared)
+    expected = measure("scaleKey", run_scale_key, shapes, scale)
+    shapes = build_scene(args.cameras, args.keys, args.weighted, args.shared)
+    result = measure("bulk", run_bulk, shapes, scale)
+
+    if args.shared:
+        print("note: scaleKey scales a shared curve once per camera; bulk scales it once.")
+    else:
+        worst = max(np.max(np.abs(expected[c]["values"] - result[c]["values"])) for c in expected)
+        print(f"max value difference: {worst:.3g}")
+        changed_types = sum(sum(a != b for a, b in zip(expected[c]["types"], result[c]["types"])) for c in expected)
+        print(f"tangent types changed: {changed_types}")
+        worst_tangent = max(max(np.max(np.abs(expected[c][column] - result[c][column])[expected[c]["fixed"]],
+                                       initial=0.0) for column in ("angles", "weights")) for c in expected)
+        print(f"max fixed tangent difference: {worst_tangent:.3g}")
+        if worst > 1e-9 or changed_types or worst_tangent > 1e-9: sys.exit("Bulk retargeting differs from scaleKey.")
+
+
+if __name__ == "__main__":
+    main()
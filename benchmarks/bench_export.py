@@ -0,0 +1,87 @@
+# cameraApertureFix - per-frame export benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Exports cameras with keyed apertures and focal length over a long shot to
+# JSON Lines and .chan files on the fake cmds backend. Reports throughput,
+# the peak memory traced during a second, untimed export, and checks the
+# first exported frame against the engine's field of view.
+#
+#   python benchmarks/bench_export.py --frames 100000 --cameras 4 --threads 4
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import engine, export
+
+
+def build_scene(camera_count, frame_count):
+    frames = np.arange(1, frame_count + 1, dtype=np.float64)
+    fake.playback_range = (1.0, float(frame_count))
+    shapes = []
+    for i in range(camera_count):
+        shape = fake.add_camera(f"shotCamShape{i}", transform=f"shotCam{i}")
+        for attr, values in (("horizontalFilmAperture", 1.417 + 0.01 * np.sin(frames / 300.0 + i)),
+                             ("focalLength", 35.0 + 15.0 * frames / frame_count)):
+            fake.connect_curve(fake.add_curve(f"{shape}_{attr}", frames.tolist(), values.tolist()),
+                               f"{shape}.{attr}")
+        shapes.append(shape)
+    return shapes
+
+
+def timed(label, frame_count, camera_count, func):
+    """Run func twice: once timed, once under tracemalloc, which slows allocation-heavy code down."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frames = frame_count * camera_count
+    print(f"{label:<28} {elapsed:7.2f} s  {frames / elapsed:10.0f} frames/s  peak {peak / 1e6:6.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time streaming per-frame camera export.")
+    parser.add_argument("--frames", type=int, default=100000)
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    shapes = build_scene(args.cameras, args.frames)
+    with tempfile.TemporaryDirectory() as directory:
+        single = os.path.join(directory, "single.jsonl")
+        timed("one camera, jsonl", args.frames, 1, lambda: export.export_camera(shapes[0], single))
+        for fmt in export.FORMATS:
+            paths = timed(f"{args.cameras} cameras, {fmt}, {args.threads} threads", args.frames, args.cameras,
+                          lambda: export.export_cameras(shapes, directory, fmt, threads=args.threads))
+        print(f"{os.path.getsize(paths[0]) / 1e6:.1f} MB per .chan file")
+
+        with open(single) as stream:
+            first = json.loads(stream.readline())
+        expected = float(engine.field_of_view(fake.curves[f"{shapes[0]}_horizontalFilmAperture"].values[0],
+                                              fake.curves[f"{shapes[0]}_focalLength"].values[0]))
+        if abs(first["hfov"] - expected) > 1e-6:
+            sys.exit(f"Exported hfov {first['hfov']} does not match {expected}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# cameraApertureFix - frame-range FOV preservation benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Builds a camera whose horizontal aperture and focal length are both keyed on
+# every frame of a long shot, retimes the focal length to a static aperture
+# with and without key reduction, and checks that every frame keeps its field
+# of view (focal length / aperture). Reports cmds calls, keys written and the
+# peak memory traced during the retime.
+#
+#   python benchmarks/bench_framerange.py --frames 100000
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import framerange
+
+NEW_HFA = 1.2
+
+
+def build_camera(frame_count):
+    """Aperture breathing slowly, focal length zooming linearly, keyed on every frame."""
+    fake.reset()
+    frames = np.arange(1, frame_count + 1, dtype=np.float64)
+    shape = fake.add_camera("shotCamShape", transform="shotCam")
+    hfa = 1.417 + 0.02 * np.sin(frames / 250.0)
+    focal_length = 35.0 + 15.0 * frames / frame_count
+    fake.connect_curve(fake.add_curve("shotCamShape_hfa", frames.tolist(), hfa.tolist()),
+                       shape + ".horizontalFilmAperture")
+    fake.connect_curve(fake.add_curve("shotCamShape_fl", frames.tolist(), focal_length.tolist()),
+                       shape + ".focalLength")
+    return shape, frames, hfa, focal_length
+
+
+def run(frame_count, reduce_tolerance):
+    shape, frames, hfa, focal_length = build_camera(frame_count)
+    fake.reset_calls()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = framerange.retime_focal_length(shape, NEW_HFA, 1.0, float(frame_count),
+                                            reduce_tolerance=reduce_tolerance)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    curve = fake.curves[result.curve]
+    new_focal_length = np.interp(frames, curve.times, curve.values)
+    error = np.abs(new_focal_length / NEW_HFA - focal_length / hfa).max()
+    label = "reduced" if reduce_tolerance is not None else "every frame"
+    print(f"{label:<12} {elapsed * 1000.0:9.1f} ms  {fake.total_calls():5d} calls  {result.keys:7d} keys  "
+          f"peak {peak / 1e6:7.1f} MB (traced, includes the fake's curves)  max FOV error {error:.2e}")
+    return error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time focal length retiming over an animated film aperture.")
+    parser.add_argument("--frames", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.frames} frames, chunks of {framerange.CHUNK_FRAMES}")
+    errors = [run(args.frames, None), run(args.frames, framerange.DEFAULT_REDUCE_TOLERANCE)]
+    # Reduction may move the focal length by up to its tolerance (mm); divide by the aperture for the FOV ratio.
+    if errors[0] > 1e-9 or errors[1] > framerange.DEFAULT_REDUCE_TOLERANCE / NEW_HFA + 1e-9:
+        sys.exit("Field of view was not preserved.")
+
+
+if __name__ == "__main__":
+    main()
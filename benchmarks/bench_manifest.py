@@ -0,0 +1,64 @@
+# cameraApertureFix - manifest CLI benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Writes a synthetic camera manifest and pipes it through
+# `python -m cameraApertureFix` with different worker counts, reporting
+# records per second. No Maya or fake cmds backend is involved: the CLI
+# must not import maya.cmds, and the benchmark checks that it does not.
+#
+#   python benchmarks/bench_manifest.py --records 1000000 --processes 1 4 8
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESET = "Super 35mm Film"
+
+
+def write_manifest(path, record_count, frames_every):
+    rng = random.Random(0)
+    with open(path, "w", encoding="utf-8") as stream:
+        for i in range(record_count):
+            record = {"name": f"shotCam{i}", "hfa": 1.417 + rng.random() * 0.1, "vfa": 0.945,
+                      "fl": 35.0 + i % 50}
+            if frames_every and i % frames_every == 0:
+                record["fl_frames"] = [record["fl"] + f * 0.01 for f in range(240)]
+            stream.write(json.dumps(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure manifest conform throughput of the CLI.")
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--frames-every", type=int, default=100,
+                        help="Every Nth record carries a 240-frame fl_frames array (0: none).")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    check = subprocess.run([sys.executable, "-c", "import sys, cameraApertureFix.manifest; print('maya' in sys.modules)"],
+                           cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+    if check != "False": sys.exit("cameraApertureFix.manifest imported maya.")
+
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = os.path.join(directory, "manifest.jsonl")
+        write_manifest(manifest, args.records, args.frames_every)
+        print(f"{args.records} records, {os.path.getsize(manifest) / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+        for processes in args.processes:
+            with open(manifest, "rb") as stdin, open(os.devnull, "wb") as stdout:
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-m", "cameraApertureFix", "--preset", PRESET, "-j", str(processes)],
+                               cwd=ROOT, stdin=stdin, stdout=stdout, check=True)
+                elapsed = time.perf_counter() - start
+            print(f"-j {processes:<3} {elapsed:7.2f} s  {args.records / elapsed:10.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
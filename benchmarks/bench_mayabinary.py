@@ -0,0 +1,154 @@
+# cameraApertureFix - Maya Binary reader benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Writes synthetic .mb files, alternating 32-bit (FOR4) and 64-bit (FOR8)
+# layouts. Each holds a few cameras, one of them with a keyed focal length,
+# hundreds of other nodes and a large mesh node whose data is a sparse hole,
+# so the files are big on paper but cheap to create. Checks the decoded
+# filmbacks and keys, measures the Python heap peak of reading one file, and
+# times reading all of them with different worker counts.
+#
+#   python benchmarks/bench_mayabinary.py --files 2000 --mesh-mb 64 --keys 10000 --processes 1 8
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cameraApertureFix import mayabinary
+
+
+class Hole(int):
+    """A run of zero bytes left unwritten in the file."""
+
+
+def size_of(pieces):
+    return sum(p if isinstance(p, Hole) else len(p) for p in pieces)
+
+
+def chunk(flavour, tag, pieces):
+    layout = mayabinary.LAYOUTS[flavour]
+    size = size_of(pieces)
+    if flavour == b"FOR8":
+        header = tag + b"\0" * 4 + struct.pack(">Q", size)
+    else:
+        header = tag + struct.pack(">I", size)
+    return [header] + list(pieces) + [b"\0" * (-size % layout.align)]
+
+
+def form(flavour, form_type, children):
+    return chunk(flavour, flavour, [form_type] + [p for child in children for p in child])
+
+
+def create(flavour, name, parent=None, flags=0):
+    body = bytes([flags]) + name.encode() + b"\0" + (parent.encode() + b"\0" if parent else b"")
+    return chunk(flavour, mayabinary.CREATE_TAG, [body])
+
+
+def doubles(flavour, tag, attr, values):
+    # One flags byte between the name and the values, as Maya writes it.
+    return chunk(flavour, tag, [attr.encode() + b"\0\0" + struct.pack(f">{len(values)}d", *values)])
+
+
+def connection(flavour, src, dst):
+    return chunk(flavour, mayabinary.CONNECTION_TAG, [b"\0" + src.encode() + b"\0" + dst.encode() + b"\0"])
+
+
+def camera(flavour, name, hfa, vfa, focal_length):
+    return form(flavour, mayabinary.CAMERA_FORM, [
+        create(flavour, name + "Shape", name),
+        doubles(flavour, b"DBL2", "cap", [hfa, vfa]),
+        doubles(flavour, b"DBLE", "fl", [focal_length]),
+    ])
+
+
+def write_scene(path, flavour, index, node_count, mesh_bytes, key_count):
+    frames = np.arange(key_count, dtype=np.float64)
+    keys = np.empty(2 * key_count)
+    keys[0::2], keys[1::2] = frames, 35.0 + index % 20 + np.sin(frames * 0.01)
+    nodes = [form(flavour, b"XFRM", [create(flavour, f"group{i}"), doubles(flavour, b"DBL3", "t", [i, 0.0, 0.0])])
+             for i in range(node_count)]
+    children = [
+        form(flavour, b"HEAD", [chunk(flavour, b"VERS", [b"2024\0"])]),
+        camera(flavour, "persp", 1.41732, 0.94488, 35.0),
+        camera(flavour, "shotCam", 0.980 + index % 7 * 0.1, 0.735, 35.0),
+        camera(flavour, "witnessCam", 1.417, 0.945, 24.0 + index % 10),
+    ] + nodes + [
+        form(flavour, b"DMSH", [create(flavour, "bigMeshShape", "bigMesh"),
+                                chunk(flavour, b"DBLE", [b"pt\0\0", Hole(mesh_bytes)])]),
+        form(flavour, b"ACTU", [create(flavour, "shotCamShape_focalLength"),
+                                chunk(flavour, b"DBLE", [b"ktv\0\0", keys.astype(">f8").tobytes()])]),
+        form(flavour, mayabinary.CONNECTION_FORM, [connection(flavour, "shotCamShape_focalLength.o",
+                                                              "shotCamShape.fl")]),
+    ]
+    with open(path, "wb") as scene:
+        for piece in form(flavour, mayabinary.SCENE_FORM, children):
+            if isinstance(piece, Hole): scene.seek(piece, os.SEEK_CUR)
+            else: scene.write(piece)
+        scene.truncate()
+    return keys[1::2]
+
+
+def check(path, index, expected_values):
+    scene = mayabinary.read_scene(path)
+    shot = scene.cameras["shotCam|shotCamShape"]
+    assert abs(shot.filmback.hfa - (0.980 + index % 7 * 0.1)) < 1e-12, shot
+    assert shot.filmback.focal_curves == ("shotCamShape_focalLength",), shot
+    assert scene.cameras["persp|perspShape"].startup
+    assert scene.cameras["witnessCam|witnessCamShape"].filmback.focal_length == 24.0 + index % 10
+    times, values = scene.focal_keys["shotCamShape_focalLength"]
+    assert np.array_equal(values, expected_values) and len(times) == len(expected_values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reading cameras from Maya Binary files.")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--nodes", type=int, default=500, help="Other nodes per file.")
+    parser.add_argument("--mesh-mb", type=float, default=64.0, help="Size of the sparse mesh node per file.")
+    parser.add_argument("--keys", type=int, default=10000, help="Keys on the focal curve.")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        expected = {}
+        for i in range(args.files):
+            path = os.path.join(directory, f"shot{i:05d}.mb")
+            flavour = b"FOR8" if i % 2 else b"FOR4"
+            expected[path] = (i, write_scene(path, flavour, i, args.nodes, int(args.mesh_mb * 1e6), args.keys))
+        print(f"{args.files} files of {os.path.getsize(path) / 1e6:.1f} MB, {args.nodes} nodes, "
+              f"{args.keys} focal keys, {os.cpu_count()} CPUs")
+        for path in list(expected)[:2]:
+            check(path, *expected[path])
+
+        tracemalloc.start()
+        mayabinary.read_scene(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"heap peak reading one file: {peak / 1e6:.2f} MB (focal keys: {args.keys * 16 / 1e6:.2f} MB)")
+
+        for processes in args.processes:
+            start = time.perf_counter()
+            results = list(mayabinary.read_scenes([directory], processes))
+            elapsed = time.perf_counter() - start
+            errors = [r for r in results if r.error]
+            if errors or len(results) != args.files: sys.exit(f"Failed: {errors[:3]}")
+            print(f"-j {processes:<3} {elapsed:7.2f} s  {args.files / elapsed:8.0f} files/s")
+
+        start = time.perf_counter()
+        cameras = sum(len(mayabinary.scan_scene(p)) for p in expected)
+        elapsed = time.perf_counter() - start
+        print(f"scan_scene (no keys, -j 1) {elapsed:7.2f} s  {args.files / elapsed:8.0f} files/s, {cameras} cameras")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# cameraApertureFix - window open benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Measures time-to-interactive of the tool window on the fake cmds backend:
+# the window is interactive once it is shown and its first deferred render has
+# run. Cold opens run in a fresh interpreter (module import, first build);
+# warm opens reopen the retained window after it was closed.
+#
+#   python benchmarks/bench_open.py --runs 5 --latency 0.0005
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def cold_open(latency):
+    """Run in a fresh interpreter: import, build and show the window once."""
+    from fake_cmds import FakeCmds
+    fake = FakeCmds(latency).install()
+    fake.add_camera("shotCamShape", transform="shotCam")
+    fake.select("shotCam")
+
+    start = time.perf_counter()
+    from cameraApertureFix import ui
+    imported = time.perf_counter()
+    ui.create_camera_tool_ui()
+    shown = time.perf_counter()
+    fake.process_idle()
+    interactive = time.perf_counter()
+    return {"import": imported - start, "shown": shown - start, "interactive": interactive - start,
+            "calls": fake.total_calls()}
+
+
+def warm_opens(latency, runs):
+    from fake_cmds import FakeCmds
+    fake = FakeCmds().install()
+    fake.add_camera("shotCamShape", transform="shotCam")
+    fake.select("shotCam")
+    from cameraApertureFix import ui
+    ui.create_camera_tool_ui()
+    fake.process_idle()
+
+    fake.latency = latency
+    results = []
+    for _ in range(runs):
+        fake.widgets[ui.WINDOW_NAME].flags["visible"] = False
+        fake.reset_calls()
+        start = time.perf_counter()
+        ui.create_camera_tool_ui()
+        fake.process_idle()
+        results.append({"interactive": time.perf_counter() - start, "calls": fake.total_calls()})
+    return results
+
+
+def summarize(label, results):
+    for key in ("import", "shown", "interactive"):
+        values = [r[key] * 1000.0 for r in results if key in r]
+        if values:
+            print(f"{label:<5} {key:<12} median {statistics.median(values):8.2f} ms   min {min(values):8.2f} ms")
+    print(f"{label:<5} {'cmds calls':<12} {results[0]['calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm time-to-interactive of the tool window.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    parser.add_argument("--cold-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_child:
+        print(json.dumps(cold_open(args.latency)))
+        return
+
+    cold = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--cold-child", "--latency", str(args.latency)],
+                                check=True, capture_output=True, text=True).stdout
+        cold.append(json.loads(output.splitlines()[-1]))
+    summarize("cold", cold)
+    summarize("warm", warm_opens(args.latency, args.runs))
+
+
+if __name__ == "__main__":
+    main()
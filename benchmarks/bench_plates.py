@@ -0,0 +1,110 @@
+# cameraApertureFix - plate header detection benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Writes synthetic EXR and DPX sequences (real headers followed by sparse,
+# unwritten pixel data, so every frame is large on paper but cheap to create)
+# and times preset detection cold and cached. Then loads a camera whose image
+# plane points at the EXR sequence into the tool window on the fake cmds
+# backend and checks that the detected preset is preselected.
+#
+#   python benchmarks/bench_plates.py --frames 2000 --frame-mb 48
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+from cameraApertureFix import platemeta, ui
+
+
+def exr_attribute(name, attr_type, value):
+    return name.encode() + b"\0" + attr_type.encode() + b"\0" + struct.pack("<i", len(value)) + value
+
+
+def exr_header(camera_model, pitch_um, width, height):
+    return (platemeta.EXR_MAGIC + struct.pack("<i", 2)
+            + exr_attribute("cameraMake", "string", b"ARRI")
+            + exr_attribute("cameraModel", "string", camera_model.encode())
+            + exr_attribute("compression", "compression", b"\x00")
+            + exr_attribute("dataWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+            + exr_attribute("displayWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+            + exr_attribute("sensorAcquisitionRectangle", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+            + exr_attribute("sensorPhotositePitch", "float", struct.pack("<f", pitch_um))
+            + b"\0")
+
+
+def dpx_header(device, scanned_mm, width, height):
+    header = bytearray(b"\xff" * platemeta.DPX_HEADER_SIZE)
+    header[0:4] = b"SDPX"
+    struct.pack_into(">2I", header, 772, width, height)
+    header[1556:1588] = device.encode().ljust(32, b"\0")
+    if scanned_mm: struct.pack_into(">2f", header, 1636, *scanned_mm)
+    header[1680:1712] = b"Super 35".ljust(32, b"\0")
+    return bytes(header)
+
+
+def write_sequence(directory, name, extension, header, frames, frame_bytes):
+    for frame in range(1001, 1001 + frames):
+        with open(os.path.join(directory, f"{name}.{frame:04d}.{extension}"), "wb") as stream:
+            stream.write(header)
+            stream.truncate(frame_bytes)
+    return os.path.join(directory, f"{name}.1001.{extension}")
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000.0:8.2f} ms  -> {result}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time preset detection from EXR/DPX plate headers.")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--frame-mb", type=float, default=48.0, help="Size of each (sparse) frame file.")
+    args = parser.parse_args()
+    frame_bytes = int(args.frame_mb * 1e6)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Alexa Mini LF open gate: 4448 x 3096 photosites of 8.25 um.
+        exr = write_sequence(directory, "plateA", "exr", exr_header("ALEXA Mini LF", 8.25, 4448, 3096),
+                             args.frames, frame_bytes)
+        dpx = write_sequence(directory, "plateB", "dpx", dpx_header("Scanner 4K", (24.89, 18.67), 4096, 3072),
+                             args.frames, frame_bytes)
+        dpx_model = write_sequence(directory, "plateC", "dpx", dpx_header("RED KOMODO 6K", None, 6144, 3240),
+                                   args.frames, frame_bytes)
+        print(f"{args.frames} frames per sequence, {args.frame_mb:g} MB per frame")
+
+        expected = {exr: "Arri Alexa Mini LF (Open Gate)", dpx: "Super 35mm Film", dpx_model: "RED Komodo (6K S35)"}
+        for path, preset in expected.items():
+            detection = timed(f"{os.path.basename(path)} cold", lambda: platemeta.detect_preset(path))
+            timed(f"{os.path.basename(path)} cached", lambda: platemeta.detect_preset(path).preset)
+            if not detection or detection.preset != preset:
+                sys.exit(f"{path}: expected {preset}, detected {detection}")
+
+        shape = fake.add_camera("shotCamShape", transform="shotCam")
+        fake.attrs["imagePlaneShape1"] = {"imageName": exr}
+        fake.connect_curve("imagePlaneShape1", shape + ".imagePlane")
+        fake.select("shotCam")
+        ui.create_camera_tool_ui()
+        fake.process_idle()
+        selected = next(w.flags.get("selectItem") for w in fake.widgets.values() if w.kind == "textScrollList")
+        print(f"preset list selection after loading the camera: {selected}")
+        if selected != [expected[exr]]:
+            sys.exit("The plate preset was not preselected.")
+
+
+if __name__ == "__main__":
+    main()
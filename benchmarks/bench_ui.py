@@ -0,0 +1,76 @@
+# cameraApertureFix - UI interaction benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Drives the tool window through a scripted interaction sequence on the fake
+# cmds backend and reports the cmds calls and wall time of each step.
+#
+#   python benchmarks/bench_ui.py --latency 0.002
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+from cameraApertureFix import ui as tool
+
+
+def find_widget(kind, label=None):
+    for widget in fake.widgets.values():
+        if widget.kind == kind and (label is None or widget.flags.get("label") == label):
+            return widget.name
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+def interactions():
+    return [
+        ("open window", lambda: tool.create_camera_tool_ui()),
+        ("filter presets", lambda: fake.trigger(find_widget("textField"), "super 35")),
+        ("preset", lambda: fake.trigger(find_widget("textScrollList"), "Super 35mm Film")),
+        ("unit mm", lambda: fake.trigger(find_widget("optionMenu", "Unit"), "mm")),
+        ("maintain off", lambda: fake.trigger(find_widget("checkBox", "Maintain Original Aspect Ratio"), False)),
+        ("preset none", lambda: fake.trigger(find_widget("textScrollList"), "None")),
+        ("use suggested", lambda: fake.trigger(find_widget("button", "Use"))),
+        ("adjust fl off", lambda: fake.trigger(find_widget("checkBox", "Adjust Focal Length to Maintain FOV"), False)),
+        ("adjust fl on", lambda: fake.trigger(find_widget("checkBox", "Adjust Focal Length to Maintain FOV"), True)),
+        ("apply", lambda: fake.trigger(find_widget("button", "Apply"))),
+        ("refresh", lambda: fake.trigger(find_widget("button", "Refresh"))),
+    ]
+
+
+def run(latency):
+    fake.add_camera("shotCamShape", hfa=1.417, vfa=0.945, focal_length=35.0, transform="shotCam")
+    fake.select("shotCam")
+    fake.latency = latency
+    results = []
+    for label, interaction in interactions():
+        fake.reset_calls()
+        start = time.perf_counter()
+        interaction()
+        fake.process_idle()
+        results.append((label, fake.total_calls(), time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cmds calls per UI interaction.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    args = parser.parse_args()
+
+    results = run(args.latency)
+    for label, calls, elapsed in results:
+        print(f"{label:<16} {calls:6d} cmds calls {elapsed * 1000.0:9.2f} ms")
+    print(f"{'total':<16} {sum(r[1] for r in results):6d} cmds calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# cameraApertureFix - what-if comparison benchmark
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Extends the catalog to the requested number of presets, then times the
+# presets x cameras matrix as one engine.preset_matrix broadcast against one
+# resolve_targets call per preset and mode, and checks that both agree. Then
+# loads the cameras into the tool window on the fake cmds backend, times the
+# what-if section's recompute and mode switch, and the CSV export.
+#
+#   python benchmarks/bench_whatif.py --presets 50 --cameras 1000 --frames 240
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import engine, ui, whatif
+from cameraApertureFix.catalog import get_catalog, reload_catalog
+
+
+def find_widget(kind, label=None):
+    for widget in fake.widgets.values():
+        if widget.kind == kind and (label is None or widget.flags.get("label") == label):
+            return widget.name
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+def timed(label, func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        fake.reset_calls()
+        start = time.perf_counter()
+        result = func()
+        fake.process_idle()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {fake.total_calls():6d} cmds calls {best * 1000.0:9.2f} ms")
+    return result
+
+
+def extend_catalog(directory, preset_count):
+    extra = {f"Bench Gate {i}": {"horizontal": 20.0 + i * 0.37, "vertical": 12.0 + i * 0.21, "unit": "mm"}
+             for i in range(max(preset_count - len(get_catalog()), 0))}
+    path = os.path.join(directory, "bench_presets.json")
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(extra, stream)
+    reload_catalog([path])
+    return get_catalog().names[:preset_count]
+
+
+def per_preset_calls(hfa, vfa, focal_length, presets):
+    """The matrix as the window's preview logic would build it: one resolve_targets call per preset and mode."""
+    return [[engine.resolve_targets(hfa, vfa, focal_length, preset=name, maintain_aspect_ratio=maintain)
+             for name in presets] for maintain in (True, False)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the presets x cameras what-if comparison.")
+    parser.add_argument("--presets", type=int, default=50)
+    parser.add_argument("--cameras", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=240, help="Frames for the per-frame matrix.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hfa = 0.9 + rng.random(args.cameras)
+    vfa = hfa / (1.3 + rng.random(args.cameras))
+    focal_length = 18.0 + rng.random(args.cameras) * 100.0
+    per_frame = focal_length[:, None] + np.arange(args.frames) * 0.01
+
+    with tempfile.TemporaryDirectory() as directory:
+        presets = extend_catalog(directory, args.presets)
+        print(f"{len(presets)} presets x {args.cameras} cameras")
+
+        loop = timed("resolve_targets per preset", lambda: per_preset_calls(hfa, vfa, focal_length, presets))
+        matrix = timed("preset_matrix", lambda: engine.preset_matrix(hfa, vfa, focal_length, presets))
+        timed(f"preset_matrix x {args.frames} frames", lambda: engine.preset_matrix(hfa, vfa, per_frame, presets))
+        error = max(float(np.max(np.abs(getattr(matrix, field)[mode, p] - getattr(loop[mode][p], field))))
+                    for mode in range(2) for p in range(len(presets))
+                    for field in ("hfa", "vfa", "aspect_ratio", "focal_length", "fl_scale"))
+        print(f"largest difference from resolve_targets: {error:g}")
+        if error > 1e-12: sys.exit("preset_matrix disagrees with resolve_targets.")
+
+        transforms = []
+        for i in range(args.cameras):
+            fake.add_camera(f"shotCamShape{i}", hfa=float(hfa[i]), vfa=float(vfa[i]),
+                            focal_length=float(focal_length[i]), transform=f"shotCam{i}")
+            transforms.append(f"shotCam{i}")
+        fake.select(*transforms)
+        ui.create_camera_tool_ui()
+        fake.process_idle()
+        fake.widgets[find_widget("frameLayout", "Batch: Multiple Cameras")].flags["expandCommand"]()
+        fake.trigger(find_widget("button", "Load Cameras"))
+        fake.process_idle()
+
+        expand = fake.widgets[find_widget("frameLayout", "What-If: Presets x Cameras")].flags["expandCommand"]
+        timed("expand what-if", expand, repeat=1)
+
+        def recompute():
+            fake.trigger(find_widget("button", "Refresh"))
+        timed("refresh (recompute)", recompute)
+        timed("mode: preset aspect", lambda: fake.trigger(find_widget("optionMenu", "Mode"), "Preset Aspect"), repeat=1)
+        # The what-if table is the last fixed-width list; the batch section's comes first.
+        table = [w for w in fake.widgets.values() if w.flags.get("font") == "fixedWidthFont"][-1]
+        print(f"table rows: {len(table.items)}\n  {table.items[0]}")
+        if len(table.items) != len(presets): sys.exit("The what-if table does not list every preset.")
+
+        path = os.path.join(directory, "whatif.csv")
+        cameras = [f"shotCamShape{i}" for i in range(args.cameras)]
+        rows = timed("write_csv", lambda: whatif.write_csv(matrix, cameras, path), repeat=1)
+        print(f"{rows} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
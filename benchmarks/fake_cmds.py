@@ -0,0 +1,528 @@
+# cameraApertureFix - fake maya.cmds backend for benchmarks
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# A small in-memory stand-in for the parts of maya.cmds the tool uses. Every
+# command is counted, and an optional per-call latency models the round-trip
+# cost of a real Maya session.
+
+import atexit
+import math
+import re
+import shutil
+import sys
+import tempfile
+import time
+import types
+import uuid as uuid_module
+from collections import Counter
+
+import numpy as np
+
+CAMERA_ATTRS = {
+    "hfa": "horizontalFilmAperture", "horizontalFilmAperture": "horizontalFilmAperture",
+    "vfa": "verticalFilmAperture", "verticalFilmAperture": "verticalFilmAperture",
+    "fl": "focalLength", "focalLength": "focalLength",
+}
+
+FLAG_ALIASES = {
+    "e": "edit", "q": "query", "ex": "exists", "en": "enable", "l": "label",
+    "v": "value", "sl": "select", "cc": "changeCommand", "c": "command", "vis": "visible",
+}
+
+_UUID_RE = re.compile(r"^[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}$")
+_MULTI_RE = re.compile(r"^(?P<attr>\w+)\[(?P<start>\d+)(?::(?P<end>\d+))?\]$")
+
+
+class FakeCurve(object):
+    def __init__(self, times, values, tangent_type="auto", weighted=False):
+        count = len(times)
+        self.times = list(times)
+        self.values = list(values)
+        self.in_angle = [0.0] * count
+        self.out_angle = [0.0] * count
+        self.in_weight = [1.0] * count
+        self.out_weight = [1.0] * count
+        self.in_type = [tangent_type] * count
+        self.out_type = [tangent_type] * count
+        self.weighted = weighted
+
+
+def _command(func):
+    name = func.__name__
+
+    def wrapper(self, *args, **kwargs):
+        self.calls[name] += 1
+        if self.latency: time.sleep(self.latency)
+        return func(self, *args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+
+class FakeWidget(object):
+    def __init__(self, kind, name, parent, flags):
+        self.kind = kind
+        self.name = name
+        self.parent = parent
+        self.flags = {"enable": True}
+        self.flags.update(flags)
+        self.items = []
+
+
+def _widget_command(kind):
+    def command(self, *args, **flags):
+        flags = {FLAG_ALIASES.get(k, k): v for k, v in flags.items()}
+        edit, query = flags.pop("edit", False), flags.pop("query", False)
+        if not edit and flags.get("exists"):
+            return args[0] in self.widgets
+        if not edit and not query:
+            return self._create_widget(kind, args[0] if args else None, flags)
+        name = args[0]
+        widget = self.widgets.get(name)
+        if query:
+            if flags.get("exists"): return widget is not None
+            return self._query_widget(widget, flags)
+        self._edit_widget(widget, flags)
+    command.__name__ = kind
+    return _command(command)
+
+
+class FakeCmds(object):
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.attrs = {}
+        self.curves = {}
+        self.connections = {}
+        self.transforms = {}
+        self.selection = []
+        self.object_sets = {}
+        self.scene_name = ""
+        self.playback_range = (1.0, 120.0)
+        self.widgets = {}
+        self.deferred = []
+        self.jobs = {}
+        self.uuids = {}
+        self._parents = []
+        self._menu = None
+        self._widget_count = 0
+        self._job_count = 0
+        self._temp_dir = None
+        atexit.register(self._remove_temp_dir)
+
+    def install(self):
+        open_maya = FakeOpenMaya(self)
+        api_module = types.ModuleType("maya.api")
+        api_module.OpenMaya = open_maya
+        maya_module = types.ModuleType("maya")
+        maya_module.cmds = self
+        maya_module.api = api_module
+        sys.modules["maya"] = maya_module
+        sys.modules["maya.cmds"] = self
+        sys.modules["maya.api"] = api_module
+        sys.modules["maya.api.OpenMaya"] = open_maya
+        return self
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def reset(self):
+        """Drop the scene, the widgets and any pending deferred callbacks."""
+        for store in (self.attrs, self.curves, self.connections, self.transforms, self.object_sets, self.widgets,
+                      self.uuids):
+            store.clear()
+        self.selection = []
+        self.deferred = []
+        self.jobs = {}
+        self._parents = []
+        self._menu = None
+        self.scene_name = ""
+        self._remove_temp_dir()
+        self.reset_calls()
+
+    def _remove_temp_dir(self):
+        if self._temp_dir: shutil.rmtree(self._temp_dir, ignore_errors=True)
+        self._temp_dir = None
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    # scene construction helpers, not counted as commands
+
+    def add_camera(self, shape, hfa=1.417, vfa=0.945, focal_length=35.0, transform=None):
+        self.attrs[shape] = {"horizontalFilmAperture": hfa, "verticalFilmAperture": vfa, "focalLength": focal_length}
+        if transform: self.transforms[transform] = shape
+        return shape
+
+    def node_uuid(self, name):
+        """A node keeps the UUID of the name it was created with through renames."""
+        return self.uuids.get(name) or str(uuid_module.uuid5(uuid_module.NAMESPACE_OID, name)).upper()
+
+    def add_set(self, name, members):
+        self.object_sets[name] = list(members)
+        return name
+
+    def select(self, *nodes):
+        """Change the selection; SelectionChanged jobs run on the next idle."""
+        self.selection = list(nodes)
+        self.fire("event", "SelectionChanged")
+
+    def fire(self, kind, key):
+        """Queue the scriptJobs registered for (kind, key), as Maya runs them after the triggering command."""
+        for job_kind, job_key, callback, _ in list(self.jobs.values()):
+            if job_kind == kind and job_key == key: self.deferred.append(callback)
+
+    def trigger(self, widget_name, value=None):
+        """Simulate the user changing a widget and run its callback."""
+        widget = self.widgets[widget_name]
+        if widget.kind == "optionMenu":
+            widget.flags["select"] = widget.items.index(value) + 1
+            callback = widget.flags.get("changeCommand")
+            return callback(value) if callback else None
+        if widget.kind == "button":
+            return widget.flags["command"]()
+        if widget.kind == "textScrollList":
+            if value not in widget.items: raise ValueError(f"'{value}' is not listed in {widget_name}")
+            widget.flags["selectItem"] = [value]
+            callback = widget.flags.get("selectCommand")
+            return callback() if callback else None
+        if widget.kind == "textField":
+            widget.flags["text"] = value
+            callback = widget.flags.get("textChangedCommand") or widget.flags.get("changeCommand")
+            return callback(value) if callback else None
+        widget.flags["value"] = value
+        callback = widget.flags.get("changeCommand")
+        return callback(value) if callback else None
+
+    def process_idle(self):
+        """Run callbacks queued with evalDeferred, as Maya does on idle."""
+        while self.deferred:
+            self.deferred.pop(0)()
+
+    def _create_widget(self, kind, name, flags):
+        if name is None:
+            self._widget_count += 1
+            name = f"{kind}{self._widget_count}"
+        if kind == "menuItem":
+            self.widgets[flags.pop("parent", self._menu)].items.append(flags.get("label"))
+            return name
+        parent = flags.pop("parent", self._parents[-1] if self._parents else None)
+        widget = FakeWidget(kind, name, parent, flags)
+        self.widgets[name] = widget
+        if kind in ("window", "columnLayout", "rowLayout", "scrollLayout", "formLayout", "frameLayout",
+                    "tabLayout", "workspaceControl"):
+            self._parents.append(name)
+        elif kind == "optionMenu":
+            widget.flags.setdefault("select", 1)
+            self._menu = name
+        elif kind == "menu":
+            self._menu = name
+        return name
+
+    def _query_widget(self, widget, flags):
+        if widget.kind == "optionMenu":
+            if flags.get("value"): return widget.items[widget.flags["select"] - 1] if widget.items else None
+            if flags.get("select"): return widget.flags["select"]
+            if flags.get("numberOfItems"): return len(widget.items)
+        if widget.kind == "textScrollList":
+            if flags.get("selectItem"): return list(widget.flags.get("selectItem") or []) or None
+            if flags.get("allItems"): return list(widget.items) or None
+            if flags.get("numberOfItems"): return len(widget.items)
+        for flag in flags:
+            return widget.flags.get(flag, 0.0 if flag == "value" else None)
+
+    def _edit_widget(self, widget, flags):
+        if widget.kind == "optionMenu" and "value" in flags:
+            widget.flags["select"] = widget.items.index(flags.pop("value")) + 1
+        if widget.kind == "textScrollList":
+            if flags.pop("removeAll", False): widget.items = []
+            append = flags.pop("append", [])
+            widget.items.extend([append] if isinstance(append, str) else append)
+            if flags.pop("deselectAll", False): widget.flags["selectItem"] = []
+            if "selectItem" in flags: flags["selectItem"] = [flags["selectItem"]]
+        widget.flags.update(flags)
+
+    def add_curve(self, name, times, values, tangent_type="auto", weighted=False):
+        self.curves[name] = FakeCurve(times, values, tangent_type, weighted)
+        return name
+
+    def connect_curve(self, curve, plug):
+        self.connections.setdefault(plug, []).append(curve)
+
+    # commands
+
+    @_command
+    def warning(self, message):
+        pass
+
+    window = _widget_command("window")
+    scrollLayout = _widget_command("scrollLayout")
+    columnLayout = _widget_command("columnLayout")
+    rowLayout = _widget_command("rowLayout")
+    formLayout = _widget_command("formLayout")
+    frameLayout = _widget_command("frameLayout")
+    workspaceControl = _widget_command("workspaceControl")
+    text = _widget_command("text")
+    textField = _widget_command("textField")
+    floatField = _widget_command("floatField")
+    optionMenu = _widget_command("optionMenu")
+    menu = _widget_command("menu")
+    menuItem = _widget_command("menuItem")
+    checkBox = _widget_command("checkBox")
+    button = _widget_command("button")
+    separator = _widget_command("separator")
+    textScrollList = _widget_command("textScrollList")
+
+    @_command
+    def setParent(self, parent=None, menu=False, **kwargs):
+        if menu: self._menu = parent
+        elif parent == ".." and self._parents: self._parents.pop()
+        elif parent in self.widgets: self._parents.append(parent)
+
+    @_command
+    def showWindow(self, window):
+        self.widgets[window].flags["visible"] = True
+
+    @_command
+    def deleteUI(self, name, **kwargs):
+        for child in [w for w in self.widgets.values() if w.parent == name]:
+            self.deleteUI(child.name)
+        self.widgets.pop(name, None)
+        self._parents = [p for p in self._parents if p in self.widgets]
+        for job, (_, _, _, parent) in list(self.jobs.items()):
+            if parent == name: del self.jobs[job]
+
+    @_command
+    def scriptJob(self, event=None, attributeChange=None, nodeDeleted=None, parent=None, kill=None, exists=None,
+                  force=False, **kwargs):
+        if exists is not None: return exists in self.jobs
+        if kill is not None:
+            if kill not in self.jobs: raise RuntimeError(f"Job {kill} does not exist")
+            del self.jobs[kill]
+            return None
+        kind, (key, callback) = next((kind, spec) for kind, spec in (
+            ("event", event), ("attributeChange", attributeChange), ("nodeDeleted", nodeDeleted)) if spec)
+        self._job_count += 1
+        self.jobs[self._job_count] = (kind, key, callback, parent)
+        return self._job_count
+
+    @_command
+    def confirmDialog(self, **kwargs):
+        return "OK"
+
+    @_command
+    def undoInfo(self, **kwargs):
+        pass
+
+    @_command
+    def evalDeferred(self, callback, **kwargs):
+        self.deferred.append(callback)
+
+    @_command
+    def ls(self, *names, type=None, long=False, selection=False, uuid=False, **kwargs):
+        if selection: return list(self.selection)
+        if names:
+            nodes = [n for arg in names for n in ([arg] if isinstance(arg, str) else arg)]
+            if uuid: return [self.node_uuid(n) for n in nodes if n in self.attrs or n in self.transforms]
+            if any(_UUID_RE.match(n) for n in nodes):
+                by_uuid = {self.node_uuid(n): n for n in list(self.attrs) + list(self.transforms)}
+                nodes = [by_uuid.get(n, n) for n in nodes]
+            if type == "camera": return [n for n in nodes if n in self.attrs]
+            return [n for n in nodes if n in self.attrs or n in self.transforms or n in self.object_sets]
+        if type == "camera": return list(self.attrs.keys())
+        return []
+
+    @_command
+    def listRelatives(self, nodes, shapes=False, type=None, parent=False, **kwargs):
+        if isinstance(nodes, str): nodes = [nodes]
+        if parent: return [t for t, shape in self.transforms.items() if shape in nodes] or None
+        found = [self.transforms[node] for node in nodes if node in self.transforms]
+        return found or None
+
+    @_command
+    def file(self, q=False, sceneName=False, **kwargs):
+        if sceneName: return self.scene_name
+
+    @_command
+    def internalVar(self, userTmpDir=False, **kwargs):
+        # A directory of our own, so journals of untitled scenes do not pile up in the real temp dir.
+        if not self._temp_dir: self._temp_dir = tempfile.mkdtemp(prefix="fake_cmds_")
+        return self._temp_dir + "/"
+
+    @_command
+    def sets(self, name, q=False, **kwargs):
+        return list(self.object_sets.get(name, [])) or None
+
+    @_command
+    def listConnections(self, plug, type=None, scn=False, source=True, destination=True, plugs=False, **kwargs):
+        if isinstance(plug, str) and not source:
+            # The plugs a node drives, as "node.attr".
+            node = plug.split(".", 1)[0]
+            return [p for p, sources in self.connections.items() if node in sources] or None
+        if isinstance(plug, str): return list(self.connections.get(plug, [])) or None
+        # A list of plugs, or of nodes for every connection into them.
+        return [s for p, sources in self.connections.items() if p in plug or p.split(".", 1)[0] in plug
+                for s in sources] or None
+
+    @_command
+    def createNode(self, node_type, name=None, **kwargs):
+        name = name or node_type
+        while name in self.curves: name += "1"
+        self.curves[name] = FakeCurve([], [])
+        return name
+
+    @_command
+    def connectAttr(self, source, destination, force=False):
+        self.connections[destination] = [source.split(".", 1)[0]]
+
+    @_command
+    def rename(self, node, new_name):
+        self.uuids[new_name] = self.node_uuid(node)
+        self.uuids.pop(node, None)
+        if node in self.attrs: self.attrs[new_name] = self.attrs.pop(node)
+        self.transforms = {(new_name if t == node else t): (new_name if s == node else s)
+                           for t, s in self.transforms.items()}
+        self.connections = {(new_name + plug[len(node):] if plug.split(".", 1)[0] == node else plug): sources
+                            for plug, sources in self.connections.items()}
+        self.selection = [new_name if n == node else n for n in self.selection]
+        self.fire("event", "NameChanged")
+        return new_name
+
+    @_command
+    def delete(self, nodes):
+        for node in [nodes] if isinstance(nodes, str) else nodes:
+            self.fire("nodeDeleted", node)
+            self.attrs.pop(node, None)
+            for transform in [t for t, shape in self.transforms.items() if node in (t, shape)]:
+                del self.transforms[transform]
+            self.curves.pop(node, None)
+            for plug, sources in self.connections.items():
+                if node in sources: sources.remove(node)
+
+    @_command
+    def playbackOptions(self, q=False, minTime=False, maxTime=False):
+        return self.playback_range[0] if minTime else self.playback_range[1]
+
+    @_command
+    def getAttr(self, plug, time=None):
+        node, attr = plug.split(".", 1)
+        if node in self.curves:
+            curve = self.curves[node]
+            start, end = self._range(attr)
+            return [(curve.times[i], curve.values[i]) for i in range(start, end + 1)]
+        if node in self.transforms:
+            default = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0] \
+                if attr == "worldMatrix[0]" else 0.0
+            return self.attrs.get(node, {}).get(attr, default)
+        return self.attrs[node][CAMERA_ATTRS.get(attr, attr)]
+
+    @_command
+    def setAttr(self, plug, *values, **kwargs):
+        node, attr = plug.split(".", 1)
+        if node in self.curves:
+            curve = self.curves[node]
+            start, end = self._range(attr)
+            curve.times[start:end + 1] = values[0::2]
+            curve.values[start:end + 1] = values[1::2]
+            for tangents, default in ((curve.in_angle, 0.0), (curve.out_angle, 0.0), (curve.in_weight, 1.0),
+                                      (curve.out_weight, 1.0), (curve.in_type, "auto"), (curve.out_type, "auto")):
+                tangents.extend([default] * (len(curve.times) - len(tangents)))
+            return
+        attr = CAMERA_ATTRS.get(attr, attr)
+        self.attrs[node][attr] = values[0]
+        self.fire("attributeChange", f"{node}.{attr}")
+
+    @_command
+    def keyframe(self, curve_name, q=False, keyframeCount=False, valueChange=False, timeChange=False,
+                 eval=False, time=None, **kwargs):
+        curve = self.curves[curve_name]
+        if eval: return [float(v) for v in np.interp([t[0] for t in time], curve.times, curve.values)]
+        if keyframeCount: return len(curve.times)
+        if valueChange: return list(curve.values)
+        if timeChange: return list(curve.times)
+
+    @_command
+    def keyTangent(self, curve_name, q=False, e=False, index=None, inAngle=None, outAngle=None,
+                   inWeight=None, outWeight=None, inTangentType=False, outTangentType=False,
+                   weightedTangents=None):
+        curve = self.curves[curve_name]
+        if q:
+            if weightedTangents: return [curve.weighted]
+            if inAngle: return list(curve.in_angle)
+            if outAngle: return list(curve.out_angle)
+            if inWeight: return list(curve.in_weight)
+            if outWeight: return list(curve.out_weight)
+            if inTangentType: return list(curve.in_type)
+            if outTangentType: return list(curve.out_type)
+            return None
+        if index is None: index = (0, len(curve.times) - 1)
+        if inTangentType: curve.in_type[index[0]:index[1] + 1] = [inTangentType] * (index[1] + 1 - index[0])
+        if outTangentType: curve.out_type[index[0]:index[1] + 1] = [outTangentType] * (index[1] + 1 - index[0])
+        span = index[1] + 1 - index[0]
+        for values, types, value in ((curve.in_angle, curve.in_type, inAngle), (curve.out_angle, curve.out_type, outAngle),
+                                     (curve.in_weight, curve.in_type, inWeight),
+                                     (curve.out_weight, curve.out_type, outWeight)):
+            if value is None: continue
+            values[index[0]:index[1] + 1] = [value] * span
+            # As in Maya, editing an angle or weight makes the tangent fixed.
+            types[index[0]:index[1] + 1] = ["fixed"] * span
+
+    @_command
+    def scaleKey(self, curve_names, valueScale=1.0, valuePivot=0.0):
+        if isinstance(curve_names, str): curve_names = [curve_names]
+        for curve_name in curve_names:
+            curve = self.curves[curve_name]
+            for i in range(len(curve.values)):
+                curve.values[i] = valuePivot + (curve.values[i] - valuePivot) * valueScale
+                for angles, weights in ((curve.in_angle, curve.in_weight), (curve.out_angle, curve.out_weight)):
+                    radians = math.radians(angles[i])
+                    cos, sin = math.cos(radians), math.sin(radians)
+                    angles[i] = math.degrees(math.atan2(sin * valueScale, cos))
+                    if curve.weighted: weights[i] *= math.hypot(cos, sin * valueScale)
+
+    @staticmethod
+    def _range(attr):
+        match = _MULTI_RE.match(attr)
+        start = int(match.group("start"))
+        end = int(match.group("end") or start)
+        return start, end
+
+
+class FakeOpenMaya(object):
+    """Just enough of maya.api.OpenMaya to read camera shapes. API calls are not counted."""
+
+    def __init__(self, fake_cmds):
+        self._cmds = fake_cmds
+        outer = self
+
+        class MSelectionList(object):
+            def __init__(self):
+                self._names = []
+
+            def add(self, name):
+                self._names.append(name)
+                return self
+
+            def length(self):
+                return len(self._names)
+
+            def getDependNode(self, index):
+                return self._names[index]
+
+        class MFnCamera(object):
+            def __init__(self, node):
+                self._attrs = outer._cmds.attrs[node]
+
+            @property
+            def horizontalFilmAperture(self): return self._attrs["horizontalFilmAperture"]
+
+            @property
+            def verticalFilmAperture(self): return self._attrs["verticalFilmAperture"]
+
+            @property
+            def focalLength(self): return self._attrs["focalLength"]
+
+        self.MSelectionList = MSelectionList
+        self.MFnCamera = MFnCamera
@@ -0,0 +1,169 @@
+# cameraApertureFix - benchmark regression suite
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Drives the tool window through a scripted session on fake scenes from one
+# camera with one focal key up to 10k cameras with a 100k-key focal curve, and
+# records the cmds calls and wall time of every operation. The results are
+# compared with a stored baseline; any operation issuing more cmds calls, or
+# taking longer than the time tolerance allows, fails the run.
+#
+#   python benchmarks/regression.py
+#   python benchmarks/regression.py --update-baseline
+#   python benchmarks/regression.py --latency 0.0005 --no-timing
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_cmds import FakeCmds
+
+fake = FakeCmds().install()
+
+import numpy as np
+
+from cameraApertureFix import ui as tool
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# (cameras in the scene, keys on the selected camera's focal curve)
+SCALES = [(1, 1), (100, 1000), (1, 100000), (10000, 1), (10000, 100000)]
+
+SELECTED_TRANSFORM = "shotCam0"
+
+
+def find_widget(kind, label=None):
+    for widget in fake.widgets.values():
+        if widget.kind == kind and (label is None or widget.flags.get("label") == label):
+            return widget.name
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+def build_scene(camera_count, key_count):
+    fake.reset()
+    for i in range(camera_count):
+        fake.add_camera(f"shotCamShape{i}", hfa=1.417, vfa=0.945, focal_length=35.0 + i % 50,
+                        transform=f"shotCam{i}")
+    frames = np.arange(key_count, dtype=np.float64)
+    curve = fake.add_curve("shotCamShape0_focalLength", frames.tolist(),
+                           (35.0 + 5.0 * np.sin(frames * 0.01)).tolist())
+    fake.connect_curve(curve, "shotCamShape0.focalLength")
+    fake.select(SELECTED_TRANSFORM)
+
+
+def session():
+    """The scripted interaction sequence, as (operation, callable) pairs."""
+    return [
+        ("create_camera_tool_ui", lambda: tool.create_camera_tool_ui()),
+        ("apply_preset", lambda: fake.trigger(find_widget("textScrollList"), "Super 35mm Film")),
+        ("update_unit_and_fields", lambda: fake.trigger(find_widget("optionMenu", "Unit"), "mm")),
+        ("apply_preset_none", lambda: fake.trigger(find_widget("textScrollList"), "None")),
+        ("apply_preset_again", lambda: fake.trigger(find_widget("textScrollList"), "Arri Alexa Mini LF (Open Gate)")),
+        ("apply_new_focal_length", lambda: fake.trigger(find_widget("button", "Apply"))),
+        ("refresh", lambda: fake.trigger(find_widget("button", "Refresh"))),
+        ("close", lambda: fake.trigger(find_widget("button", "Close"))),
+        ("reopen", lambda: tool.create_camera_tool_ui()),
+    ]
+
+
+def run_scale(camera_count, key_count, repeat):
+    """Return {operation: {"calls", "commands", "seconds"}} for one scene size, best time of repeat runs."""
+    results = {}
+    for _ in range(repeat):
+        build_scene(camera_count, key_count)
+        for operation, interaction in session():
+            fake.reset_calls()
+            start = time.perf_counter()
+            interaction()
+            fake.process_idle()
+            elapsed = time.perf_counter() - start
+            result = results.setdefault(operation, {"calls": fake.total_calls(),
+                                                    "commands": dict(sorted(fake.calls.items())),
+                                                    "seconds": elapsed})
+            result["seconds"] = min(result["seconds"], elapsed)
+    return results
+
+
+def run(repeat=3, scales=SCALES):
+    return {f"{cameras}x{keys}": run_scale(cameras, keys, repeat) for cameras, keys in scales}
+
+
+def compare(results, baseline, time_tolerance, time_slack, check_timing=True):
+    """Return a list of regression messages for results against baseline."""
+    failures = []
+    for scale, operations in results.items():
+        for operation, result in operations.items():
+            expected = baseline.get(scale, {}).get(operation)
+            if expected is None: continue
+            if result["calls"] > expected["calls"]:
+                grown = {name: f"{expected['commands'].get(name, 0)} -> {count}"
+                         for name, count in result["commands"].items() if count > expected["commands"].get(name, 0)}
+                failures.append(f"{scale} {operation}: {expected['calls']} -> {result['calls']} cmds calls {grown}")
+            limit = expected["seconds"] * time_tolerance + time_slack
+            if check_timing and result["seconds"] > limit:
+                failures.append(f"{scale} {operation}: {expected['seconds'] * 1000.0:.2f} ms -> "
+                                f"{result['seconds'] * 1000.0:.2f} ms (limit {limit * 1000.0:.2f} ms)")
+    return failures
+
+
+def print_results(results, baseline):
+    for scale, operations in results.items():
+        print(f"\n{scale} (cameras x keys)")
+        for operation, result in operations.items():
+            expected = baseline.get(scale, {}).get(operation)
+            reference = (f"   baseline {expected['calls']:5d} calls {expected['seconds'] * 1000.0:9.2f} ms"
+                         if expected else "")
+            print(f"  {operation:<24} {result['calls']:5d} calls {result['seconds'] * 1000.0:9.2f} ms{reference}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cmds calls and timings of the tool against a stored baseline.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scene size; the best time is kept.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every cmds call.")
+    parser.add_argument("--time-tolerance", type=float, default=2.0,
+                        help="Fail when an operation takes longer than this multiple of its baseline time.")
+    parser.add_argument("--time-slack", type=float, default=0.005,
+                        help="Seconds added to every time limit, so tiny operations do not fail on noise.")
+    parser.add_argument("--no-timing", action="store_true", help="Only compare cmds call counts.")
+    args = parser.parse_args()
+
+    fake.latency = args.latency
+    results = run(args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline first.")
+        return 1
+    check_timing = not args.no_timing and not args.latency
+    failures = compare(results, baseline, args.time_tolerance, args.time_slack, check_timing)
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures: print(f"  {failure}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
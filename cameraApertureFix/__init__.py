@@ -0,0 +1,9 @@
+# cameraApertureFix
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+
+from cameraApertureFix.presets import PRESETS
+
+__version__ = "0.6"
@@ -0,0 +1,15 @@
+# cameraApertureFix - command line entry point
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# python -m cameraApertureFix conforms camera manifests without Maya; see
+# cameraApertureFix.manifest.
+
+import sys
+
+from cameraApertureFix.manifest import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# cameraApertureFix - scene filmback audit
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Lists every camera shape in the scene once and classifies its filmback
+# against the preset catalog. Attributes are read through the API on a single selection
+# list instead of per-camera listRelatives/getAttr chains, so thousands of
+# referenced cameras audit in one pass.
+
+import csv
+from collections import namedtuple
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import numpy as np
+
+from cameraApertureFix import engine
+
+AuditRow = namedtuple(
+    "AuditRow",
+    ["camera", "hfa", "vfa", "focal_length", "preset", "status", "deviation_mm"]
+)
+
+AUDIT_COLUMNS = AuditRow._fields
+
+
+def read_camera_attributes(camera_shapes):
+    """Return (hfa, vfa, focal_length) arrays for camera_shapes, in inches / mm."""
+    count = len(camera_shapes)
+    hfa = np.empty(count, dtype=np.float64)
+    vfa = np.empty(count, dtype=np.float64)
+    focal_length = np.empty(count, dtype=np.float64)
+
+    selection = om.MSelectionList()
+    for shape in camera_shapes:
+        selection.add(shape)
+    for i in range(count):
+        camera_fn = om.MFnCamera(selection.getDependNode(i))
+        hfa[i] = camera_fn.horizontalFilmAperture
+        vfa[i] = camera_fn.verticalFilmAperture
+        focal_length[i] = camera_fn.focalLength
+    return hfa, vfa, focal_length
+
+
+def audit_scene(tolerance_mm=engine.DEFAULT_TOLERANCE_MM, sort_by="camera"):
+    camera_shapes = cmds.ls(type="camera", long=True) or []
+    if not camera_shapes: return []
+
+    hfa, vfa, focal_length = read_camera_attributes(camera_shapes)
+    match = engine.classify_filmbacks(hfa, vfa, tolerance_mm)
+    rows = [
+        AuditRow(camera, h, v, fl, preset if status != engine.MATCH_UNKNOWN else "", status, deviation)
+        for camera, h, v, fl, preset, status, deviation in zip(
+            camera_shapes, hfa.tolist(), vfa.tolist(), focal_length.tolist(),
+            match.preset, match.status.tolist(), match.deviation_mm.tolist())
+    ]
+    return sort_rows(rows, sort_by)
+
+
+def sort_rows(rows, sort_by="camera", reverse=False):
+    if sort_by not in AUDIT_COLUMNS:
+        raise ValueError(f"Unknown audit column '{sort_by}'. Expected one of: {', '.join(AUDIT_COLUMNS)}")
+    return sorted(rows, key=lambda row: getattr(row, sort_by), reverse=reverse)
+
+
+def format_table(rows):
+    header = f"{'Camera':<48} {'HFA (in)':>9} {'VFA (in)':>9} {'FL (mm)':>9} {'Status':<10} {'Dev (mm)':>9}  Preset"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(f"{row.camera:<48} {row.hfa:9.4f} {row.vfa:9.4f} {row.focal_length:9.3f} "
+                     f"{row.status:<10} {row.deviation_mm:9.3f}  {row.preset}")
+    return "\n".join(lines)
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(AUDIT_COLUMNS)
+        writer.writerows(rows)
+    return path
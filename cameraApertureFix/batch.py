@@ -0,0 +1,187 @@
+# cameraApertureFix - multi-camera batch apply
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Conforms every selected camera, or every camera in an object set, with the
+# same settings as the tool window. Current values are read through the API
+# in one pass, targets are resolved in one vectorized engine call, and the
+# apply runs under a single undo chunk. Attributes already at their target
+# within WRITE_TOLERANCE are not set at all, so unchanged cameras cause no
+# dirty propagation or viewport refresh. A focal curve shared by cameras that
+# need different scales, or also driving anything outside the batch, is left
+# alone, and its cameras are marked as conflicts: their apertures are still
+# applied, their focal length is kept.
+
+from collections import namedtuple
+
+import maya.cmds as cmds
+import numpy as np
+
+from cameraApertureFix import audit, curves, engine, journal
+
+WRITE_TOLERANCE = 1e-6
+
+STATUS_CHANGE = "change"
+STATUS_AT_TARGET = "at target"
+STATUS_INVALID = "invalid"
+STATUS_CONFLICT = "conflict"
+
+# focal_curves lists the animCurves driving each camera's focal length
+# (empty for cameras whose focal length is not written).
+BatchPlan = namedtuple(
+    "BatchPlan",
+    ["cameras", "hfa", "vfa", "focal_length", "targets", "write_hfa", "write_vfa", "write_fl", "status",
+     "focal_curves"]
+)
+BatchResult = namedtuple("BatchResult", ["cameras", "changed", "skipped", "invalid", "set_attrs", "curves",
+                                         "conflicts"])
+
+
+def camera_shapes(camera_set=None):
+    """Return the camera shapes selected (as transforms or shapes) or in camera_set, without duplicates."""
+    nodes = cmds.sets(camera_set, q=True) if camera_set else cmds.ls(selection=True, long=True)
+    if not nodes: return []
+    shapes = cmds.ls(nodes, type="camera", long=True) or []
+    shapes += cmds.listRelatives(nodes, shapes=True, type="camera", fullPath=True) or []
+    return list(dict.fromkeys(shapes))
+
+
+def _curve_conflicts(connected, write_fl, fl_scale):
+    """Return a mask of the cameras sharing a focal curve with a camera that needs a different scale."""
+    scales = {}
+    for i in np.flatnonzero(write_fl).tolist():
+        for curve in connected[i]:
+            scales.setdefault(curve, []).append(fl_scale[i])
+    conflicting = {curve for curve, values in scales.items() if not np.allclose(values, values[0])}
+    return np.array([write_fl[i] and bool(conflicting.intersection(connected[i])) for i in range(len(connected))],
+                    dtype=bool)
+
+
+def _curves_driving_outside(focal_curves, destinations):
+    """Return the curves in focal_curves that drive more than the focal lengths of the cameras listing them.
+
+    destinations is a result of curves.curve_destinations. Scaling such a
+    curve would change a camera the batch does not write or journal.
+    """
+    listed = {}
+    for camera_curves in focal_curves:
+        for curve in camera_curves:
+            listed[curve] = listed.get(curve, 0) + 1
+    return {curve for curve, count in listed.items()
+            if len(destinations[curve]) > count
+            or any(plug.rpartition(".")[2] != "focalLength" for plug in destinations[curve])}
+
+
+def plan_batch(cameras, settings, tolerance=WRITE_TOLERANCE, connected=None, destinations=None):
+    """Resolve ConformSettings for cameras and work out which attributes actually need writing.
+
+    connected is an optional result of curves.focal_curves_by_camera for
+    cameras, and destinations one of curves.curve_destinations for their
+    curves; without them the focal curves of the cameras whose focal length
+    changes, and what those curves drive, are queried.
+    """
+    hfa, vfa, focal_length = audit.read_camera_attributes(cameras)
+    targets = engine.resolve_targets(
+        hfa, vfa, focal_length,
+        target_hfa=settings.target_hfa, target_vfa=settings.target_vfa, preset=settings.preset,
+        maintain_aspect_ratio=settings.maintain_aspect_ratio,
+        adjust_focal_length=settings.adjust_focal_length, unit=settings.unit
+    )
+    valid = targets.hfa_valid & targets.vfa_valid
+    write_hfa = valid & (np.abs(targets.hfa - hfa) > tolerance)
+    write_vfa = valid & (targets.vfa > 0) & (np.abs(targets.vfa - vfa) > tolerance)
+    write_fl = valid & targets.fl_changed & (np.abs(targets.focal_length - focal_length) > tolerance)
+
+    focal_curves = [[] for _ in cameras]
+    fl_indices = np.flatnonzero(write_fl).tolist()
+    fl_curves = ([connected[i] for i in fl_indices] if connected is not None
+                 else curves.focal_curves_by_camera([cameras[i] for i in fl_indices]))
+    for i, camera_curves in zip(fl_indices, fl_curves):
+        focal_curves[i] = list(camera_curves)
+    conflict = _curve_conflicts(focal_curves, write_fl, targets.fl_scale)
+    fl_curve_names = {curve for camera_curves in focal_curves for curve in camera_curves}
+    if destinations is None or not fl_curve_names.issubset(destinations):
+        destinations = curves.curve_destinations(fl_curve_names)
+    outside = _curves_driving_outside(focal_curves, destinations)
+    if outside:
+        conflict |= np.array([bool(outside.intersection(camera_curves)) for camera_curves in focal_curves], dtype=bool)
+    write_fl &= ~conflict
+
+    status = np.where(~valid, STATUS_INVALID,
+                      np.where(conflict, STATUS_CONFLICT,
+                               np.where(write_hfa | write_vfa | write_fl, STATUS_CHANGE, STATUS_AT_TARGET)))
+    return BatchPlan(list(cameras), hfa, vfa, focal_length, targets, write_hfa, write_vfa, write_fl, status,
+                     focal_curves)
+
+
+def apply_batch(plan, record=True):
+    """Write a BatchPlan to the scene under one undo chunk and journal it. Returns a BatchResult."""
+    set_attrs = 0
+    changed_curves = []
+    curve_scale = np.ones(len(plan.cameras))
+    cmds.undoInfo(openChunk=True)
+    try:
+        for attr, write, values in ((".horizontalFilmAperture", plan.write_hfa, plan.targets.hfa),
+                                    (".verticalFilmAperture", plan.write_vfa, plan.targets.vfa)):
+            for i in np.flatnonzero(write).tolist():
+                cmds.setAttr(plan.cameras[i] + attr, float(values[i]))
+                set_attrs += 1
+
+        fl_indices = np.flatnonzero(plan.write_fl).tolist()
+        if fl_indices:
+            fl_cameras = [plan.cameras[i] for i in fl_indices]
+            connected = [plan.focal_curves[i] for i in fl_indices]
+            changed_curves = curves.retarget_focal_curves(fl_cameras, plan.targets.fl_scale[fl_indices].tolist(),
+                                                          connected)
+            scaled_curves = set(changed_curves)
+            for i, camera, camera_curves in zip(fl_indices, fl_cameras, connected):
+                if camera_curves:
+                    if scaled_curves.intersection(camera_curves): curve_scale[i] = plan.targets.fl_scale[i]
+                    continue
+                cmds.setAttr(camera + ".focalLength", float(plan.targets.focal_length[i]))
+                set_attrs += 1
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    written = plan.write_hfa | plan.write_vfa | plan.write_fl
+    if record and written.any():
+        # Conflicting cameras keep their focal length, and write_fl is False for them.
+        indices = np.flatnonzero(written)
+        journal.record(
+            [plan.cameras[i] for i in indices.tolist()],
+            plan.hfa[indices], plan.vfa[indices], plan.focal_length[indices],
+            np.where(plan.write_hfa, plan.targets.hfa, plan.hfa)[indices],
+            np.where(plan.write_vfa, plan.targets.vfa, plan.vfa)[indices],
+            np.where(plan.write_fl, plan.targets.focal_length, plan.focal_length)[indices],
+            curve_scale[indices]
+        )
+
+    changed = int(np.count_nonzero(plan.status == STATUS_CHANGE))
+    invalid = int(np.count_nonzero(plan.status == STATUS_INVALID))
+    conflicts = int(np.count_nonzero(plan.status == STATUS_CONFLICT))
+    return BatchResult(len(plan.cameras), changed, len(plan.cameras) - changed - invalid - conflicts, invalid,
+                       set_attrs, changed_curves, conflicts)
+
+
+def format_rows(plan):
+    """One fixed-width line per camera for the batch preview table."""
+    targets = plan.targets
+    new_focal_length = np.where(plan.status == STATUS_CONFLICT, plan.focal_length, targets.focal_length)
+    lines = []
+    for i, camera in enumerate(plan.cameras):
+        lines.append(f"{camera.rsplit('|', 1)[-1]:<24} "
+                     f"{plan.hfa[i]:.4f} > {targets.hfa[i]:.4f}  {plan.vfa[i]:.4f} > {targets.vfa[i]:.4f}  "
+                     f"{plan.focal_length[i]:7.2f} > {new_focal_length[i]:7.2f}  {plan.status[i]}")
+    return lines
+
+
+def summarize(plan):
+    changed = int(np.count_nonzero(plan.status == STATUS_CHANGE))
+    invalid = int(np.count_nonzero(plan.status == STATUS_INVALID))
+    conflicts = int(np.count_nonzero(plan.status == STATUS_CONFLICT))
+    text = (f"{len(plan.cameras)} cameras: {changed} to change, "
+            f"{len(plan.cameras) - changed - invalid - conflicts} already at target")
+    if conflicts: text += f", {conflicts} with a shared focal curve that cannot be scaled"
+    return text + (f", {invalid} invalid" if invalid else "")
@@ -0,0 +1,112 @@
+# cameraApertureFix - event-driven camera sync
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Keeps the tool window in step with the scene through scriptJobs instead of
+# re-querying the selection on every field edit. A SelectionChanged job and
+# attributeChange jobs on the loaded camera's filmback and focal length call
+# back into the window, which coalesces them into one deferred update per
+# idle tick. Selected transforms are resolved to camera shapes through a cache
+# that DAG events (creation, renames, undo, scene changes) clear; those events
+# also call back as attribute changes, so the window can look the loaded
+# camera up again by its UUID, which survives renames. Every job
+# is parented to the window and killed by stop(), which the window calls when
+# it is closed.
+
+import maya.cmds as cmds
+
+CAMERA_ATTRS = ("horizontalFilmAperture", "verticalFilmAperture", "focalLength")
+DAG_EVENTS = ("DagObjectCreated", "NameChanged", "Undo", "Redo", "SceneOpened", "NewSceneOpened")
+
+
+class CameraSync(object):
+    def __init__(self, on_selection, on_attributes, on_deleted, parent=None):
+        self.on_selection = on_selection
+        self.on_attributes = on_attributes
+        self.on_deleted = on_deleted
+        self.parent = parent
+        self.camera_shape = None
+        self._transform = None
+        self._camera_uuid = None
+        self._shapes = {}
+        self._scene_jobs = []
+        self._camera_jobs = []
+
+    @property
+    def running(self):
+        return bool(self._scene_jobs)
+
+    def _job(self, **flags):
+        if self.parent: flags["parent"] = self.parent
+        return cmds.scriptJob(**flags)
+
+    def camera_for(self, transform):
+        """Return the camera shape under transform, or None. Cached until the DAG changes."""
+        if transform not in self._shapes:
+            # Full paths: the journal resolves cameras by UUID, which needs unique names.
+            shapes = cmds.listRelatives(transform, shapes=True, type='camera', fullPath=True)
+            self._shapes[transform] = shapes[0] if shapes else None
+        return self._shapes[transform]
+
+    def selected_camera(self):
+        """Return (transform, shape) of the first selected node if it is a camera transform, else (None, None)."""
+        selection = cmds.ls(selection=True)
+        if not selection: return None, None
+        shape = self.camera_for(selection[0])
+        return (selection[0], shape) if shape else (None, None)
+
+    def watched_camera(self):
+        """Return (transform, shape) of the watched camera under its current name, or (None, None) if it is gone."""
+        if not self._camera_uuid: return None, None
+        found = cmds.ls(self._camera_uuid, long=True)
+        if not found: return None, None
+        if found[0] == self.camera_shape: return self._transform, found[0]
+        parents = cmds.listRelatives(found[0], parent=True)
+        return (parents[0] if parents else None), found[0]
+
+    def invalidate(self):
+        self._shapes.clear()
+
+    def _dag_changed(self, *args):
+        self.invalidate()
+        if self.camera_shape: self.on_attributes()
+
+    def start(self):
+        """Subscribe to selection and DAG events. Does nothing if already running."""
+        if self.running: return
+        self.invalidate()
+        self._scene_jobs.append(self._job(event=["SelectionChanged", self.on_selection]))
+        for event in DAG_EVENTS:
+            self._scene_jobs.append(self._job(event=[event, self._dag_changed]))
+
+    def watch(self, camera_shape, transform=None):
+        """Follow attribute changes and deletion of camera_shape, replacing the camera watched before."""
+        self._kill(self._camera_jobs)
+        self.camera_shape, self._transform = camera_shape, transform
+        self._camera_uuid = (cmds.ls(camera_shape, uuid=True) or [None])[0] if camera_shape else None
+        if not camera_shape or not self.running: return
+        plugs = [f"{camera_shape}.{attr}" for attr in CAMERA_ATTRS]
+        for plug in plugs:
+            self._camera_jobs.append(self._job(attributeChange=[plug, self.on_attributes]))
+        self._camera_jobs.append(self._job(nodeDeleted=[camera_shape, self.on_deleted]))
+        # Animated values change with the current time without an attributeChange.
+        if any(cmds.listConnections(plug, source=True, destination=False) for plug in plugs):
+            self._camera_jobs.append(self._job(event=["timeChanged", self.on_attributes]))
+
+    def stop(self):
+        """Kill every job. Safe to call when the jobs already died with the window."""
+        self._kill(self._camera_jobs)
+        self._kill(self._scene_jobs)
+        self.camera_shape = self._transform = self._camera_uuid = None
+        self.invalidate()
+
+    @staticmethod
+    def _kill(jobs):
+        for job in jobs:
+            try:
+                cmds.scriptJob(kill=job, force=True)
+            except RuntimeError:
+                pass  # Already killed with its parent window.
+        del jobs[:]
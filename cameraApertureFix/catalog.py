@@ -0,0 +1,143 @@
+# cameraApertureFix - preset catalog
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# The built-in PRESETS plus any external catalogs (JSON or CSV) listed in the
+# CAMERA_APERTURE_FIX_PRESETS environment variable, loaded on first use into
+# flat NumPy arrays. Nearest-sensor lookups are a single vectorized pass over
+# the arrays, which stays well under a millisecond for thousands of bodies.
+
+import csv
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from cameraApertureFix.engine import MM_PER_INCH, convert_to_inches
+from cameraApertureFix.presets import PRESETS
+
+CATALOG_ENV = "CAMERA_APERTURE_FIX_PRESETS"
+
+PresetMatch = namedtuple("PresetMatch", ["name", "distance", "deviation_mm"])
+
+_catalog = None
+
+
+def _to_mm(value, unit):
+    return float(value) * MM_PER_INCH if str(unit).lower() == "inch" else float(value)
+
+
+def _records_from_dict(presets):
+    for name, preset in presets.items():
+        unit = preset.get("unit", "mm")
+        yield name, _to_mm(preset.get("horizontal", 0.0), unit), _to_mm(preset.get("vertical", 0.0), unit)
+
+
+def load_records(path):
+    """Yield (name, horizontal_mm, vertical_mm) from a JSON or CSV catalog file.
+
+    JSON may use the PRESETS layout ({name: {"horizontal", "vertical", "unit"}})
+    or a list of objects with a "name" key. CSV needs name, horizontal and
+    vertical columns and an optional unit column.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as catalog_file:
+            for row in csv.DictReader(catalog_file):
+                unit = row.get("unit") or "mm"
+                yield row["name"], _to_mm(row["horizontal"], unit), _to_mm(row["vertical"], unit)
+        return
+
+    with open(path, encoding="utf-8") as catalog_file:
+        data = json.load(catalog_file)
+    if isinstance(data, dict):
+        yield from _records_from_dict(data)
+    else:
+        yield from _records_from_dict({entry["name"]: entry for entry in data})
+
+
+class PresetCatalog(object):
+    def __init__(self, records):
+        merged = {}
+        for name, horizontal_mm, vertical_mm in records:
+            merged[name] = (horizontal_mm, vertical_mm)
+        self.names = list(merged.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        values = np.array(list(merged.values()), dtype=np.float64).reshape(-1, 2)
+        self.horizontal_mm = values[:, 0].copy()
+        self.vertical_mm = values[:, 1].copy()
+        self.horizontal = convert_to_inches(self.horizontal_mm, "mm")
+        self.vertical = convert_to_inches(self.vertical_mm, "mm")
+        valid = (self.horizontal_mm > 0) & (self.vertical_mm > 0)
+        self._log_width = np.log(np.where(valid, self.horizontal_mm, 1.0))
+        self._log_aspect = np.log(np.where(valid, self.horizontal_mm / np.where(valid, self.vertical_mm, 1.0), 1.0))
+        self._valid = valid
+        self._search_keys = [name.lower() for name in self.names]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def filmback_mm(self, name):
+        i = self.index[name]
+        return float(self.horizontal_mm[i]), float(self.vertical_mm[i])
+
+    def nearest(self, hfa_mm, vfa_mm, k=5, aspect_weight=1.0):
+        """Return the k presets closest to a filmback, nearest first.
+
+        Distance combines the relative difference in width and in aspect ratio
+        (both in log space), so a crop mode and a full sensor of the same shape
+        rank by size, and equal widths rank by aspect.
+        """
+        if hfa_mm <= 0 or vfa_mm <= 0 or not len(self): return []
+        distance = np.hypot(self._log_width - np.log(hfa_mm),
+                            aspect_weight * (self._log_aspect - np.log(hfa_mm / vfa_mm)))
+        distance = np.where(self._valid, distance, np.inf)
+        k = min(k, len(self))
+        candidates = np.argpartition(distance, k - 1)[:k]
+        candidates = candidates[np.argsort(distance[candidates], kind="stable")]
+        deviation = np.maximum(np.abs(self.horizontal_mm[candidates] - hfa_mm),
+                               np.abs(self.vertical_mm[candidates] - vfa_mm))
+        return [PresetMatch(self.names[i], float(d), float(dev))
+                for i, d, dev in zip(candidates.tolist(), distance[candidates].tolist(), deviation.tolist())]
+
+    def search(self, text, limit=None):
+        """Return preset names containing every whitespace-separated word of text, case-insensitively."""
+        words = text.lower().split()
+        if not words:
+            matches = self.names
+        else:
+            matches = [name for name, key in zip(self.names, self._search_keys) if all(w in key for w in words)]
+        return matches[:limit] if limit else list(matches)
+
+
+def catalog_paths():
+    return [p for p in os.environ.get(CATALOG_ENV, "").split(os.pathsep) if p]
+
+
+def get_catalog():
+    """Return the shared catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        reload_catalog()
+    return _catalog
+
+
+def reload_catalog(paths=None):
+    """Rebuild the shared catalog from PRESETS and paths (default: CAMERA_APERTURE_FIX_PRESETS)."""
+    global _catalog
+    records = list(_records_from_dict(PRESETS))
+    for path in catalog_paths() if paths is None else paths:
+        try:
+            # Read the whole file first, so a bad row leaves none of its presets behind.
+            loaded = list(load_records(path))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: could not load preset catalog {path}: {e}")
+            continue
+        records.extend(loaded)
+    _catalog = PresetCatalog(records)
+    return _catalog
@@ -0,0 +1,161 @@
+# cameraApertureFix - bulk animCurve retargeting
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Scales focal length animCurves without cmds.scaleKey. Every curve is read
+# with a fixed number of queries (independent of its key count) into one
+# contiguous block of NumPy arrays, scaled in one batched operation and written
+# back with a single keyTimeValue setAttr per curve. Tangents only need an
+# explicit write where Maya does not recompute them, which is fixed tangents;
+# setting an angle makes a tangent fixed, so auto, spline and other tangents
+# are left for Maya to recompute from the new values, as scaleKey does.
+
+from collections import namedtuple
+
+import maya.cmds as cmds
+import numpy as np
+
+CurveBlock = namedtuple(
+    "CurveBlock",
+    ["curves", "offsets", "times", "values", "in_angle", "out_angle",
+     "in_weight", "out_weight", "in_fixed", "out_fixed", "weighted"]
+)
+
+
+def focal_curves_by_camera(camera_shapes):
+    """Return the list of animCurves driving focalLength for each of camera_shapes."""
+    return [cmds.listConnections(shape + ".focalLength", type="animCurve", scn=True) or [] for shape in camera_shapes]
+
+
+def curve_destinations(curve_names):
+    """Return {curve: [plugs it drives]} for curve_names, the plugs as "node.attribute"."""
+    return {curve: cmds.listConnections(curve + ".output", source=False, destination=True, plugs=True) or []
+            for curve in curve_names}
+
+
+def collect_focal_curves(camera_shapes, scales, connected=None):
+    """Map every animCurve driving focalLength on camera_shapes to its value scale.
+
+    Curves shared between cameras are returned once. A shared curve whose
+    cameras disagree on the scale is left out with a warning, since no single
+    scale can be correct for all of them. connected is an optional result of
+    focal_curves_by_camera for the same cameras, to avoid querying again.
+    """
+    if connected is None: connected = focal_curves_by_camera(camera_shapes)
+    curve_scales = {}
+    conflicts = set()
+    for camera_curves, scale in zip(connected, scales):
+        for curve in camera_curves:
+            if curve in curve_scales and not np.isclose(curve_scales[curve], scale):
+                conflicts.add(curve)
+            curve_scales.setdefault(curve, float(scale))
+    for curve in conflicts:
+        cmds.warning(f"{curve} drives cameras with different focal length scales. Curve not changed.")
+        del curve_scales[curve]
+    return curve_scales
+
+
+def read_curves(curves):
+    offsets = [0]
+    times, values = [], []
+    in_angle, out_angle, in_weight, out_weight = [], [], [], []
+    in_fixed, out_fixed, weighted = [], [], []
+
+    for curve in curves:
+        count = cmds.keyframe(curve, q=True, keyframeCount=True) or 0
+        if count:
+            time_values = cmds.getAttr(f"{curve}.ktv[0:{count - 1}]")
+            times.extend(tv[0] for tv in time_values)
+            values.extend(tv[1] for tv in time_values)
+            in_angle.extend(cmds.keyTangent(curve, q=True, inAngle=True))
+            out_angle.extend(cmds.keyTangent(curve, q=True, outAngle=True))
+            in_weight.extend(cmds.keyTangent(curve, q=True, inWeight=True))
+            out_weight.extend(cmds.keyTangent(curve, q=True, outWeight=True))
+            in_fixed.extend(t == "fixed" for t in cmds.keyTangent(curve, q=True, inTangentType=True))
+            out_fixed.extend(t == "fixed" for t in cmds.keyTangent(curve, q=True, outTangentType=True))
+        weighted.append(bool((cmds.keyTangent(curve, q=True, weightedTangents=True) or [False])[0]))
+        offsets.append(offsets[-1] + count)
+
+    return CurveBlock(
+        curves=list(curves), offsets=np.array(offsets, dtype=np.intp),
+        times=np.array(times, dtype=np.float64), values=np.array(values, dtype=np.float64),
+        in_angle=np.array(in_angle, dtype=np.float64), out_angle=np.array(out_angle, dtype=np.float64),
+        in_weight=np.array(in_weight, dtype=np.float64), out_weight=np.array(out_weight, dtype=np.float64),
+        in_fixed=np.array(in_fixed, dtype=bool), out_fixed=np.array(out_fixed, dtype=bool),
+        weighted=np.array(weighted, dtype=bool)
+    )
+
+
+def _scale_tangent(angle, weight, scale):
+    radians = np.radians(angle)
+    cos, sin = np.cos(radians), np.sin(radians)
+    new_angle = np.degrees(np.arctan2(sin * scale, cos))
+    new_weight = weight * np.hypot(cos, sin * scale)
+    return new_angle, new_weight
+
+
+def scale_curves(block, curve_scales):
+    """Return a copy of block with every key value (and tangent) scaled about 0.
+
+    curve_scales holds one scale per curve in block.curves.
+    """
+    per_key_scale = np.repeat(np.asarray(curve_scales, dtype=np.float64), np.diff(block.offsets))
+    in_angle, in_weight = _scale_tangent(block.in_angle, block.in_weight, per_key_scale)
+    out_angle, out_weight = _scale_tangent(block.out_angle, block.out_weight, per_key_scale)
+    return block._replace(
+        values=block.values * per_key_scale,
+        in_angle=in_angle, out_angle=out_angle, in_weight=in_weight, out_weight=out_weight
+    )
+
+
+def write_curves(block):
+    for i, curve in enumerate(block.curves):
+        start, end = block.offsets[i], block.offsets[i + 1]
+        if start == end: continue
+
+        time_values = np.empty((end - start) * 2, dtype=np.float64)
+        time_values[0::2] = block.times[start:end]
+        time_values[1::2] = block.values[start:end]
+        cmds.setAttr(f"{curve}.ktv[0:{end - start - 1}]", *time_values.tolist())
+
+        in_fixed, out_fixed = block.in_fixed[start:end], block.out_fixed[start:end]
+        sides = {'inAngle': block.in_angle, 'outAngle': block.out_angle}
+        if block.weighted[i]: sides.update(inWeight=block.in_weight, outWeight=block.out_weight)
+        # Keys with both tangents fixed take one call per run; otherwise only the fixed side is written.
+        for needs_tangent, prefixes in ((in_fixed & out_fixed, ("in", "out")), (in_fixed & ~out_fixed, ("in",)),
+                                        (out_fixed & ~in_fixed, ("out",))):
+            flags = [flag for flag in sides if flag.startswith(prefixes)]
+            columns = [sides[flag][start:end] for flag in flags]
+            for first, last in _tangent_runs(columns, needs_tangent):
+                tangent_flags = {flag: float(column[first]) for flag, column in zip(flags, columns)}
+                cmds.keyTangent(curve, e=True, index=(first, last), **tangent_flags)
+
+
+def _tangent_runs(columns, needs_tangent):
+    """Return (first, last) index ranges of consecutive keys needing a tangent and sharing identical values."""
+    same_as_previous = np.ones(needs_tangent.size, dtype=bool)
+    same_as_previous[0] = False
+    for column in columns:
+        same_as_previous[1:] &= column[1:] == column[:-1]
+    same_as_previous[1:] &= needs_tangent[:-1]
+    keys = np.flatnonzero(needs_tangent)
+    if not keys.size: return []
+    is_run_start = ~same_as_previous[keys]
+    is_run_end = np.append(is_run_start[1:], True)
+    return zip(keys[is_run_start].tolist(), keys[is_run_end].tolist())
+
+
+def retarget_focal_curves(camera_shapes, scales, connected=None):
+    """Scale the focal length animCurves of camera_shapes by scales.
+
+    Returns the list of curves that were changed.
+    """
+    curve_scales = collect_focal_curves(camera_shapes, scales, connected)
+    if not curve_scales: return []
+
+    curves = list(curve_scales.keys())
+    block = read_curves(curves)
+    write_curves(scale_curves(block, [curve_scales[c] for c in curves]))
+    return curves
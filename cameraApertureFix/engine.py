@@ -0,0 +1,227 @@
+# cameraApertureFix - filmback engine
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Headless filmback / FOV math. Nothing in here touches maya.cmds: every
+# function takes plain numbers or NumPy arrays (one element per camera) so the
+# same rules drive the UI preview, the Apply button and batch pipeline tools.
+
+from collections import namedtuple
+
+import numpy as np
+
+MM_PER_INCH = 25.4
+FL_SCALE_TOLERANCE = 1e-6
+EXACT_TOLERANCE_MM = 1e-3
+DEFAULT_TOLERANCE_MM = 0.5
+# Cameras x presets cells compared at once by classify_filmbacks.
+CLASSIFY_BLOCK_CELLS = 1 << 18
+
+MATCH_EXACT = "exact"
+MATCH_TOLERANCE = "tolerance"
+MATCH_UNKNOWN = "unknown"
+
+FilmbackTargets = namedtuple(
+    "FilmbackTargets",
+    ["hfa", "vfa", "aspect_ratio", "focal_length", "fl_scale",
+     "hfa_valid", "vfa_valid", "fl_changed", "preset_active"]
+)
+
+FilmbackMatch = namedtuple("FilmbackMatch", ["preset", "deviation_mm", "status"])
+
+# Every preset applied to every camera: arrays indexed [mode, preset, camera]
+# (plus frame for focal_length and fl_scale when frames were given).
+PresetMatrix = namedtuple("PresetMatrix", ["presets", "hfa", "vfa", "aspect_ratio", "focal_length", "fl_scale"])
+MATRIX_MODES = ("maintain aspect", "preset aspect")
+
+# A camera as read from a scene or file: apertures in inches, focal length in
+# mm, and the names of the animCurves driving its focal length.
+CameraFilmback = namedtuple("CameraFilmback", ["camera", "hfa", "vfa", "focal_length", "focal_curves"])
+
+# The tool's settings, as chosen in the window: target apertures are in unit.
+ConformSettings = namedtuple(
+    "ConformSettings",
+    ["preset", "target_hfa", "target_vfa", "unit", "maintain_aspect_ratio", "adjust_focal_length"]
+)
+ConformSettings.__new__.__defaults__ = (None, None, None, "Inch", True, True)
+
+def convert_aperture(aperture_inches, to_unit):
+    if to_unit == "mm": return aperture_inches * MM_PER_INCH
+    return aperture_inches
+
+
+def convert_to_inches(aperture_value, from_unit):
+    if from_unit == "mm": return aperture_value / MM_PER_INCH
+    return aperture_value
+
+
+def initial_aspect_ratio(hfa, vfa):
+    hfa = np.asarray(hfa, dtype=np.float64)
+    vfa = np.asarray(vfa, dtype=np.float64)
+    safe_vfa = np.where(vfa != 0, vfa, 1.0)
+    return np.where(vfa != 0, hfa / safe_vfa, 1.0)
+
+
+def field_of_view(aperture_inches, focal_length):
+    """Angle of view in degrees for an aperture (inches) and focal length (mm); 0 where the focal length is not positive."""
+    aperture_mm = np.asarray(aperture_inches, dtype=np.float64) * MM_PER_INCH
+    focal_length = np.asarray(focal_length, dtype=np.float64)
+    valid = focal_length > 0
+    return np.where(valid, np.degrees(2.0 * np.arctan(aperture_mm / (2.0 * np.where(valid, focal_length, 1.0)))), 0.0)
+
+
+def preset_table():
+    """Return (names, index, horizontal_inches, vertical_inches) for the preset catalog."""
+    from cameraApertureFix.catalog import get_catalog
+    catalog = get_catalog()
+    return catalog.names, catalog.index, catalog.horizontal, catalog.vertical
+
+
+def preset_apertures(preset, count):
+    """Resolve preset names to (active, horizontal_inches, vertical_inches) arrays of length count."""
+    names, index, horizontal, vertical = preset_table()
+    if preset is None or isinstance(preset, str):
+        idx = np.full(count, index.get(preset, -1), dtype=np.intp)
+    else:
+        idx = np.fromiter((index.get(p, -1) for p in preset), dtype=np.intp, count=count)
+    active = idx >= 0
+    safe_idx = np.where(active, idx, 0)
+    return active, np.where(active, horizontal[safe_idx], 0.0), np.where(active, vertical[safe_idx], 0.0)
+
+
+def resolve_targets(hfa, vfa, focal_length, target_hfa=None, target_vfa=None, preset=None,
+                    maintain_aspect_ratio=True, adjust_focal_length=True, unit="Inch"):
+    """Resolve new filmbacks and focal lengths for a batch of cameras.
+
+    hfa, vfa and focal_length are the cameras' current values (inches / mm).
+    target_hfa and target_vfa are the requested apertures in ``unit`` and are
+    only used where no preset is active (target_vfa only in manual mode).
+    preset is a single preset name or one name per camera; "None" or unknown
+    names mean no preset. Every argument broadcasts against the others.
+    """
+    hfa, vfa, focal_length, maintain, adjust = np.broadcast_arrays(
+        np.asarray(hfa, dtype=np.float64), np.asarray(vfa, dtype=np.float64),
+        np.asarray(focal_length, dtype=np.float64),
+        np.asarray(maintain_aspect_ratio, dtype=bool), np.asarray(adjust_focal_length, dtype=bool))
+    count = hfa.size
+    shape = hfa.shape
+
+    if target_hfa is None:
+        new_hfa = hfa
+    else:
+        new_hfa = np.broadcast_to(convert_to_inches(np.asarray(target_hfa, dtype=np.float64), unit), shape)
+    if target_vfa is None:
+        manual_vfa = vfa
+    else:
+        manual_vfa = np.broadcast_to(convert_to_inches(np.asarray(target_vfa, dtype=np.float64), unit), shape)
+
+    preset_active, preset_h, preset_v = preset_apertures(preset, count)
+    preset_active = preset_active.reshape(shape)
+    new_hfa = np.where(preset_active, preset_h.reshape(shape), new_hfa)
+    hfa_valid = new_hfa > 0
+
+    aspect = initial_aspect_ratio(hfa, vfa)
+    safe_aspect = np.where(aspect != 0, aspect, 1.0)
+    maintained_vfa = np.where(aspect != 0, new_hfa / safe_aspect, vfa)
+
+    manual_mode = ~maintain & ~preset_active
+    vfa_valid = ~manual_mode | (manual_vfa > 0)
+    new_vfa = np.where(maintain, maintained_vfa,
+                       np.where(preset_active, preset_v.reshape(shape),
+                                np.where(vfa_valid, manual_vfa, vfa)))
+
+    safe_new_vfa = np.where(new_vfa > 0, new_vfa, 1.0)
+    new_aspect = np.where(new_vfa > 0, new_hfa / safe_new_vfa, np.inf)
+
+    can_scale = adjust & hfa_valid & (hfa > 0)
+    safe_hfa = np.where(hfa > 0, hfa, 1.0)
+    fl_scale = np.where(can_scale, new_hfa / safe_hfa, 1.0)
+    safe_fl_scale = np.where(fl_scale != 0, fl_scale, 1.0)
+    fl_changed = can_scale & (np.abs(1.0 / safe_fl_scale - 1.0) > FL_SCALE_TOLERANCE)
+
+    return FilmbackTargets(
+        hfa=new_hfa, vfa=new_vfa, aspect_ratio=new_aspect,
+        focal_length=focal_length * fl_scale, fl_scale=fl_scale,
+        hfa_valid=hfa_valid, vfa_valid=vfa_valid, fl_changed=fl_changed,
+        preset_active=preset_active
+    )
+
+
+def resolve_for_cameras(cameras, settings):
+    """Resolve ConformSettings for a sequence of CameraFilmback records in one call."""
+    return resolve_targets(
+        [c.hfa for c in cameras], [c.vfa for c in cameras], [c.focal_length for c in cameras],
+        target_hfa=settings.target_hfa, target_vfa=settings.target_vfa, preset=settings.preset,
+        maintain_aspect_ratio=settings.maintain_aspect_ratio,
+        adjust_focal_length=settings.adjust_focal_length, unit=settings.unit
+    )
+
+
+def preset_matrix(hfa, vfa, focal_length, presets=None):
+    """Resolve every preset for every camera, in both aspect modes, as one broadcast.
+
+    hfa and vfa hold one value per camera (inches). focal_length holds one
+    value per camera, or a (cameras, frames) array of per-frame values.
+    presets defaults to the whole catalog. Mode 0 maintains each camera's
+    aspect ratio, mode 1 uses the preset's; both adjust the focal length, so
+    every cell equals what resolve_targets returns for that preset and camera.
+    """
+    names, index, horizontal, vertical = preset_table()
+    if presets is None:
+        presets, preset_h, preset_v = list(names), horizontal, vertical
+    else:
+        presets = list(presets)
+        idx = np.array([index[name] for name in presets], dtype=np.intp)
+        preset_h, preset_v = horizontal[idx], vertical[idx]
+    hfa = np.asarray(hfa, dtype=np.float64)[None, :]
+    vfa = np.asarray(vfa, dtype=np.float64)[None, :]
+    focal_length = np.asarray(focal_length, dtype=np.float64)
+    preset_h = preset_h[:, None]
+    preset_v = preset_v[:, None]
+    shape = (len(MATRIX_MODES), preset_h.shape[0], hfa.shape[1])
+
+    aspect = initial_aspect_ratio(hfa, vfa)
+    maintained_vfa = np.where(aspect != 0, preset_h / np.where(aspect != 0, aspect, 1.0), vfa)
+    new_hfa = np.broadcast_to(preset_h, shape)
+    new_vfa = np.stack([maintained_vfa, np.broadcast_to(preset_v, shape[1:])])
+    aspect_ratio = np.where(new_vfa > 0, new_hfa / np.where(new_vfa > 0, new_vfa, 1.0), np.inf)
+
+    fl_scale = np.where((preset_h > 0) & (hfa > 0), preset_h / np.where(hfa > 0, hfa, 1.0), 1.0)
+    if focal_length.ndim == 2: fl_scale = fl_scale[:, :, None]
+    new_focal_length = fl_scale * focal_length[None]
+    return PresetMatrix(presets, new_hfa, new_vfa, aspect_ratio,
+                        np.broadcast_to(new_focal_length, (2,) + new_focal_length.shape),
+                        np.broadcast_to(fl_scale, (2,) + fl_scale.shape))
+
+
+def classify_filmbacks(hfa, vfa, tolerance_mm=DEFAULT_TOLERANCE_MM):
+    """Match filmbacks (inches) against the preset catalog.
+
+    Returns the nearest preset name per camera, its largest per-axis deviation
+    in mm and a status: MATCH_EXACT, MATCH_TOLERANCE (within tolerance_mm) or
+    MATCH_UNKNOWN. Each distinct filmback is compared once, against the
+    catalog in blocks of cameras, so memory stays bounded for large catalogs.
+    """
+    names, index, horizontal, vertical = preset_table()
+    hfa = np.atleast_1d(np.asarray(hfa, dtype=np.float64))
+    vfa = np.atleast_1d(np.asarray(vfa, dtype=np.float64))
+    filmbacks, inverse = np.unique(np.stack([hfa, vfa], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    unique_nearest = np.empty(len(filmbacks), dtype=np.intp)
+    unique_deviation = np.empty(len(filmbacks), dtype=np.float64)
+    block = max(1, CLASSIFY_BLOCK_CELLS // max(len(names), 1))
+    for start in range(0, len(filmbacks), block):
+        h, v = filmbacks[start:start + block, 0], filmbacks[start:start + block, 1]
+        deviation = np.abs(h[:, None] - horizontal[None, :])
+        np.maximum(deviation, np.abs(v[:, None] - vertical[None, :]), out=deviation)
+        nearest = np.argmin(deviation, axis=1)
+        unique_nearest[start:start + block] = nearest
+        unique_deviation[start:start + block] = deviation[np.arange(len(h)), nearest] * MM_PER_INCH
+    nearest = unique_nearest[inverse]
+    nearest_deviation = unique_deviation[inverse]
+    status = np.where(nearest_deviation <= EXACT_TOLERANCE_MM, MATCH_EXACT,
+                      np.where(nearest_deviation <= tolerance_mm, MATCH_TOLERANCE, MATCH_UNKNOWN))
+    return FilmbackMatch(preset=[names[i] for i in nearest.tolist()],
+                         deviation_mm=nearest_deviation, status=status)
@@ -0,0 +1,211 @@
+# cameraApertureFix - per-frame camera export
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Streams per-frame filmback, focal length and field of view of a camera to
+# JSON Lines (for QC tools) or a Nuke .chan file (for compositing). Frames are
+# sampled with framerange's chunked bulk reads and handed on as a generator of
+# FrameChunk arrays, so a 100,000-frame shot never sits in memory at once.
+# The formatters take plain arrays and do not touch maya.cmds.
+#
+# export_cameras writes many cameras to separate files. maya.cmds may only be
+# called from the main thread, so sampling stays there; a thread pool formats
+# and writes the previous chunk of every camera while the next one is read.
+
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import maya.cmds as cmds
+import numpy as np
+
+from cameraApertureFix import engine, framerange
+
+FORMAT_JSONL = "jsonl"
+FORMAT_CHAN = "chan"
+FORMATS = (FORMAT_JSONL, FORMAT_CHAN)
+CHUNK_FRAMES = 10000
+
+WORLD_MATRIX = "worldMatrix[0]"
+# The plugs of a transform whose inputs can move it; display layers, set
+# membership and message connections do not.
+TRANSFORM_PLUGS = tuple(
+    f"{attr}{axis}" for attr in ("translate", "rotate", "scale", "shear", "rotatePivot", "rotatePivotTranslate",
+                                 "scalePivot", "scalePivotTranslate", "rotateAxis")
+    for axis in ("", "X", "Y", "Z") if not (attr == "shear" and axis)
+) + ("shearXY", "shearXZ", "shearYZ", "rotateOrder", "offsetParentMatrix", "inheritsTransform")
+# Maya's rotateOrder enum; the first axis is applied first.
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+
+# One chunk of consecutive frames: apertures in inches, focal length in mm,
+# fields of view in degrees. transform is a (frames, 6) world-space
+# translate/rotate array, or None when it was not sampled.
+FrameChunk = namedtuple("FrameChunk", ["frame", "hfa", "vfa", "focal_length", "hfov", "vfov", "transform"])
+
+
+def format_for_path(path):
+    """Return the export format implied by path's extension, defaulting to JSON Lines."""
+    return FORMAT_CHAN if path.lower().endswith("." + FORMAT_CHAN) else FORMAT_JSONL
+
+
+def make_chunk(frame, hfa, vfa, focal_length, transform=None):
+    """Build a FrameChunk from per-frame arrays, deriving both fields of view."""
+    hfa = np.asarray(hfa, dtype=np.float64)
+    vfa = np.asarray(vfa, dtype=np.float64)
+    focal_length = np.asarray(focal_length, dtype=np.float64)
+    return FrameChunk(np.asarray(frame, dtype=np.float64), hfa, vfa, focal_length,
+                      engine.field_of_view(hfa, focal_length), engine.field_of_view(vfa, focal_length), transform)
+
+
+def matrix_channels(matrices, rotate_order=0):
+    """Decompose (frames, 16) Maya world matrices into (frames, 6) translate XYZ and rotate XYZ in degrees.
+
+    Rotations are extracted in rotate_order (Maya's enum); scale is divided
+    out and shear ignored.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    axes = matrices[:, :3, :3]
+    # Maya matrices multiply row vectors; transpose for the column-vector formulas below.
+    rotation = (axes / np.linalg.norm(axes, axis=2, keepdims=True)).transpose(0, 2, 1)
+    i, j, k = ("xyz".index(axis) for axis in ROTATE_ORDERS[int(rotate_order)])
+    sign = 1.0 if (j - i) % 3 == 1 else -1.0
+    angles = np.empty((matrices.shape[0], 3))
+    angles[:, i] = np.arctan2(sign * rotation[:, k, j], rotation[:, k, k])
+    angles[:, j] = np.arcsin(np.clip(-sign * rotation[:, k, i], -1.0, 1.0))
+    angles[:, k] = np.arctan2(sign * rotation[:, j, i], rotation[:, i, i])
+    return np.column_stack([matrices[:, 3, :3], np.degrees(angles)])
+
+
+def _world_sampler(transform):
+    """Return a function mapping a frame array to transform's world translate/rotate at those frames."""
+    plug = f"{transform}.{WORLD_MATRIX}"
+    rotate_order = cmds.getAttr(transform + ".rotateOrder")
+    path = transform.split("|")
+    hierarchy = ["|".join(path[:i]) for i in range(1, len(path) + 1) if path[i - 1]]
+    plugs = [f"{node}.{attr}" for node in hierarchy for attr in TRANSFORM_PLUGS]
+    if not cmds.listConnections(plugs, source=True, destination=False, scn=True):
+        # Nothing moves the transform or its parents: the world matrix is the same on every frame.
+        channels = matrix_channels(cmds.getAttr(plug), rotate_order)
+        return lambda times: np.repeat(channels, times.size, axis=0)
+    return lambda times: matrix_channels([cmds.getAttr(plug, time=t) for t in times.tolist()], rotate_order)
+
+
+def sample_camera(camera_shape, start, end, step=1.0, chunk_frames=CHUNK_FRAMES, transform=False):
+    """Yield FrameChunks of camera_shape over [start, end].
+
+    With transform=True the world-space translate and rotate of the camera's
+    transform are sampled as well, for .chan export. Animated hierarchies are
+    read one world matrix per frame.
+    """
+    hfa_at = framerange.sampler(camera_shape + ".horizontalFilmAperture")
+    vfa_at = framerange.sampler(camera_shape + ".verticalFilmAperture")
+    fl_at = framerange.sampler(camera_shape + ".focalLength")
+    transform_at = None
+    if transform:
+        transform_at = _world_sampler(cmds.listRelatives(camera_shape, parent=True, fullPath=True)[0])
+
+    frame_count = int(np.floor((end - start) / step + 1e-9)) + 1
+    for first in range(0, frame_count, chunk_frames):
+        frames = start + step * np.arange(first, min(first + chunk_frames, frame_count), dtype=np.float64)
+        channels = transform_at(frames) if transform_at else None
+        yield make_chunk(frames, hfa_at(frames), vfa_at(frames), fl_at(frames), channels)
+
+
+def format_jsonl(chunk, camera, unit="Inch"):
+    """Format a FrameChunk as JSON Lines, one object per frame; apertures in unit."""
+    prefix = '{"camera": ' + json.dumps(camera) + ', "frame": '
+    hfa = engine.convert_aperture(chunk.hfa, unit)
+    vfa = engine.convert_aperture(chunk.vfa, unit)
+    return "".join(
+        f'{prefix}{frame:g}, "hfa": {h:.10g}, "vfa": {v:.10g}, "focal_length": {fl:.10g}, '
+        f'"hfov": {hfov:.10g}, "vfov": {vfov:.10g}}}\n'
+        for frame, h, v, fl, hfov, vfov in zip(chunk.frame.tolist(), hfa.tolist(), vfa.tolist(),
+                                              chunk.focal_length.tolist(), chunk.hfov.tolist(),
+                                              chunk.vfov.tolist())
+    )
+
+
+def format_chan(chunk):
+    """Format a FrameChunk as Nuke .chan lines: frame, translate XYZ, rotate XYZ, vertical field of view.
+
+    Without sampled transform channels, translate and rotate are written as 0.
+    Nuke's camera must use the same rotation order as the Maya transform.
+    """
+    channels = chunk.transform if chunk.transform is not None else np.zeros((chunk.frame.size, 6))
+    return "".join(
+        f"{frame:g} {tx:.6f} {ty:.6f} {tz:.6f} {rx:.6f} {ry:.6f} {rz:.6f} {vfov:.6f}\n"
+        for frame, (tx, ty, tz, rx, ry, rz), vfov in zip(chunk.frame.tolist(), channels.tolist(),
+                                                           chunk.vfov.tolist())
+    )
+
+
+def format_chunk(chunk, camera, fmt=FORMAT_JSONL, unit="Inch"):
+    if fmt == FORMAT_CHAN: return format_chan(chunk)
+    return format_jsonl(chunk, camera, unit)
+
+
+def write_chunks(chunks, stream, camera, fmt=FORMAT_JSONL, unit="Inch"):
+    """Write a stream of FrameChunks to a text stream. Returns the number of frames written."""
+    frames = 0
+    for chunk in chunks:
+        _write_chunk(stream, chunk, camera, fmt, unit)
+        frames += chunk.frame.size
+    return frames
+
+
+def _playback_range(start, end):
+    if start is None: start = cmds.playbackOptions(q=True, minTime=True)
+    if end is None: end = cmds.playbackOptions(q=True, maxTime=True)
+    return float(start), float(end)
+
+
+def export_camera(camera_shape, path, start=None, end=None, step=1.0, unit="Inch", fmt=None):
+    """Export camera_shape over [start, end] (default: the playback range) to path. Returns frames written."""
+    fmt = fmt or format_for_path(path)
+    start, end = _playback_range(start, end)
+    with open(path, "w", encoding="utf-8") as stream:
+        return write_chunks(sample_camera(camera_shape, start, end, step, transform=fmt == FORMAT_CHAN),
+                            stream, camera_shape.rsplit("|", 1)[-1], fmt, unit)
+
+
+def export_path(directory, camera_shape, fmt=FORMAT_JSONL):
+    """Return <directory>/<camera>.<fmt>, named after camera_shape's full path so same-named cameras differ."""
+    name = camera_shape.strip("|").replace("|", "__").replace(":", "_")
+    return os.path.join(directory, name + "." + fmt)
+
+
+def _write_chunk(stream, chunk, camera, fmt, unit):
+    stream.write(format_chunk(chunk, camera, fmt, unit))
+
+
+def export_cameras(camera_shapes, directory, fmt=FORMAT_JSONL, start=None, end=None, step=1.0, unit="Inch",
+                   threads=None, chunk_frames=CHUNK_FRAMES):
+    """Export each camera to its export_path in directory, one file per camera. Returns the paths written.
+
+    Every round samples one chunk of each camera on the calling thread, then
+    waits for the previous round's writes before handing this round to the
+    pool. At most two chunks per camera are in memory at any time.
+    """
+    start, end = _playback_range(start, end)
+    paths = [export_path(directory, shape, fmt) for shape in camera_shapes]
+    if len(set(paths)) != len(paths): raise ValueError("Two cameras would be exported to the same file.")
+    names = [shape.rsplit("|", 1)[-1] for shape in camera_shapes]
+    streams = []
+    try:
+        for path in paths:
+            streams.append(open(path, "w", encoding="utf-8"))
+        generators = [sample_camera(shape, start, end, step, chunk_frames, transform=fmt == FORMAT_CHAN)
+                      for shape in camera_shapes]
+        with ThreadPoolExecutor(threads) as pool:
+            writes = []
+            for chunks in zip(*generators):
+                for write in writes: write.result()
+                writes = [pool.submit(_write_chunk, stream, chunk, name, fmt, unit)
+                          for stream, chunk, name in zip(streams, chunks, names)]
+            for write in writes: write.result()
+    finally:
+        for stream in streams: stream.close()
+    return paths
@@ -0,0 +1,116 @@
+# cameraApertureFix - frame-range FOV preservation
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# When the horizontal film aperture is animated (lens breathing, or zoom
+# compensation from a solver), a single focal length scale taken at the
+# current frame is wrong on every other frame. retime_focal_length samples the
+# aperture and focal length over a frame range, computes the focal length that
+# keeps each frame's field of view at the new static aperture, and writes it
+# to a fresh animCurve. Frames are processed in chunks of CHUNK_FRAMES: one
+# keyframe -eval call per animated attribute to read, one ktv setAttr to
+# write, so memory does not grow with the length of the shot.
+
+from collections import namedtuple
+
+import maya.cmds as cmds
+import numpy as np
+
+CHUNK_FRAMES = 10000
+DEFAULT_REDUCE_TOLERANCE = 1e-4
+
+RetimeResult = namedtuple("RetimeResult", ["curve", "frames", "keys"])
+
+
+def driving_curve(plug):
+    """Return the animCurve directly driving plug, or None."""
+    anim_curves = cmds.listConnections(plug, source=True, destination=False, type="animCurve", scn=True)
+    return anim_curves[0] if anim_curves else None
+
+
+def is_aperture_animated(camera_shape):
+    return driving_curve(camera_shape + ".horizontalFilmAperture") is not None
+
+
+def sampler(plug):
+    """Return a function mapping a frame array to plug's values at those frames."""
+    curve = driving_curve(plug)
+    if curve:
+        def sample(times):
+            values = cmds.keyframe(curve, q=True, eval=True, absolute=True, time=[(t, t) for t in times.tolist()])
+            return np.asarray(values, dtype=np.float64)
+        return sample
+    if cmds.listConnections(plug, source=True, destination=False, scn=True):
+        # Driven by something other than an animCurve (expression, constraint): evaluate frame by frame.
+        return lambda times: np.array([cmds.getAttr(plug, time=t) for t in times.tolist()], dtype=np.float64)
+    value = cmds.getAttr(plug)
+    return lambda times: np.full(times.size, value, dtype=np.float64)
+
+
+def reduce_keys(times, values, tolerance=DEFAULT_REDUCE_TOLERANCE):
+    """Return the indices of the keys to keep so linear interpolation stays within tolerance of every sample.
+
+    Douglas-Peucker, one level per pass: starting from the first and last
+    keys, every span whose worst sample is off by more than tolerance gets
+    a key at that sample, for all spans at once.
+    """
+    count = values.size
+    if count <= 2: return np.arange(count)
+    samples = np.arange(count)
+    kept = np.array([0, count - 1])
+    while True:
+        error = np.abs(np.interp(times, times[kept], values[kept]) - values)
+        span = np.searchsorted(kept, samples, side="right") - 1
+        span_max = np.maximum.reduceat(error, kept[:-1])
+        worst = (error == span_max[np.minimum(span, kept.size - 2)]) & (error > tolerance)
+        if not worst.any(): return kept
+        _, first = np.unique(span[worst], return_index=True)
+        kept = np.union1d(kept, samples[worst][first])
+
+
+def retime_focal_length(camera_shape, new_hfa, start, end, step=1.0, reduce_tolerance=None,
+                        chunk_frames=CHUNK_FRAMES):
+    """Key focalLength over [start, end] so each frame keeps its field of view with the aperture at new_hfa.
+
+    The result replaces any focal length animation: the old curve is deleted
+    and a new linear animCurve is connected. With reduce_tolerance (mm), keys
+    that linear interpolation reproduces within the tolerance are dropped.
+    Returns a RetimeResult.
+    """
+    hfa_plug = camera_shape + ".horizontalFilmAperture"
+    fl_plug = camera_shape + ".focalLength"
+    hfa_at = sampler(hfa_plug)
+    fl_at = sampler(fl_plug)
+    old_curve = driving_curve(fl_plug)
+
+    frame_count = int(np.floor((end - start) / step + 1e-9)) + 1
+    curve = cmds.createNode("animCurveTU", name=camera_shape.rsplit("|", 1)[-1] + "_focalLength")
+    written = 0
+    for first in range(0, frame_count, chunk_frames):
+        times = start + step * np.arange(first, min(first + chunk_frames, frame_count), dtype=np.float64)
+        hfa = hfa_at(times)
+        focal_length = fl_at(times)
+        valid = hfa > 0
+        new_focal_length = np.where(valid, focal_length * new_hfa / np.where(valid, hfa, 1.0), focal_length)
+        if reduce_tolerance is not None:
+            keep = reduce_keys(times, new_focal_length, reduce_tolerance)
+            times, new_focal_length = times[keep], new_focal_length[keep]
+        time_values = np.empty(times.size * 2, dtype=np.float64)
+        time_values[0::2] = times
+        time_values[1::2] = new_focal_length
+        cmds.setAttr(f"{curve}.ktv[{written}:{written + times.size - 1}]", *time_values.tolist(), size=written + times.size)
+        written += times.size
+
+    cmds.keyTangent(curve, e=True, inTangentType="linear", outTangentType="linear")
+    cmds.connectAttr(curve + ".output", fl_plug, force=True)
+    if old_curve: cmds.delete(old_curve)
+    return RetimeResult(curve, frame_count, written)
+
+
+def set_static(plug, value):
+    """Delete the animCurve driving plug, if any, and set it to value."""
+    curve = driving_curve(plug)
+    if curve: cmds.delete(curve)
+    cmds.setAttr(plug, value)
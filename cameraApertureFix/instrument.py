@@ -0,0 +1,208 @@
+# cameraApertureFix - opt-in cmds instrumentation
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# install() swaps the `cmds` global of the tool's modules for a proxy that times
+# every command and attributes it to the tool function that issued it (found by
+# walking the Python stack, so the tool code carries no markers). uninstall()
+# puts the real module back; nothing is wrapped until install() is called, so
+# the tool runs at full speed when instrumentation is off.
+#
+#   CAMERA_APERTURE_FIX_INSTRUMENT=1    install when the window opens
+#
+#   from cameraApertureFix import instrument
+#   instrument.install()
+#   ...
+#   print(instrument.format_report())
+#   instrument.dump_json("/tmp/cmds_profile.json")
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from collections import Counter, defaultdict
+
+import maya.cmds as cmds
+import numpy as np
+
+INSTRUMENT_ENV = "CAMERA_APERTURE_FIX_INSTRUMENT"
+
+# Tool functions and the section their cmds calls are reported under. The
+# outermost match on the stack wins, so the refresh at the end of an Apply is
+# counted as part of the Apply. "render" is the view model's deferred widget
+# edits.
+SECTIONS = {
+    "create_camera_tool_ui": "open",
+    "apply_new_focal_length": "apply",
+    "apply_batch_to_cameras": "apply",
+    "reset_inputs": "refresh",
+    "refresh": "refresh",
+    "update_data_and_ui": "preview",
+    "update_new_focal_length": "preview",
+    "preview_after_field_edit": "preview",
+    "render_preset_list": "preview",
+    "render": "render",
+    "audit_scene": "audit",
+    "retarget_focal_curves": "apply",
+    "export_camera_frames": "export",
+    "export_batch_cameras": "export",
+    "export_camera": "export",
+    "export_cameras": "export",
+}
+UNATTRIBUTED = "other"
+PERCENTILES = (50, 95, 99)
+
+_proxy = None
+_patched = []
+_profile_request = None
+
+
+class CallRecorder(object):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.durations = defaultdict(list)
+        self.section_counts = defaultdict(Counter)
+        self.section_seconds = Counter()
+
+    def record(self, command, section, seconds):
+        self.durations[command].append(seconds)
+        self.section_counts[section][command] += 1
+        self.section_seconds[section] += seconds
+
+    def summary(self):
+        """Return {"commands": {name: stats}, "sections": {name: stats}}, slowest first."""
+        commands = {}
+        for command, durations in self.durations.items():
+            durations = np.asarray(durations)
+            stats = {"count": int(durations.size), "total_ms": float(durations.sum() * 1000.0)}
+            for percentile, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES) * 1000.0):
+                stats[f"p{percentile}_ms"] = float(value)
+            stats["max_ms"] = float(durations.max() * 1000.0)
+            commands[command] = stats
+        sections = {
+            section: {"count": sum(counts.values()), "total_ms": self.section_seconds[section] * 1000.0,
+                      "commands": dict(counts.most_common())}
+            for section, counts in self.section_counts.items()
+        }
+        return {
+            "commands": dict(sorted(commands.items(), key=lambda item: -item[1]["total_ms"])),
+            "sections": dict(sorted(sections.items(), key=lambda item: -item[1]["total_ms"])),
+        }
+
+
+recorder = CallRecorder()
+
+
+def _issuing_section():
+    section = UNATTRIBUTED
+    frame = sys._getframe(2)
+    while frame is not None:
+        section = SECTIONS.get(frame.f_code.co_name, section)
+        frame = frame.f_back
+    return section
+
+
+class CmdsProxy(object):
+    """Stands in for maya.cmds; every command is timed into a CallRecorder."""
+
+    def __init__(self, target, call_recorder):
+        self._target = target
+        self._recorder = call_recorder
+
+    def __getattr__(self, name):
+        command = getattr(self._target, name)
+        if not callable(command): return command
+        call_recorder = self._recorder
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                call_recorder.record(name, _issuing_section(), clock() - start)
+
+        timed.__name__ = name
+        setattr(self, name, timed)
+        return timed
+
+
+def is_installed():
+    return _proxy is not None
+
+
+def install():
+    """Route the tool's cmds calls through the recording proxy."""
+    global _proxy
+    if _proxy is None:
+        _proxy = CmdsProxy(cmds, recorder)
+    for name, module in list(sys.modules.items()):
+        if not (name.startswith("cameraApertureFix") or name == "__main__"): continue
+        if getattr(module, "cmds", None) is cmds and module is not sys.modules[__name__]:
+            module.cmds = _proxy
+            _patched.append(module)
+    return _proxy
+
+
+def uninstall():
+    global _proxy
+    for module in _patched:
+        if getattr(module, "cmds", None) is _proxy: module.cmds = cmds
+    del _patched[:]
+    _proxy = None
+
+
+def install_from_env():
+    if os.environ.get(INSTRUMENT_ENV, "").lower() not in ("", "0", "false", "no"): install()
+
+
+def set_enabled(enabled):
+    install() if enabled else uninstall()
+
+
+def format_report(summary=None):
+    summary = summary or recorder.summary()
+    lines = [f"{'Command':<20} {'Calls':>7} {'Total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Max ms':>8}"]
+    lines.append("-" * len(lines[0]))
+    for command, stats in summary["commands"].items():
+        lines.append(f"{command:<20} {stats['count']:7d} {stats['total_ms']:10.2f} {stats['p50_ms']:8.3f} "
+                     f"{stats['p95_ms']:8.3f} {stats['p99_ms']:8.3f} {stats['max_ms']:8.3f}")
+    lines.append("")
+    for section, stats in summary["sections"].items():
+        top = ", ".join(f"{command} x{count}" for command, count in list(stats["commands"].items())[:6])
+        lines.append(f"{section:<10} {stats['count']:6d} calls {stats['total_ms']:10.2f} ms   {top}")
+    return "\n".join(lines)
+
+
+def dump_json(path):
+    with open(path, "w") as report_file:
+        json.dump(recorder.summary(), report_file, indent=2)
+    return path
+
+
+def profile_next(path=None):
+    """Capture a cProfile of the next profiled() call, e.g. the next Apply. path also saves the raw stats."""
+    global _profile_request
+    _profile_request = path or ""
+
+
+def profiled(func, *args, **kwargs):
+    """Call func, under cProfile if profile_next() asked for it."""
+    global _profile_request
+    if _profile_request is None: return func(*args, **kwargs)
+    path, _profile_request = _profile_request, None
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        if path: profiler.dump_stats(path)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(30)
+        print(stream.getvalue())
@@ -0,0 +1,175 @@
+# cameraApertureFix - filmback change journal
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Every apply appends one transaction to a sidecar file next to the scene
+# (<scene>.cafjournal), independent of Maya's undo queue, so a conform can be
+# reverted after the session is closed. A transaction is a small header
+# followed by fixed-size binary records (RECORD_DTYPE, 72 bytes per camera),
+# written with a single append and read back as a NumPy structured array.
+# Reverting replays transactions backwards and appends the inverse as a new
+# transaction, so the file is never rewritten.
+
+import os
+import struct
+import time
+import uuid
+from collections import namedtuple
+
+import maya.cmds as cmds
+import numpy as np
+
+from cameraApertureFix import audit, curves
+
+JOURNAL_SUFFIX = ".cafjournal"
+MAGIC = b"CAFJ"
+KIND_APPLY = 0
+KIND_REVERT = 1
+REVERT_TOLERANCE = 1e-9
+
+HEADER = struct.Struct("<4sBdIq")
+RECORD_DTYPE = np.dtype([
+    ("uuid", "V16"),
+    ("old_hfa", "<f8"), ("old_vfa", "<f8"), ("old_fl", "<f8"),
+    ("new_hfa", "<f8"), ("new_vfa", "<f8"), ("new_fl", "<f8"),
+    ("curve_scale", "<f8"),
+])
+
+Transaction = namedtuple("Transaction", ["offset", "kind", "timestamp", "count", "reverts"])
+
+
+def journal_path():
+    """Return the sidecar journal for the open scene, or one in Maya's temp dir for an untitled scene."""
+    scene = cmds.file(q=True, sceneName=True)
+    if scene: return scene + JOURNAL_SUFFIX
+    return os.path.join(cmds.internalVar(userTmpDir=True), "untitled" + JOURNAL_SUFFIX)
+
+
+def make_records(cameras, old_hfa, old_vfa, old_fl, new_hfa, new_vfa, new_fl, curve_scale):
+    """Build journal records for cameras (full DAG paths of the shapes); per-camera values broadcast."""
+    uuids = cmds.ls(cameras, uuid=True) or []
+    if len(uuids) != len(cameras):
+        ambiguous = [camera for camera in cameras if not camera.startswith("|")]
+        raise ValueError("Could not resolve the UUID of every camera to journal"
+                         + (f"; not full paths: {', '.join(ambiguous[:5])}." if ambiguous else "."))
+    records = np.empty(len(cameras), dtype=RECORD_DTYPE)
+    records["uuid"] = [uuid.UUID(u).bytes for u in uuids]
+    for field, values in (("old_hfa", old_hfa), ("old_vfa", old_vfa), ("old_fl", old_fl),
+                          ("new_hfa", new_hfa), ("new_vfa", new_vfa), ("new_fl", new_fl),
+                          ("curve_scale", curve_scale)):
+        records[field] = values
+    return records
+
+
+def append(records, kind=KIND_APPLY, reverts=-1, path=None):
+    """Append one transaction to the journal. Returns its Transaction."""
+    path = path or journal_path()
+    records = np.ascontiguousarray(records, dtype=RECORD_DTYPE)
+    timestamp = time.time()
+    with open(path, "ab") as journal_file:
+        offset = journal_file.tell()
+        journal_file.write(HEADER.pack(MAGIC, kind, timestamp, len(records), reverts) + records.tobytes())
+    return Transaction(offset, kind, timestamp, len(records), reverts)
+
+
+def record(cameras, old_hfa, old_vfa, old_fl, new_hfa, new_vfa, new_fl, curve_scale, path=None):
+    """Journal one apply. A journal that cannot be written only warns; the apply itself stands."""
+    try:
+        return append(make_records(cameras, old_hfa, old_vfa, old_fl, new_hfa, new_vfa, new_fl, curve_scale),
+                      path=path)
+    except (OSError, ValueError) as e:
+        cmds.warning(f"Could not write the filmback journal: {e}")
+
+
+def transactions(path=None):
+    """Yield the Transaction headers of a journal, oldest first, without loading the records."""
+    path = path or journal_path()
+    if not os.path.exists(path): return
+    with open(path, "rb") as journal_file:
+        while True:
+            offset = journal_file.tell()
+            header = journal_file.read(HEADER.size)
+            if len(header) < HEADER.size: return
+            magic, kind, timestamp, count, reverts = HEADER.unpack(header)
+            if magic != MAGIC: raise ValueError(f"{path} is not a cameraApertureFix journal (offset {offset}).")
+            yield Transaction(offset, kind, timestamp, count, reverts)
+            journal_file.seek(count * RECORD_DTYPE.itemsize, os.SEEK_CUR)
+
+
+def read_records(transaction, path=None):
+    with open(path or journal_path(), "rb") as journal_file:
+        journal_file.seek(transaction.offset + HEADER.size)
+        return np.fromfile(journal_file, dtype=RECORD_DTYPE, count=transaction.count)
+
+
+def pending_reverts(path=None, count=1):
+    """Return the last count apply transactions that have not been reverted, newest first."""
+    history = list(transactions(path))
+    reverted = {t.reverts for t in history if t.kind == KIND_REVERT}
+    applied = [t for t in reversed(history) if t.kind == KIND_APPLY and t.offset not in reverted]
+    return applied[:count]
+
+
+def _nodes_for_uuids(uuid_bytes):
+    """Map journal UUIDs to current node names; cameras no longer in the scene map to None."""
+    uuid_strings = [str(uuid.UUID(bytes=bytes(b))).upper() for b in uuid_bytes]
+    found = cmds.ls(uuid_strings, long=True) or []
+    by_uuid = dict(zip(cmds.ls(found, uuid=True) or [], found))
+    return [by_uuid.get(u) for u in uuid_strings]
+
+
+def revert_transaction(transaction, path=None):
+    """Restore the old values of one transaction in bulk and journal the inverse. Returns cameras restored."""
+    path = path or journal_path()
+    records = read_records(transaction, path)
+    nodes = _nodes_for_uuids(records["uuid"])
+    present = np.array([node is not None for node in nodes], dtype=bool)
+    missing = len(nodes) - int(present.sum())
+    if missing: cmds.warning(f"{missing} journaled cameras are no longer in the scene and were not reverted.")
+    records = records[present]
+    cameras = [node for node in nodes if node is not None]
+    if not cameras: return 0
+
+    hfa, vfa, focal_length = audit.read_camera_attributes(cameras)
+    per_frame = np.isnan(records["curve_scale"])
+    if per_frame.any():
+        cmds.warning(f"{int(per_frame.sum())} cameras had their focal length keyed per frame; only their "
+                     f"apertures are reverted. Use Undo to restore their focal length animation.")
+    scaled = ~per_frame & (records["curve_scale"] != 1.0)
+    cmds.undoInfo(openChunk=True)
+    try:
+        for attr, current, old in ((".horizontalFilmAperture", hfa, records["old_hfa"]),
+                                   (".verticalFilmAperture", vfa, records["old_vfa"])):
+            for i in np.flatnonzero(np.abs(current - old) > REVERT_TOLERANCE).tolist():
+                cmds.setAttr(cameras[i] + attr, float(old[i]))
+        if scaled.any():
+            indices = np.flatnonzero(scaled).tolist()
+            curves.retarget_focal_curves([cameras[i] for i in indices], (1.0 / records["curve_scale"][scaled]).tolist())
+        static_fl = ~scaled & ~per_frame & (np.abs(focal_length - records["old_fl"]) > REVERT_TOLERANCE)
+        # A keyed focal length whose curve the apply did not scale is left to its animation.
+        candidates = np.flatnonzero(static_fl)
+        if candidates.size:
+            keyed = np.array([bool(c) for c in curves.focal_curves_by_camera([cameras[i] for i in candidates.tolist()])])
+            static_fl[candidates[keyed]] = False
+            if keyed.any():
+                cmds.warning(f"{int(keyed.sum())} cameras have a keyed focal length the apply did not scale; "
+                             f"their focal length animation was left as it is.")
+        for i in np.flatnonzero(static_fl).tolist():
+            cmds.setAttr(cameras[i] + ".focalLength", float(records["old_fl"][i]))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    inverse = np.empty(len(records), dtype=RECORD_DTYPE)
+    inverse["uuid"] = records["uuid"]
+    for old, new in (("old_hfa", "new_hfa"), ("old_vfa", "new_vfa"), ("old_fl", "new_fl")):
+        inverse[old], inverse[new] = records[new], records[old]
+    inverse["curve_scale"] = 1.0 / records["curve_scale"]
+    append(inverse, KIND_REVERT, transaction.offset, path)
+    return len(cameras)
+
+
+def revert(count=1, path=None):
+    """Revert the last count applies recorded in the journal, newest first. Returns cameras restored."""
+    return sum(revert_transaction(t, path) for t in pending_reverts(path, count))
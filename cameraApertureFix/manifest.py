@@ -0,0 +1,178 @@
+# cameraApertureFix - camera manifest conform
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Conforms camera manifests (JSON Lines, one camera per line) with the same
+# preset, maintain-aspect and adjust-focal-length rules as the tool window,
+# without Maya. Each input line is an object with "name", "hfa", "vfa" and
+# "fl", and optionally "fl_frames", a list of per-frame focal lengths; any
+# other fields are passed through. Apertures are in --unit, as in the window.
+#
+# Input is read in chunks of lines. Each chunk is parsed, resolved with one
+# vectorized engine call and serialized back to text in a worker process,
+# and the chunks are written to stdout in input order.
+#
+#   python -m cameraApertureFix --preset "Super 35mm Film" solves.jsonl > conformed.jsonl
+#   cat solves.jsonl | python -m cameraApertureFix --hfa 36 --unit mm -j 8
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from cameraApertureFix import engine
+from cameraApertureFix.catalog import get_catalog
+
+CHUNK_LINES = 20000
+REQUIRED_FIELDS = ("hfa", "vfa", "fl")
+
+# Bound once: json.loads/dumps re-check their keyword arguments on every call.
+_decode = json.JSONDecoder().decode
+_encode = json.JSONEncoder(check_circular=False, allow_nan=False).encode
+
+
+def conform_lines(lines, settings, first_line=1):
+    """Conform a chunk of manifest lines. Returns (output_text, errors).
+
+    errors is a list of (line_number, message) for lines that could not be
+    parsed or hold a non-finite number; they are left out of the output.
+    Blank lines are skipped.
+    """
+    records = []
+    numbers = []
+    errors = []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip(): continue
+        try:
+            record = _decode(line)
+            values = [float(record[field]) for field in REQUIRED_FIELDS]
+            fl_frames = np.asarray(record["fl_frames"], dtype=np.float64) if record.get("fl_frames") else None
+            if fl_frames is not None and fl_frames.ndim != 1:
+                raise ValueError("fl_frames must be a list of numbers")
+            if not all(map(math.isfinite, values)) or (fl_frames is not None and not np.isfinite(fl_frames).all()):
+                raise ValueError("non-finite value")
+        except (ValueError, TypeError, KeyError) as e:
+            errors.append((number, f"{type(e).__name__}: {e}"))
+            continue
+        records.append((record, values, fl_frames))
+        numbers.append(number)
+    if not records: return "", errors
+
+    values = np.array([v for _, v, _ in records], dtype=np.float64)
+    hfa = engine.convert_to_inches(values[:, 0], settings.unit)
+    vfa = engine.convert_to_inches(values[:, 1], settings.unit)
+    targets = engine.resolve_targets(
+        hfa, vfa, values[:, 2],
+        target_hfa=settings.target_hfa, target_vfa=settings.target_vfa, preset=settings.preset,
+        maintain_aspect_ratio=settings.maintain_aspect_ratio,
+        adjust_focal_length=settings.adjust_focal_length, unit=settings.unit
+    )
+    valid = targets.hfa_valid & targets.vfa_valid
+    # Invalid targets leave the camera as it was, as the window refuses to apply them.
+    new_hfa = np.where(valid, engine.convert_aperture(targets.hfa, settings.unit), values[:, 0]).tolist()
+    new_vfa = np.where(valid, engine.convert_aperture(targets.vfa, settings.unit), values[:, 1]).tolist()
+    new_fl = np.where(valid, targets.focal_length, values[:, 2]).tolist()
+    fl_scale = np.where(valid & targets.fl_changed, targets.fl_scale, 1.0).tolist()
+
+    output = []
+    for i, (record, _, fl_frames) in enumerate(records):
+        record["hfa"], record["vfa"], record["fl"] = new_hfa[i], new_vfa[i], new_fl[i]
+        record["fl_scale"] = fl_scale[i]
+        record["valid"] = bool(valid[i])
+        if fl_scale[i] != 1.0 and fl_frames is not None:
+            record["fl_frames"] = (fl_frames * fl_scale[i]).tolist()
+        try:
+            output.append(_encode(record))
+        except ValueError as e:  # A non-finite number in a passed-through field.
+            errors.append((numbers[i], f"{type(e).__name__}: {e}"))
+    output.append("")
+    errors.sort()  # Encoding errors come after the parse errors of the whole chunk.
+    return "\n".join(output), errors
+
+
+def iter_chunks(streams, chunk_lines=CHUNK_LINES):
+    """Yield (stream_name, first_line_number, lines) chunks from each stream in turn."""
+    for stream in streams:
+        first_line = 1
+        while True:
+            lines = list(islice(stream, chunk_lines))
+            if not lines: break
+            yield getattr(stream, "name", "-"), first_line, lines
+            first_line += len(lines)
+
+
+def conform_stream(streams, settings, processes=None, chunk_lines=CHUNK_LINES):
+    """Yield (stream_name, output_text, errors) per chunk, in input order, on up to processes workers.
+
+    At most two chunks per worker are in flight, so memory does not grow with
+    the size of the input.
+    """
+    if processes == 1:
+        for name, first_line, lines in iter_chunks(streams, chunk_lines):
+            yield (name,) + conform_lines(lines, settings, first_line)
+        return
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for name, first_line, lines in iter_chunks(streams, chunk_lines):
+            in_flight.append((name, pool.submit(conform_lines, lines, settings, first_line)))
+            if len(in_flight) >= 2 * workers:
+                name, future = in_flight.popleft()
+                yield (name,) + future.result()
+        while in_flight:
+            name, future = in_flight.popleft()
+            yield (name,) + future.result()
+
+
+def _open_inputs(paths):
+    for path in paths or ["-"]:
+        if path == "-":
+            yield sys.stdin
+        else:
+            with open(path, encoding="utf-8") as stream:
+                yield stream
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cameraApertureFix",
+        description="Conform camera manifests (JSON Lines) to a filmback preset without Maya. "
+                    "Writes the conformed records to stdout.")
+    parser.add_argument("paths", nargs="*", help="Manifest files; '-' or none reads stdin.")
+    parser.add_argument("--preset", help="Preset to apply, by its catalog name.")
+    parser.add_argument("--hfa", type=float, help="Horizontal film aperture, when no preset is given.")
+    parser.add_argument("--vfa", type=float, help="Vertical film aperture, with --no-maintain-aspect and no preset.")
+    parser.add_argument("--unit", choices=["Inch", "mm"], default="Inch",
+                        help="Unit of --hfa/--vfa and of the manifest apertures.")
+    parser.add_argument("--no-maintain-aspect", dest="maintain_aspect_ratio", action="store_false")
+    parser.add_argument("--no-adjust-fl", dest="adjust_focal_length", action="store_false")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES, help="Lines handed to a worker at once.")
+    args = parser.parse_args(argv)
+
+    if not args.preset and args.hfa is None:
+        parser.error("either --preset or --hfa is required")
+    if args.preset and args.preset not in get_catalog():
+        close = ", ".join(get_catalog().search(args.preset, limit=5))
+        parser.error(f"unknown preset '{args.preset}'" + (f" (did you mean: {close})" if close else ""))
+
+    settings = engine.ConformSettings(
+        preset=args.preset, target_hfa=args.hfa, target_vfa=args.vfa, unit=args.unit,
+        maintain_aspect_ratio=args.maintain_aspect_ratio, adjust_focal_length=args.adjust_focal_length)
+
+    failed = 0
+    for name, text, errors in conform_stream(_open_inputs(args.paths), settings, args.processes, args.chunk_lines):
+        sys.stdout.write(text)
+        for number, message in errors:
+            print(f"{name}:{number}: {message}", file=sys.stderr)
+        failed += len(errors)
+    sys.stdout.flush()
+    return 1 if failed else 0
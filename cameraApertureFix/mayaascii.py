@@ -0,0 +1,421 @@
+# cameraApertureFix - streaming Maya ASCII conform
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Applies the tool's Apply rules to .ma files without launching Maya. A scene
+# is read twice as a stream of MEL statements, never as a whole: the first pass
+# collects camera filmbacks and which animCurves drive their focal length
+# (connectAttr statements come last in a .ma file), the second pass copies the
+# file through, rewriting only the camera and focal curve setAttr statements.
+#
+#   python -m cameraApertureFix.mayaascii shots/ --preset "Super 35mm Film" --dry-run -j 8
+
+import argparse
+import fnmatch
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from cameraApertureFix import engine
+from cameraApertureFix.catalog import get_catalog
+
+# Maya's defaults for attributes a .ma file leaves out.
+DEFAULT_HFA = 1.41732
+DEFAULT_VFA = 0.94488
+DEFAULT_FOCAL_LENGTH = 35.0
+
+APERTURE_ATTRS = {"hfa": "hfa", "horizontalFilmAperture": "hfa", "vfa": "vfa", "verticalFilmAperture": "vfa",
+                  "fl": "fl", "focalLength": "fl", "cap": "cap", "cameraAperture": "cap"}
+CURVE_VALUE_ATTRS = ("ktv", "keyTimeValue")
+CURVE_TANGENT_Y_ATTRS = ("kiy", "keyTanInY", "koy", "keyTanOutY")
+
+_CREATE_NODE_RE = re.compile(r'^createNode\s+(?P<type>\w+)(?P<flags>[^;]*?)\s*;', re.S)
+_NAME_FLAG_RE = re.compile(r'-n\s+"(?P<name>[^"]+)"')
+_PARENT_FLAG_RE = re.compile(r'-p\s+"(?P<parent>[^"]+)"')
+_SELECT_RE = re.compile(r'^select\s+-ne\s+"?(?P<name>[^";\s]+)"?\s*;')
+_CONNECT_RE = re.compile(r'^connectAttr\s+(?:-\w+\s+)*"(?P<src>[^"]+)"\s+"(?P<dst>[^"]+)"')
+_SET_ATTR_RE = re.compile(
+    r'^(?P<indent>\s*)setAttr(?P<flags>(?:\s+-\w+(?:\s+(?!")[^\s"]+)?)*)\s+"\.(?P<attr>\w+)(?P<index>\[[^\]]*\])?"'
+    r'(?P<type>\s+-type\s+"[^"]+")?(?P<values>[^;]*);\s*$', re.S)
+
+CameraNode = namedtuple("CameraNode", ["path", "startup", "filmback", "present"])
+ConformResult = namedtuple("ConformResult", ["path", "output", "cameras", "curves", "diff", "error"])
+
+
+def iter_statements(stream):
+    """Yield MEL statements (with their original line breaks) from an iterable of lines."""
+    buffer = []
+    in_string = False
+    for line in stream:
+        if not buffer and line.startswith("//"):
+            yield line
+            continue
+        buffer.append(line)
+        if in_string or '"' in line:
+            in_string = _in_string_after(line, in_string)
+        if not in_string and line.rstrip().endswith(";"):
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _in_string_after(line, in_string):
+    if "\\" not in line:
+        return in_string != (line.count('"') % 2 == 1)
+    escaped = False
+    for char in line:
+        if escaped: escaped = False
+        elif char == "\\": escaped = True
+        elif char == '"': in_string = not in_string
+    return in_string
+
+
+def _node_path(flags):
+    name = _NAME_FLAG_RE.search(flags)
+    if not name: return None
+    parent = _PARENT_FLAG_RE.search(flags)
+    return f"{parent.group('parent')}|{name.group('name')}" if parent else name.group("name")
+
+
+def _numbers(values):
+    return [float(v) for v in values.split()]
+
+
+def _format_number(value):
+    return f"{value:.15g}"
+
+
+def match_node(plug_node, nodes):
+    """Resolve a (possibly partial) DAG path used in connectAttr to one of nodes."""
+    plug_node = plug_node.lstrip("|")
+    if plug_node in nodes: return plug_node
+    matches = [n for n in nodes if n == plug_node or n.endswith("|" + plug_node)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def scan_scene(path):
+    """First pass: return {camera path: CameraNode} for every camera node in a .ma file."""
+    cameras = {}
+    values = {}
+    curves = set()
+    focal_connections = []
+    current = None
+
+    with open(path, "r", encoding="utf-8", errors="surrogateescape") as scene:
+        for statement in iter_statements(scene):
+            if statement[0] in " \t":
+                if current not in values: continue
+                match = _SET_ATTR_RE.match(statement)
+                if not match or match.group("index"): continue
+                attr = APERTURE_ATTRS.get(match.group("attr"))
+                if not attr: continue
+                numbers = _numbers(match.group("values"))
+                if attr == "cap" and len(numbers) == 2:
+                    values[current]["hfa"], values[current]["vfa"] = numbers
+                elif attr != "cap" and numbers:
+                    values[current][attr] = numbers[0]
+                continue
+
+            current = None
+            if statement.startswith("createNode"):
+                match = _CREATE_NODE_RE.match(statement)
+                if not match: continue
+                node_path = _node_path(match.group("flags"))
+                node_type = match.group("type")
+                if node_type == "camera" and node_path:
+                    current = node_path
+                    values[node_path] = {"startup": bool(re.search(r"(^|\s)-s(\s|$)", match.group("flags")))}
+                elif node_type.startswith("animCurve") and node_path:
+                    curves.add(node_path)
+            elif statement.startswith("select"):
+                match = _SELECT_RE.match(statement)
+                if match: current = match_node(match.group("name"), values)
+            elif statement.startswith("connectAttr"):
+                match = _CONNECT_RE.match(statement)
+                if not match: continue
+                src_node, _, src_attr = match.group("src").rpartition(".")
+                dst_node, _, dst_attr = match.group("dst").rpartition(".")
+                if dst_attr in ("fl", "focalLength") and src_attr in ("o", "output"):
+                    focal_connections.append((src_node, dst_node))
+
+    focal_curves = {}
+    for src_node, dst_node in focal_connections:
+        camera = match_node(dst_node, values)
+        curve = match_node(src_node, curves)
+        if camera and curve: focal_curves.setdefault(camera, []).append(curve)
+
+    for camera, attrs in values.items():
+        cameras[camera] = CameraNode(
+            path=camera, startup=attrs["startup"],
+            filmback=engine.CameraFilmback(
+                camera=camera, hfa=attrs.get("hfa", DEFAULT_HFA), vfa=attrs.get("vfa", DEFAULT_VFA),
+                focal_length=attrs.get("fl", DEFAULT_FOCAL_LENGTH),
+                focal_curves=tuple(focal_curves.get(camera, ()))),
+            present=frozenset(a for a in ("hfa", "vfa", "fl") if a in attrs)
+        )
+    return cameras
+
+
+def plan_conform(cameras, settings, patterns=None, include_startup=False):
+    """Resolve new values for the selected cameras.
+
+    Returns ({camera: (hfa, vfa, focal_length or None)}, {curve: scale}). The
+    focal length is None where it is driven by a curve, since the curve keys
+    are scaled instead. Curves shared between cameras that disagree on the
+    scale are left out, as in curves.collect_focal_curves.
+    """
+    selected = [c for c in cameras.values()
+                if (include_startup or not c.startup)
+                and (not patterns or any(fnmatch.fnmatch(c.path.rpartition("|")[2], p) or fnmatch.fnmatch(c.path, p)
+                                         for p in patterns))]
+    if not selected: return {}, {}
+
+    targets = engine.resolve_for_cameras([c.filmback for c in selected], settings)
+    plan = {}
+    curve_scales = {}
+    conflicts = set()
+    for i, camera in enumerate(selected):
+        if not targets.hfa_valid[i]: continue
+        hfa = float(targets.hfa[i])
+        vfa = float(targets.vfa[i]) if targets.vfa[i] > 0 else camera.filmback.vfa
+        focal_length = None
+        if targets.fl_changed[i]:
+            scale = float(targets.fl_scale[i])
+            for curve in camera.filmback.focal_curves:
+                if curve in curve_scales and not np.isclose(curve_scales[curve], scale): conflicts.add(curve)
+                curve_scales.setdefault(curve, scale)
+            if not camera.filmback.focal_curves: focal_length = float(targets.focal_length[i])
+        plan[camera.path] = (hfa, vfa, focal_length)
+    for curve in conflicts:
+        print(f"Warning: {curve} drives cameras with different focal length scales. Curve not changed.")
+        del curve_scales[curve]
+    return plan, curve_scales
+
+
+def _rewrite_set_attr(match, values, type_part=None):
+    type_part = (match.group("type") or "") if type_part is None else type_part
+    index = match.group("index") or ""
+    return (f'{match.group("indent")}setAttr{match.group("flags")} ".{match.group("attr")}{index}"'
+            f'{type_part} {" ".join(values)};\n')
+
+
+def _rewrite_camera_statement(statement, match, new_values):
+    attr = APERTURE_ATTRS.get(match.group("attr"))
+    hfa, vfa, focal_length = new_values
+    if attr == "cap":
+        return _rewrite_set_attr(match, [_format_number(hfa), _format_number(vfa)])
+    if attr == "hfa": return _rewrite_set_attr(match, [_format_number(hfa)])
+    if attr == "vfa": return _rewrite_set_attr(match, [_format_number(vfa)])
+    if attr == "fl" and focal_length is not None: return _rewrite_set_attr(match, [_format_number(focal_length)])
+    return statement
+
+
+def _rewrite_curve_statement(statement, match, scale):
+    attr = match.group("attr")
+    tokens = match.group("values").split()
+    if attr in CURVE_VALUE_ATTRS:
+        tokens[1::2] = [_format_number(float(v) * scale) for v in tokens[1::2]]
+    elif attr in CURVE_TANGENT_Y_ATTRS:
+        tokens = [_format_number(float(v) * scale) for v in tokens]
+    else:
+        return statement
+    return _rewrite_set_attr(match, tokens)
+
+
+def _missing_attr_statements(camera, new_values):
+    hfa, vfa, focal_length = new_values
+    lines = []
+    if "hfa" not in camera.present and "cap" not in camera.present:
+        lines.append(f'\tsetAttr ".cap" -type "double2" {_format_number(hfa)} {_format_number(vfa)};\n')
+    elif "vfa" not in camera.present:
+        lines.append(f'\tsetAttr ".vfa" {_format_number(vfa)};\n')
+    if focal_length is not None and "fl" not in camera.present:
+        lines.append(f'\tsetAttr ".fl" {_format_number(focal_length)};\n')
+    return lines
+
+
+def rewrite_scene(path, output, plan, curve_scales, cameras):
+    """Second pass: stream path to output, applying plan. Returns diff lines for the changed statements."""
+    diff = []
+    line_number = 0
+    current_camera = None
+    current_curve = None
+
+    with open(path, "r", encoding="utf-8", errors="surrogateescape") as scene, \
+            (open(output, "w", encoding="utf-8", errors="surrogateescape") if output else _NullWriter()) as out:
+        for statement in iter_statements(scene):
+            line_number += 1
+            new_statement = statement
+            if statement[0] in " \t":
+                if current_camera or current_curve:
+                    match = _SET_ATTR_RE.match(statement)
+                    if match and current_camera and not match.group("index"):
+                        new_statement = _rewrite_camera_statement(statement, match, plan[current_camera])
+                    elif match and current_curve:
+                        new_statement = _rewrite_curve_statement(statement, match, curve_scales[current_curve])
+            else:
+                current_camera = current_curve = None
+                if statement.startswith("createNode"):
+                    match = _CREATE_NODE_RE.match(statement)
+                    node_path = _node_path(match.group("flags")) if match else None
+                    if node_path in plan:
+                        current_camera = node_path
+                        new_statement = statement + "".join(
+                            _missing_attr_statements(cameras[node_path], plan[node_path]))
+                    elif node_path in curve_scales:
+                        current_curve = node_path
+                elif statement.startswith("select"):
+                    match = _SELECT_RE.match(statement)
+                    if match: current_camera = match_node(match.group("name"), plan)
+
+            if new_statement != statement:
+                diff.append(f"@@ line {line_number} @@\n")
+                diff.extend(_truncate("-", statement))
+                diff.extend(_truncate("+", new_statement))
+            line_number += statement.count("\n") - 1
+            out.write(new_statement)
+    return diff
+
+
+def _truncate(prefix, statement, limit=200):
+    lines = []
+    for line in statement.splitlines():
+        lines.append(f"{prefix}{line[:limit]}{' ...' if len(line) > limit else ''}\n")
+    return lines
+
+
+class _NullWriter(object):
+    def write(self, text): pass
+
+    def __enter__(self): return self
+
+    def __exit__(self, *args): return False
+
+
+def conform_file(path, settings, output=None, in_place=False, dry_run=False, patterns=None, include_startup=False):
+    """Conform every matching camera in one .ma file. Returns a ConformResult.
+
+    With output, scenes with nothing to conform are copied there unchanged.
+    Written files keep the permissions of the original scene.
+    """
+    target = None
+    try:
+        cameras = scan_scene(path)
+        plan, curve_scales = plan_conform(cameras, settings, patterns, include_startup)
+        if not plan:
+            if output and not dry_run and not in_place:
+                shutil.copy2(path, output)
+                return ConformResult(path, output, 0, 0, [], None)
+            return ConformResult(path, None, 0, 0, [], None)
+
+        if dry_run:
+            target = None
+        elif in_place:
+            handle, target = tempfile.mkstemp(suffix=".ma", dir=os.path.dirname(os.path.abspath(path)))
+            os.close(handle)
+        else:
+            target = output
+
+        diff = rewrite_scene(path, target, plan, curve_scales, cameras)
+        if target: shutil.copymode(path, target)
+        if in_place and not dry_run:
+            os.replace(target, path)
+            target = path
+        return ConformResult(path, target, len(plan), len(curve_scales), diff, None)
+    except Exception as e:
+        if in_place and target and target != path:
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+        return ConformResult(path, None, 0, 0, [], f"{type(e).__name__}: {e}")
+
+
+def find_scenes(paths, extensions=(".ma",)):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(extensions): yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def conform_files(paths, settings, output_dir=None, in_place=False, dry_run=False, patterns=None,
+                  include_startup=False, processes=None):
+    """Conform .ma files on a process pool, yielding ConformResults as files finish."""
+    scenes = list(find_scenes(paths))
+    jobs = []
+    for scene in scenes:
+        output = os.path.join(output_dir, os.path.basename(scene)) if output_dir else None
+        jobs.append((scene, settings, output, in_place, dry_run, patterns, include_startup))
+
+    if processes == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield conform_file(*job)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(conform_file, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cameraApertureFix.mayaascii",
+        description="Apply a filmback preset to the cameras in Maya ASCII scenes without launching Maya.")
+    parser.add_argument("paths", nargs="+", help=".ma files or directories to search for them.")
+    parser.add_argument("--preset", help="Preset to apply, by its catalog name.")
+    parser.add_argument("--hfa", type=float, help="Horizontal film aperture, when no preset is given.")
+    parser.add_argument("--vfa", type=float, help="Vertical film aperture, with --no-maintain-aspect and no preset.")
+    parser.add_argument("--unit", choices=["Inch", "mm"], default="Inch", help="Unit of --hfa/--vfa.")
+    parser.add_argument("--no-maintain-aspect", dest="maintain_aspect_ratio", action="store_false")
+    parser.add_argument("--no-adjust-fl", dest="adjust_focal_length", action="store_false")
+    parser.add_argument("--camera", action="append", dest="patterns", help="Only cameras matching this glob.")
+    parser.add_argument("--include-startup", action="store_true", help="Also conform persp/top/front/side.")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--output-dir", help="Write conformed scenes here.")
+    output.add_argument("--in-place", action="store_true", help="Overwrite the scenes.")
+    output.add_argument("--dry-run", action="store_true", help="Only print the changes as a diff.")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="Worker processes (default: CPU count).")
+    args = parser.parse_args(argv)
+
+    if not args.preset and args.hfa is None:
+        parser.error("either --preset or --hfa is required")
+    if args.preset and args.preset not in get_catalog():
+        close = ", ".join(get_catalog().search(args.preset, limit=5))
+        parser.error(f"unknown preset '{args.preset}'" + (f" (did you mean: {close})" if close else ""))
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+
+    settings = engine.ConformSettings(
+        preset=args.preset, target_hfa=args.hfa, target_vfa=args.vfa, unit=args.unit,
+        maintain_aspect_ratio=args.maintain_aspect_ratio, adjust_focal_length=args.adjust_focal_length)
+
+    scene_count = len(list(find_scenes(args.paths)))
+    failed = 0
+    for done, result in enumerate(conform_files(
+            args.paths, settings, args.output_dir, args.in_place, args.dry_run, args.patterns,
+            args.include_startup, args.processes), 1):
+        if result.error:
+            failed += 1
+            print(f"[{done}/{scene_count}] {result.path}: ERROR {result.error}", file=sys.stderr)
+            continue
+        print(f"[{done}/{scene_count}] {result.path}: {result.cameras} cameras, {result.curves} focal curves")
+        if args.dry_run and result.diff:
+            sys.stdout.write(f"--- {result.path}\n+++ {result.path}\n")
+            sys.stdout.writelines(result.diff)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
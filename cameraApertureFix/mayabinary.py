@@ -0,0 +1,254 @@
+# cameraApertureFix - Maya Binary camera reader
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Reads camera filmbacks from .mb files without Maya. A Maya Binary file is an
+# IFF file: a FOR4 (32-bit sizes, 4-byte alignment) or FOR8 (64-bit sizes,
+# 8-byte alignment) form of type "Maya" holding one form per node. The file is
+# memory-mapped and only chunk headers are read while walking it; the bodies
+# of camera forms are decoded, animCurve forms are located by name only, and
+# after the connections have been read the keys of the curves driving a
+# camera's focal length are decoded. Everything else is skipped over, so the
+# memory a file costs is its cameras and their focal curves, whatever its size.
+#
+#   python -m cameraApertureFix.mayabinary shots/ -j 8 --keys
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cameraApertureFix import engine, mayaascii
+from cameraApertureFix.mayaascii import APERTURE_ATTRS, CURVE_VALUE_ATTRS, CameraNode, match_node
+
+# Chunk layout per file flavour: header size, offset and format of the size
+# field, alignment of chunk bodies, and the tags that open a group.
+_Layout = namedtuple("_Layout", ["header_size", "size_offset", "size_format", "align", "groups"])
+LAYOUTS = {
+    b"FOR4": _Layout(8, 4, ">I", 4, frozenset((b"FOR4", b"LIS4", b"CAT4", b"PRO4"))),
+    b"FOR8": _Layout(16, 8, ">Q", 8, frozenset((b"FOR8", b"LIS8", b"CAT8", b"PRO8"))),
+}
+SCENE_FORM = b"Maya"
+CAMERA_FORM = b"DCAM"
+ANIM_CURVE_FORMS = frozenset((b"ACTU", b"ACTL", b"ACTA", b"ACTT"))
+CONNECTION_FORM = b"CONN"
+CREATE_TAG = b"CREA"
+CONNECTION_TAG = b"CWFL"
+DOUBLE_TAGS = frozenset((b"DBLE", b"DBL2", b"DBL3"))
+CREATE_SHARED = 0x01
+STARTUP_CAMERAS = frozenset(("persp|perspShape", "top|topShape", "front|frontShape", "side|sideShape"))
+
+# cameras is {camera path: CameraNode}; focal_keys is {curve name: (times, values)}
+# for the curves driving a camera's focal length (empty unless requested).
+MayaBinaryScene = namedtuple("MayaBinaryScene", ["cameras", "focal_keys"])
+SceneResult = namedtuple("SceneResult", ["path", "scene", "error"])
+
+
+def _chunks(data, layout, start, end):
+    """Yield (tag, body_start, body_end) for the chunks between start and end, reading only their headers."""
+    offset = start
+    while offset + layout.header_size <= end:
+        tag = data[offset:offset + 4]
+        size, = struct.unpack_from(layout.size_format, data, offset + layout.size_offset)
+        body = offset + layout.header_size
+        if body + size > end: raise ValueError(f"{tag!r} chunk at offset {offset} runs past its parent.")
+        yield tag, body, body + size
+        offset = body + -(-size // layout.align) * layout.align
+
+
+def _strings(data, start, end):
+    return [part.decode("utf-8", "replace") for part in data[start:end].split(b"\0")]
+
+
+def _values_offset(data, start, end):
+    """Return (attribute name, offset, count) of the doubles that end an attribute chunk."""
+    name_end = data.find(b"\0", start, end)
+    if name_end < 0: return None, end, 0
+    count = (end - name_end - 1) // 8
+    return data[start:name_end].decode("utf-8", "replace"), end - count * 8, count
+
+
+def _create(data, start, end):
+    """Decode a CREA chunk: a flags byte, the node name and, for DAG nodes, the parent name.
+
+    Returns (None, 0) for a chunk too short to hold a name.
+    """
+    if end - start < 2: return None, 0
+    fields = _strings(data, start + 1, end)
+    name = fields[0]
+    if not name: return None, 0
+    parent = fields[1] if len(fields) > 1 and fields[1] else None
+    return (f"{parent.lstrip('|')}|{name}" if parent else name), data[start] & CREATE_SHARED
+
+
+def _read_camera(data, layout, start, end):
+    path, shared, attrs = None, False, {}
+    for tag, body, body_end in _chunks(data, layout, start, end):
+        if tag == CREATE_TAG:
+            path, shared = _create(data, body, body_end)
+        elif tag in DOUBLE_TAGS:
+            name, offset, count = _values_offset(data, body, body_end)
+            attr = APERTURE_ATTRS.get(name)
+            if not attr or not count: continue
+            values = struct.unpack_from(f">{count}d", data, offset)
+            if attr == "cap" and count >= 2:
+                attrs["hfa"], attrs["vfa"] = values[:2]
+            elif attr != "cap":
+                attrs[attr] = values[0]
+    return path, bool(shared), attrs
+
+
+def _node_name(data, layout, start, end):
+    for tag, body, body_end in _chunks(data, layout, start, end):
+        if tag == CREATE_TAG: return _create(data, body, body_end)[0]
+    return None
+
+
+def _read_keys(data, layout, start, end):
+    for tag, body, body_end in _chunks(data, layout, start, end):
+        if tag not in DOUBLE_TAGS: continue
+        name, offset, count = _values_offset(data, body, body_end)
+        if name not in CURVE_VALUE_ATTRS: continue
+        pairs = np.frombuffer(data, dtype=">f8", count=count - count % 2, offset=offset).astype(np.float64)
+        return pairs[0::2], pairs[1::2]
+    return np.empty(0), np.empty(0)
+
+
+def _walk(data, layout, start, end, cameras, curves, connections):
+    for tag, body, body_end in _chunks(data, layout, start, end):
+        if tag == CONNECTION_TAG:
+            plugs = [field for field in _strings(data, body + 1, body_end) if field]
+            if len(plugs) >= 2: connections.append((plugs[-2], plugs[-1]))
+            continue
+        if tag not in layout.groups: continue
+        form = data[body:body + 4]
+        if form == CAMERA_FORM:
+            path, shared, attrs = _read_camera(data, layout, body + 4, body_end)
+            if path: cameras[path] = (shared, attrs)
+        elif form in ANIM_CURVE_FORMS:
+            name = _node_name(data, layout, body + 4, body_end)
+            if name: curves[name] = (body + 4, body_end)
+        elif form == CONNECTION_FORM or tag[:3] != b"FOR":
+            _walk(data, layout, body + 4, body_end, cameras, curves, connections)
+
+
+def read_scene(path, focal_keys=True):
+    """Read the cameras of a .mb file. Returns a MayaBinaryScene.
+
+    With focal_keys, the keys of every animCurve connected to a camera's
+    focal length are decoded too. Raises OSError if the file cannot be read
+    and ValueError if it is not a Maya Binary file or is truncated.
+    """
+    with open(path, "rb") as scene:
+        if os.fstat(scene.fileno()).st_size < 16: raise ValueError(f"{path} is too short to be a Maya Binary file.")
+        with mmap.mmap(scene.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            layout = LAYOUTS.get(data[:4])
+            if not layout: raise ValueError(f"{path} is not a Maya Binary file.")
+            try:
+                _, body, end = next(_chunks(data, layout, 0, len(data)))
+                if data[body:body + 4] != SCENE_FORM: raise ValueError(f"{path} is not a Maya Binary file.")
+                found, curves, connections = {}, {}, []
+                _walk(data, layout, body + 4, end, found, curves, connections)
+
+                focal_curves = {}
+                for src, dst in connections:
+                    src_node, _, src_attr = src.rpartition(".")
+                    dst_node, _, dst_attr = dst.rpartition(".")
+                    if dst_attr not in ("fl", "focalLength") or src_attr not in ("o", "output"): continue
+                    camera, curve = match_node(dst_node, found), match_node(src_node, curves)
+                    if camera and curve: focal_curves.setdefault(camera, []).append(curve)
+
+                keys = {}
+                if focal_keys:
+                    for curve in {c for names in focal_curves.values() for c in names}:
+                        keys[curve] = _read_keys(data, layout, *curves[curve])
+            except struct.error as e:
+                raise ValueError(f"{path} is truncated: {e}")
+
+    cameras = {}
+    for camera, (shared, attrs) in found.items():
+        cameras[camera] = CameraNode(
+            path=camera, startup=shared or camera in STARTUP_CAMERAS,
+            filmback=engine.CameraFilmback(
+                camera=camera, hfa=attrs.get("hfa", mayaascii.DEFAULT_HFA), vfa=attrs.get("vfa", mayaascii.DEFAULT_VFA),
+                focal_length=attrs.get("fl", mayaascii.DEFAULT_FOCAL_LENGTH),
+                focal_curves=tuple(focal_curves.get(camera, ()))),
+            present=frozenset(a for a in ("hfa", "vfa", "fl") if a in attrs)
+        )
+    return MayaBinaryScene(cameras, keys)
+
+
+def scan_scene(path):
+    """Return {camera path: CameraNode} for a .mb file, as mayaascii.scan_scene does for .ma files."""
+    return read_scene(path, focal_keys=False).cameras
+
+
+def _read_result(path, focal_keys):
+    try:
+        return SceneResult(path, read_scene(path, focal_keys), None)
+    except Exception as e:
+        return SceneResult(path, None, f"{type(e).__name__}: {e}")
+
+
+def read_scenes(paths, processes=None, focal_keys=True):
+    """Yield a SceneResult per .mb file under paths, in order, read on up to processes workers.
+
+    At most two files per worker are in flight, so memory does not grow with
+    the number of files.
+    """
+    scenes = mayaascii.find_scenes(paths, extensions=(".mb",))
+    if processes == 1:
+        for scene in scenes:
+            yield _read_result(scene, focal_keys)
+        return
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for scene in scenes:
+            in_flight.append(pool.submit(_read_result, scene, focal_keys))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cameraApertureFix.mayabinary",
+        description="List the camera filmbacks in Maya Binary scenes without launching Maya. "
+                    "Prints one tab-separated line per camera: file, camera, hfa, vfa, focal length, focal curves.")
+    parser.add_argument("paths", nargs="+", help=".mb files or directories to search for them.")
+    parser.add_argument("--keys", action="store_true", help="Also decode the focal curves and print their key ranges.")
+    parser.add_argument("--include-startup", action="store_true", help="Also list persp/top/front/side.")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="Worker processes (default: CPU count).")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for result in read_scenes(args.paths, args.processes, args.keys):
+        if result.error:
+            failed += 1
+            print(f"{result.path}: ERROR {result.error}", file=sys.stderr)
+            continue
+        for camera in result.scene.cameras.values():
+            if camera.startup and not args.include_startup: continue
+            fb = camera.filmback
+            line = f"{result.path}\t{camera.path}\t{fb.hfa:.4f}\t{fb.vfa:.4f}\t{fb.focal_length:.3f}\t{'|'.join(fb.focal_curves)}"
+            if args.keys:
+                for curve in fb.focal_curves:
+                    times, values = result.scene.focal_keys[curve]
+                    if len(times):
+                        line += f"\t{curve}: {len(times)} keys, frames {times[0]:g}-{times[-1]:g}, " \
+                                f"fl {values.min():.3f}-{values.max():.3f}"
+            print(line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
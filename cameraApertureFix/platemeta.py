@@ -0,0 +1,243 @@
+# cameraApertureFix - preset detection from plate headers
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Reads the camera and sensor metadata that EXR and DPX plates carry in their
+# headers and maps it onto the preset catalog. Frames are memory-mapped and
+# only the header bytes are parsed, so no pixel data is read from disk. For a
+# sequence, a few frames spread over its length are read on a thread pool and
+# the most common answer wins; results are cached per sequence until one of
+# the sampled frames changes on disk.
+#
+# The sensor size comes from, in order of preference: the EXR sensor
+# acquisition rectangle times the photosite pitch, the EXR overall sensor
+# dimensions, or the DPX scanned size. Without a usable size, the camera
+# model (EXR cameraModel, DPX input device name) is searched in the catalog.
+
+import mmap
+import os
+import re
+import struct
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from cameraApertureFix import engine
+from cameraApertureFix.catalog import get_catalog
+
+SAMPLE_FRAMES = 5
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+DPX_MAGIC = {b"SDPX": ">", b"XPDS": "<"}
+DPX_HEADER_SIZE = 2048
+EXR_MAX_HEADER = 1 << 20
+
+SOURCE_SENSOR = "sensor"
+SOURCE_SCAN = "scanned size"
+SOURCE_MODEL = "camera model"
+
+# Header fields of one frame: sensor_mm is (width, height) in mm or None,
+# resolution is (width, height) in pixels or None.
+PlateHeader = namedtuple("PlateHeader", ["path", "format", "camera_make", "camera_model", "sensor_mm",
+                                         "sensor_source", "resolution", "film_format"])
+
+PlateDetection = namedtuple("PlateDetection", ["sequence", "preset", "deviation_mm", "source", "camera_model",
+                                               "frames_sampled", "frames_agreeing"])
+
+_FRAME_RE = re.compile(r"^(?P<head>.*?)(?P<frame>\d+)(?P<tail>\.[^.\d]+)$")
+_cache = {}
+# {plate path: (directory mtime, frames)}: find_sequence lists the directory only when its entries changed.
+_sequences = {}
+
+
+def _c_string(data):
+    return data.split(b"\0", 1)[0].decode("utf-8", "replace").strip()
+
+
+def _read_exr(path, data):
+    """Parse the attributes of the first EXR header part, stopping at its terminating null byte."""
+    attrs = {}
+    offset = 8
+    limit = min(len(data), EXR_MAX_HEADER)
+    while offset < limit:
+        end = data.find(b"\0", offset, limit)
+        if end < 0: raise ValueError(f"{path} has a truncated EXR header.")
+        name = data[offset:end].decode("utf-8", "replace")
+        if not name: break
+        type_end = data.find(b"\0", end + 1, limit)
+        if type_end < 0: raise ValueError(f"{path} has a truncated EXR header.")
+        attr_type = data[end + 1:type_end]
+        size, = struct.unpack_from("<i", data, type_end + 1)
+        start = type_end + 5
+        # A negative size would move the offset backwards and loop forever.
+        if size < 0 or start + size > len(data): raise ValueError(f"{path} has an invalid EXR attribute size.")
+        value = data[start:start + size]
+        if attr_type == b"string":
+            attrs[name] = value.decode("utf-8", "replace").strip()
+        elif attr_type == b"float":
+            attrs[name] = struct.unpack("<f", value)[0]
+        elif attr_type == b"v2f":
+            attrs[name] = struct.unpack("<2f", value)
+        elif attr_type == b"box2i":
+            attrs[name] = struct.unpack("<4i", value)
+        offset = start + size
+
+    def find(suffix):
+        return next((value for key, value in attrs.items() if key.lower().endswith(suffix)), None)
+
+    sensor_mm, source = None, None
+    pitch, rectangle = find("sensorphotositepitch"), find("sensoracquisitionrectangle")
+    if pitch and rectangle:
+        sensor_mm = ((rectangle[2] - rectangle[0] + 1) * pitch / 1000.0,
+                     (rectangle[3] - rectangle[1] + 1) * pitch / 1000.0)
+        source = SOURCE_SENSOR
+    elif find("sensoroveralldimensions"):
+        sensor_mm, source = tuple(find("sensoroveralldimensions")), SOURCE_SENSOR
+    window = attrs.get("displayWindow") or attrs.get("dataWindow")
+    resolution = (window[2] - window[0] + 1, window[3] - window[1] + 1) if window else None
+    return PlateHeader(path, "exr", find("cameramake"), find("cameramodel"), sensor_mm, source, resolution, None)
+
+
+def _read_dpx(path, data, endian):
+    width, height = struct.unpack_from(endian + "2I", data, 772)
+    scanned = struct.unpack_from(endian + "2f", data, 1636)
+    sensor_mm, source = None, None
+    # Undefined R32 fields are all ones, which reads as NaN.
+    if all(value == value and 0 < value < 1000 for value in scanned):
+        sensor_mm, source = scanned, SOURCE_SCAN
+    resolution = (width, height) if 0 < width < 1 << 16 and 0 < height < 1 << 16 else None
+    return PlateHeader(path, "dpx", None, _c_string(data[1556:1588]) or None, sensor_mm, source, resolution,
+                       _c_string(data[1680:1712]) or None)
+
+
+def read_header(path):
+    """Read the plate header of one EXR or DPX frame through a memory map. Returns a PlateHeader.
+
+    Raises OSError if the file cannot be read and ValueError if it is not an
+    EXR or DPX file or its header is truncated.
+    """
+    with open(path, "rb") as stream:
+        if os.fstat(stream.fileno()).st_size < 8: raise ValueError(f"{path} is too short to be a plate.")
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                if data[:4] == EXR_MAGIC: return _read_exr(path, data)
+                if data[:4] in DPX_MAGIC:
+                    if len(data) < DPX_HEADER_SIZE: raise ValueError(f"{path} has a truncated DPX header.")
+                    return _read_dpx(path, data, DPX_MAGIC[data[:4]])
+            except struct.error as e:
+                raise ValueError(f"{path} has a truncated header: {e}")
+    raise ValueError(f"{path} is not an EXR or DPX file.")
+
+
+def find_sequence(path):
+    """Return the frames of the sequence path belongs to, sorted by frame number ([path] for a single file)."""
+    directory, name = os.path.split(path)
+    match = _FRAME_RE.match(name)
+    if not match: return [path]
+    modified = os.stat(directory or ".").st_mtime_ns
+    cached = _sequences.get(path)
+    if cached and cached[0] == modified: return list(cached[1])
+    pattern = re.compile(re.escape(match.group("head")) + r"(\d+)" + re.escape(match.group("tail")) + "$")
+    frames = []
+    for entry in os.listdir(directory or "."):
+        entry_match = pattern.match(entry)
+        if entry_match: frames.append((int(entry_match.group(1)), os.path.join(directory, entry)))
+    frames = [frame_path for _, frame_path in sorted(frames)] or [path]
+    _sequences[path] = (modified, frames)
+    return list(frames)
+
+
+def sample_frames(frames, count=SAMPLE_FRAMES):
+    """Return up to count frames spread evenly over frames, always including the first and last."""
+    if len(frames) <= count: return list(frames)
+    step = (len(frames) - 1) / (count - 1)
+    return [frames[round(i * step)] for i in range(count)]
+
+
+def match_header(header, tolerance_mm=engine.DEFAULT_TOLERANCE_MM):
+    """Map a PlateHeader onto the catalog. Returns (preset, deviation_mm, source) or None.
+
+    With a sensor size, the nearest preset within tolerance_mm wins; presets
+    of the same size are told apart by the camera model. Otherwise the
+    longest leading part of the camera model that names presets picks one,
+    preferring the preset whose aspect ratio is closest to the resolution's.
+    """
+    catalog = get_catalog()
+    model_matches = _model_matches(header.camera_model) if header.camera_model else []
+    if header.sensor_mm:
+        candidates = [m for m in catalog.nearest(*header.sensor_mm, k=5) if m.deviation_mm <= tolerance_mm]
+        if candidates:
+            best = next((m for m in candidates if m.name in model_matches), candidates[0])
+            return best.name, best.deviation_mm, header.sensor_source
+    if not model_matches: return None
+    if header.resolution and len(model_matches) > 1:
+        aspect = header.resolution[0] / header.resolution[1]
+        model_matches.sort(key=lambda name: abs(catalog.filmback_mm(name)[0] / catalog.filmback_mm(name)[1] - aspect))
+    return model_matches[0], None, SOURCE_MODEL
+
+
+def _model_matches(model):
+    catalog = get_catalog()
+    words = re.split(r"[\s_\-]+", model.strip())
+    for count in range(len(words), 0, -1):
+        matches = catalog.search(" ".join(words[:count]))
+        if matches: return matches
+    return []
+
+
+def _signature(frames):
+    stats = [os.stat(frame) for frame in frames]
+    return tuple((stat.st_size, stat.st_mtime_ns) for stat in stats)
+
+
+def detect_preset(path, tolerance_mm=engine.DEFAULT_TOLERANCE_MM, samples=SAMPLE_FRAMES, threads=None):
+    """Detect the preset of the plate sequence containing path. Returns a PlateDetection, or None.
+
+    Unreadable frames are skipped; None means no sampled frame mapped onto a
+    preset. Results are cached per sequence and reused while the sampled
+    frames are unchanged on disk.
+    """
+    sequence = sequence_name(path)
+    cached = _cache.get(sequence)
+    if cached:
+        frames, signature, detection = cached
+        try:
+            if _signature(frames) == signature: return detection
+        except OSError:
+            pass
+
+    frames = sample_frames(find_sequence(path), samples)
+
+    def read(frame):
+        try:
+            return read_header(frame)
+        except (OSError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(threads or len(frames)) as pool:
+        headers = [header for header in pool.map(read, frames) if header]
+    matches = [match for match in (match_header(header, tolerance_mm) for header in headers) if match]
+    detection = None
+    if matches:
+        preset, agreeing = Counter(match[0] for match in matches).most_common(1)[0]
+        deviation, source = next(match[1:] for match in matches if match[0] == preset)
+        model = next((header.camera_model for header in headers if header.camera_model), None)
+        detection = PlateDetection(sequence, preset, deviation, source, model, len(frames), agreeing)
+    try:
+        _cache[sequence] = (frames, _signature(frames), detection)
+    except OSError:
+        pass
+    return detection
+
+
+def sequence_name(path):
+    """Return path with its frame number replaced by #### padding, e.g. plate.####.exr."""
+    directory, name = os.path.split(path)
+    match = _FRAME_RE.match(name)
+    if not match: return path
+    return os.path.join(directory, match.group("head") + "#" * len(match.group("frame")) + match.group("tail"))
+
+
+def clear_cache():
+    _cache.clear()
+    _sequences.clear()
@@ -0,0 +1,31 @@
+# cameraApertureFix - preset table
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+
+PRESETS = {
+    "65mm Film (5-perf)": {"horizontal": 48.56, "vertical": 22.1, "unit": "mm"},
+    "Arri Alexa 65": {"horizontal": 54.12, "vertical": 25.59, "unit": "mm"},
+    "Arri Alexa Classic (16:9)": {"horizontal": 23.76, "vertical": 13.365, "unit": "mm"},
+    "Arri Alexa LF (Open Gate)": {"horizontal": 36.7, "vertical": 25.54, "unit": "mm"},
+    "Arri Alexa Mini (16:9)": {"horizontal": 23.76, "vertical": 13.365, "unit": "mm"},
+    "Arri Alexa Mini LF (Open Gate)": {"horizontal": 36.7, "vertical": 25.54, "unit": "mm"},
+    "APS-C (Canon)": {"horizontal": 22.3, "vertical": 14.9, "unit": "mm"},
+    "APS-C (Sony/Nikon/Fujifilm)": {"horizontal": 23.6, "vertical": 15.6, "unit": "mm"},
+    "Blackmagic Pocket 6K (Super 35)": {"horizontal": 23.1, "vertical": 12.99, "unit": "mm"},
+    "Blackmagic Pocket 4K (MFT)": {"horizontal": 18.96, "vertical": 10.0, "unit": "mm"},
+    "Canon C300 Mark III (Super 35)": {"horizontal": 26.2, "vertical": 13.8, "unit": "mm"},
+    "Full Frame 35mm (Photography)": {"horizontal": 36.0, "vertical": 24.0, "unit": "mm"},
+    "IMAX 70mm (15-perf)": {"horizontal": 70.41, "vertical": 52.63, "unit": "mm"},
+    "Maya (Default Camera)": {"horizontal": 36.0, "vertical": 24.0, "unit": "mm"},
+    "Micro Four Thirds": {"horizontal": 17.3, "vertical": 13.0, "unit": "mm"},
+    "RED Dragon (6K Full)": {"horizontal": 30.7, "vertical": 15.8, "unit": "mm"},
+    "RED Komodo (6K S35)": {"horizontal": 26.21, "vertical": 13.82, "unit": "mm"},
+    "Sony FX3/A7S III": {"horizontal": 35.6, "vertical": 23.8, "unit": "mm"},
+    "Sony Venice (6K Full)": {"horizontal": 36.2, "vertical": 24.1, "unit": "mm"},
+    "Standard 16mm Film": {"horizontal": 10.26, "vertical": 7.49, "unit": "mm"},
+    "Standard 35mm Film (Academy)": {"horizontal": 22.0, "vertical": 16.0, "unit": "mm"},
+    "Super 16mm Film": {"horizontal": 12.52, "vertical": 7.41, "unit": "mm"},
+    "Super 35mm Film": {"horizontal": 24.89, "vertical": 18.67, "unit": "mm"},
+}
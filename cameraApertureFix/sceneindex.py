@@ -0,0 +1,248 @@
+# cameraApertureFix - incremental scene index
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# A persistent SQLite index of the camera filmbacks found in scene files. Each
+# file is fingerprinted by size, mtime and content hash; re-scans only parse
+# files whose fingerprint changed, and questions like "which shots use preset
+# X" or "which cameras match no preset" are answered from the index alone.
+# Presets are matched against the stored filmbacks when a query runs, so the
+# answers follow the current catalog and every preset of the same size
+# matches; the preset column only records the nearest preset at scan time.
+#
+#   python -m cameraApertureFix.sceneindex shots.db update shots/
+#   python -m cameraApertureFix.sceneindex shots.db query --preset "Super 35mm Film"
+#   python -m cameraApertureFix.sceneindex shots.db query --mismatched --tolerance 0.5
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cameraApertureFix import engine, mayaascii
+from cameraApertureFix.catalog import get_catalog
+
+# mayabinary.scan_scene is to be registered for ".mb" once the reader has been
+# checked against a file saved by Maya (tests/test_mayabinary.py); so far it
+# has only read the files benchmarks/bench_mayabinary.py writes.
+SCANNERS = {".ma": mayaascii.scan_scene}
+HASH_CHUNK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS cameras (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    camera TEXT NOT NULL,
+    startup INTEGER NOT NULL,
+    hfa REAL NOT NULL,
+    vfa REAL NOT NULL,
+    focal_length REAL NOT NULL,
+    focal_curves TEXT NOT NULL,
+    preset TEXT NOT NULL,
+    deviation_mm REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cameras_path ON cameras(path);
+CREATE INDEX IF NOT EXISTS cameras_preset ON cameras(preset, deviation_mm);
+CREATE INDEX IF NOT EXISTS cameras_filmback ON cameras(hfa, vfa);
+"""
+
+IndexedCamera = namedtuple(
+    "IndexedCamera",
+    ["path", "camera", "startup", "hfa", "vfa", "focal_length", "focal_curves", "preset", "deviation_mm"]
+)
+UpdateStats = namedtuple("UpdateStats", ["scanned", "unchanged", "touched", "removed", "failed"])
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as scene:
+        for chunk in iter(lambda: scene.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scan_file(path, known_digest=None):
+    """Worker: hash path and, if its content changed, parse its cameras."""
+    try:
+        stat = os.stat(path)
+        digest = file_digest(path)
+        if digest == known_digest:
+            return path, stat.st_size, stat.st_mtime_ns, digest, None, None
+        cameras = list(SCANNERS[os.path.splitext(path)[1].lower()](path).values())
+        return path, stat.st_size, stat.st_mtime_ns, digest, cameras, None
+    except Exception as e:
+        return path, 0, 0, "", [], f"{type(e).__name__}: {e}"
+
+
+class SceneIndex(object):
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def find_scenes(self, paths):
+        for scene in mayaascii.find_scenes(paths, extensions=tuple(SCANNERS)):
+            if os.path.splitext(scene)[1].lower() in SCANNERS: yield os.path.abspath(scene)
+
+    def update(self, paths, processes=None, progress=None):
+        """Bring the index up to date for every scene under paths. Returns UpdateStats."""
+        known = {row[0]: row[1:] for row in self.connection.execute("SELECT path, size, mtime_ns, digest FROM files")}
+        scenes = []
+        stale = []
+        for scene in self.find_scenes(paths):
+            try:
+                stat = os.stat(scene)
+            except OSError:
+                continue  # Deleted since it was listed: indexed as missing below.
+            scenes.append(scene)
+            fingerprint = known.get(scene)
+            if fingerprint and fingerprint[0] == stat.st_size and fingerprint[1] == stat.st_mtime_ns: continue
+            stale.append((scene, fingerprint[2] if fingerprint else None))
+
+        scanned = touched = failed = 0
+        pool = None
+        if processes == 1 or len(stale) <= 1:
+            results = (_scan_file(*job) for job in stale)
+        else:
+            pool = ProcessPoolExecutor(max_workers=processes)
+            results = pool.map(_scan_file, *zip(*stale), chunksize=8)
+        try:
+            for done, result in enumerate(results, 1):
+                path, size, mtime_ns, digest, cameras, error = result
+                if error: failed += 1
+                elif cameras is None: touched += 1
+                else: scanned += 1
+                self._store(path, size, mtime_ns, digest, cameras, error)
+                if progress: progress(done, len(stale), path, error)
+        finally:
+            if pool: pool.shutdown()
+
+        removed = self._remove_missing(scenes, paths)
+        self.connection.commit()
+        return UpdateStats(scanned, len(scenes) - len(stale), touched, removed, failed)
+
+    def _store(self, path, size, mtime_ns, digest, cameras, error):
+        with self.connection:
+            if cameras is None:
+                self.connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (size, mtime_ns, path))
+                return
+            self.connection.execute("DELETE FROM cameras WHERE path = ?", (path,))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, error) VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, digest, error))
+            if not cameras: return
+            match = engine.classify_filmbacks([c.filmback.hfa for c in cameras], [c.filmback.vfa for c in cameras])
+            self.connection.executemany(
+                "INSERT INTO cameras VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(path, c.path, int(c.startup), c.filmback.hfa, c.filmback.vfa, c.filmback.focal_length,
+                  "|".join(c.filmback.focal_curves), preset, deviation)
+                 for c, preset, deviation in zip(cameras, match.preset, match.deviation_mm.tolist())])
+
+    def _remove_missing(self, scenes, paths):
+        roots = [os.path.abspath(p) for p in paths]
+        present = set(scenes)
+        missing = [path for (path,) in self.connection.execute("SELECT path FROM files")
+                   if path not in present and any(path == r or path.startswith(r.rstrip(os.sep) + os.sep) for r in roots)]
+        self.connection.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in missing])
+        return len(missing)
+
+    def _cameras(self, where, params, include_startup):
+        if not include_startup: where += " AND startup = 0"
+        rows = self.connection.execute(f"SELECT * FROM cameras WHERE {where} ORDER BY path, camera", params)
+        return [IndexedCamera(*row[:6], tuple(filter(None, row[6].split("|"))), *row[7:]) for row in rows]
+
+    def cameras_using_preset(self, preset, tolerance_mm=engine.DEFAULT_TOLERANCE_MM, include_startup=False):
+        """Cameras whose filmback is within tolerance_mm of preset on both axes, as the catalog has it now.
+
+        Raises KeyError if preset is not in the catalog.
+        """
+        horizontal_mm, vertical_mm = get_catalog().filmback_mm(preset)
+        tolerance = tolerance_mm / engine.MM_PER_INCH
+        hfa, vfa = horizontal_mm / engine.MM_PER_INCH, vertical_mm / engine.MM_PER_INCH
+        cameras = self._cameras("hfa BETWEEN ? AND ? AND vfa BETWEEN ? AND ?",
+                                (hfa - tolerance, hfa + tolerance, vfa - tolerance, vfa + tolerance), include_startup)
+        return [c._replace(preset=preset, deviation_mm=max(abs(c.hfa - hfa), abs(c.vfa - vfa)) * engine.MM_PER_INCH)
+                for c in cameras]
+
+    def mismatched_cameras(self, tolerance_mm=engine.DEFAULT_TOLERANCE_MM, include_startup=False):
+        """Cameras matching no preset of the current catalog within tolerance_mm, with their nearest preset."""
+        cameras = self._cameras("1", (), include_startup)
+        if not cameras: return []
+        match = engine.classify_filmbacks([c.hfa for c in cameras], [c.vfa for c in cameras])
+        return [c._replace(preset=preset, deviation_mm=deviation)
+                for c, preset, deviation in zip(cameras, match.preset, match.deviation_mm.tolist())
+                if deviation > tolerance_mm]
+
+    def shots_using_preset(self, preset, tolerance_mm=engine.DEFAULT_TOLERANCE_MM, include_startup=False):
+        return sorted({c.path for c in self.cameras_using_preset(preset, tolerance_mm, include_startup)})
+
+    def failed_files(self):
+        return list(self.connection.execute("SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cameraApertureFix.sceneindex",
+                                     description="Incremental index of camera filmbacks in scene files.")
+    parser.add_argument("database", help="SQLite index file, created if missing.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    update = commands.add_parser("update", help="Scan changed scenes into the index.")
+    update.add_argument("paths", nargs="+")
+    update.add_argument("-j", "--processes", type=int, default=None)
+    query = commands.add_parser("query", help="List cameras from the index.")
+    which = query.add_mutually_exclusive_group(required=True)
+    which.add_argument("--preset", help="Cameras matching this preset within --tolerance.")
+    which.add_argument("--mismatched", action="store_true", help="Cameras matching no preset within --tolerance.")
+    query.add_argument("--tolerance", type=float, default=engine.DEFAULT_TOLERANCE_MM, help="In mm.")
+    query.add_argument("--shots", action="store_true", help="List scene files only.")
+    query.add_argument("--include-startup", action="store_true")
+    args = parser.parse_args(argv)
+
+    with SceneIndex(args.database) as index:
+        if args.command == "update":
+            def progress(done, total, path, error):
+                print(f"[{done}/{total}] {path}" + (f": ERROR {error}" if error else ""))
+            stats = index.update(args.paths, args.processes, progress)
+            print(f"{stats.scanned} scanned, {stats.unchanged} unchanged, {stats.touched} touched, "
+                  f"{stats.removed} removed, {stats.failed} failed")
+            return 1 if stats.failed else 0
+
+        if args.preset:
+            if args.preset not in get_catalog():
+                close = ", ".join(get_catalog().search(args.preset, limit=5))
+                parser.error(f"unknown preset '{args.preset}'" + (f" (did you mean: {close})" if close else ""))
+            cameras = index.cameras_using_preset(args.preset, args.tolerance, args.include_startup)
+        else:
+            cameras = index.mismatched_cameras(args.tolerance, args.include_startup)
+        if args.shots:
+            for path in sorted({c.path for c in cameras}): print(path)
+            return 0
+        for c in cameras:
+            print(f"{c.path}\t{c.camera}\t{c.hfa:.4f}\t{c.vfa:.4f}\t{c.focal_length:.3f}\t{c.preset}\t{c.deviation_mm:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
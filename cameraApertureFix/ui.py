@@ -0,0 +1,847 @@
+# cameraApertureFix - tool window
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# This script is provided freely and generously.
+# You can use, study, modify, and share it.
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# The window is built once per session and retained: closing it only hides
+# it, and opening it again shows the same widgets and reloads the selected
+# camera. While it is open, camerasync follows selection and camera attribute
+# changes, so there is no need to press Refresh after selecting another
+# camera. Importing this module only pulls in maya.cmds and the view model;
+# the engine, NumPy and the preset catalog load when the window is first
+# built, and the Debug menu is filled the first time it is opened.
+#
+#   from cameraApertureFix import ui
+#   ui.create_camera_tool_ui()
+
+import maya.cmds as cmds
+import traceback
+
+from cameraApertureFix.viewmodel import WidgetView
+
+WINDOW_NAME = "cameraToolWin"
+PRESET_LIST_LIMIT = 500
+
+_window_session = {}
+
+
+def create_camera_tool_ui():
+    """Show the tool window, building it on first use, and load the selected camera."""
+    reopen = _window_session.get('refresh')
+    if reopen and cmds.window(WINDOW_NAME, exists=True):
+        cmds.showWindow(WINDOW_NAME)
+        reopen(force_reload_from_scene=True)
+        return WINDOW_NAME
+    return _build_window()
+
+
+def _build_window():
+    from cameraApertureFix import batch, curves, engine, framerange, instrument, journal, platemeta, whatif
+    from cameraApertureFix.camerasync import CameraSync
+    from cameraApertureFix.catalog import get_catalog
+    from cameraApertureFix.engine import convert_aperture, convert_to_inches
+
+    current_data = {
+        'camera_shape': None, 'camera_transform': None,
+        'aperture': 0.0, 'vertical_aperture': 0.0,
+        'initial_aspect_ratio': 1.0, 'focal_length': 0.0,
+        'unit': 'Inch', 'maintain_aspect_ratio': True,
+        'preset_active': False, 'selected_preset_name': None,
+        'adjust_focal_length': True, 'preset_filter': "",
+        'suggested_preset': None, 'preserve_fov_over_range': False,
+        'reduce_keys': True
+    }
+    preset_list_state = {'items': None, 'selected': None}
+    batch_state = {'cameras': [], 'rows': None, 'connected': None, 'destinations': None}
+    batch_widgets = {}
+    whatif_state = {'key': None, 'stale': True, 'matrix': None, 'cameras': [], 'mode': 0, 'rows': None}
+    whatif_widgets = {}
+    sync_state = {'selection': False, 'attributes': False, 'deleted': False}
+
+    # A window left over from a reloaded module has callbacks bound to the old code.
+    if cmds.window(WINDOW_NAME, exists=True):
+        cmds.deleteUI(WINDOW_NAME)
+
+    instrument.install_from_env()
+    window = cmds.window(WINDOW_NAME, title="CameraApertureFix v06", widthHeight=(400, 430), sizeable=True,
+                         menuBar=True, retain=True, closeCommand=lambda *args: sync.stop())
+    view = WidgetView(window)
+    sync = CameraSync(lambda *args: on_scene_event('selection'), lambda *args: on_scene_event('attributes'),
+                      lambda *args: on_scene_event('deleted'), parent=window)
+    cmds.menu(label="File")
+    cmds.menuItem(label="Export Camera Frames...", command=lambda *args: export_camera_frames(),
+                  annotation="Writes the loaded camera's apertures, focal length and field of view on every frame of the playback range to a Nuke .chan or JSON Lines file.")
+    cmds.menuItem(label="Export Batch Cameras...", command=lambda *args: export_batch_cameras(),
+                  annotation="Writes one JSON Lines file per camera loaded in the batch section to a folder.")
+    cmds.menuItem(divider=True)
+    cmds.menuItem(label="Audit Scene Filmbacks...", command=lambda *args: audit_scene_filmbacks(),
+                  annotation="Classifies every camera in the scene against the presets, prints the table to the Script Editor and optionally saves it as CSV.")
+    cmds.menu(label="Edit")
+    cmds.menuItem(label="Revert Last Apply", command=lambda *args: revert_last_apply(),
+                  annotation="Restores the cameras changed by the last Apply from this scene's filmback journal, even after the scene was reopened.")
+    debug_menu = cmds.menu(label="Debug", postMenuCommandOnce=True,
+                           postMenuCommand=lambda *args: build_debug_menu())
+    scroll_layout = cmds.scrollLayout(horizontalScrollBarThickness=16, verticalScrollBarThickness=16)
+    main_layout = cmds.columnLayout(adjustableColumn=True, rowSpacing=10, columnOffset=["both", 10])
+
+    cmds.text(label="Camera Info", font="boldLabelFont", align="left")
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=2)
+    current_camera_text = view.create(cmds.text, label="Camera: N/A")
+    current_focal_length_text = view.create(cmds.text, label="Focal Length: N/A")
+    current_aperture_text = view.create(cmds.text, label="Horiz Film Aperture: N/A")
+    current_vertical_aperture_text = view.create(cmds.text, label="Vert Film Aperture: N/A")
+    cmds.setParent("..")
+
+    cmds.separator(height=10, style="in")
+
+    cmds.text(label="Settings", font="boldLabelFont", align="left")
+    settings_layout = cmds.columnLayout(adjustableColumn=True, rowSpacing=5)
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=[(1, 'both', 5), (2, 'both', 5)])
+    preset_filter_field = view.create(
+        cmds.textField, text="", placeholderText="Search presets...", en=False,
+        annotation="Type to filter the preset list. Every word must appear in the preset name."
+    )
+    unit_menu = view.create(
+        cmds.optionMenu, label="Unit", en=False,
+        annotation="Choose the unit for aperture display and input (Inch or mm)."
+    )
+    cmds.menuItem(label="Inch")
+    cmds.menuItem(label="mm")
+    view.note(unit_menu, v="Inch")
+    cmds.setParent("..")
+
+    preset_list = view.create(
+        cmds.textScrollList, numberOfRows=6, allowMultiSelection=False, en=False,
+        annotation="Select a camera preset. 'None' enables manual input."
+    )
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=[(1, 'both', 5), (2, 'both', 5)])
+    suggested_preset_text = view.create(cmds.text, label="Closest Preset: N/A", align='left')
+    use_suggested_button = view.create(
+        cmds.button, label="Use", en=False,
+        annotation="Selects the catalog preset closest to the camera's current filmback."
+    )
+    cmds.setParent("..")
+    plate_preset_text = view.create(
+        cmds.text, label="Plate Preset: N/A", align='left',
+        annotation="Preset detected from the EXR/DPX headers of the camera's image plane. It is selected when the camera is loaded."
+    )
+
+    cmds.rowLayout(numberOfColumns=2, columnWidth2=(180, 100))
+    cmds.text(label="Horizontal Film Aperture")
+    new_aperture_field = view.create(
+        cmds.floatField, precision=6, v=0.0, en=False,
+        annotation="Enter new horizontal aperture. Enabled if 'None' preset is selected."
+    )
+    cmds.setParent("..")
+
+    cmds.rowLayout(numberOfColumns=2, columnWidth2=(180, 100))
+    cmds.text(label="Vertical Film Aperture")
+    new_vertical_aperture_field = view.create(
+        cmds.floatField, precision=6, v=0.0, en=False,
+        annotation="Enter new vertical aperture. Enabled if 'Maintain Aspect Ratio' is OFF and 'None' preset is selected."
+    )
+    cmds.setParent("..")
+
+    maintain_aspect_check = view.create(
+        cmds.checkBox, v=False, label="Maintain Original Aspect Ratio", en=False,
+        annotation="Checked: Vertical aperture is automatically calculated to preserve the aspect ratio of the camera *as currently loaded/refreshed in this tool*.\nUnchecked (with Preset): Uses both Horizontal & Vertical apertures from the selected preset, which may alter the aspect ratio.\nUnchecked (with 'None' Preset): Enables manual input for Vertical Film Aperture, allowing you to define a custom aspect ratio."
+    )
+    adjust_fl_check = view.create(
+        cmds.checkBox, v=False, label="Adjust Focal Length to Maintain FOV", en=False,
+        annotation="Checked: Focal length is adjusted to maintain field of view relative to horizontal aperture change.\nUnchecked: Focal length remains unchanged."
+    )
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=[(1, 'both', 0), (2, 'both', 5)])
+    frame_range_check = view.create(
+        cmds.checkBox, v=False, label="Preserve FOV Over Playback Range", en=False,
+        annotation="Only used when the horizontal aperture is animated.\nChecked: Apply keys the focal length on every frame of the playback range so each frame keeps its field of view, then sets the apertures to their new static values.\nUnchecked: The focal length scale is taken from the current frame."
+    )
+    reduce_keys_check = view.create(
+        cmds.checkBox, v=True, label="Reduce Keys", en=False,
+        annotation="Drops focal length keys that linear interpolation reproduces within 0.0001 mm."
+    )
+    cmds.setParent("..")
+    cmds.setParent("..") 
+
+    cmds.text(label="Preview of Calculated Changes:", font="smallBoldLabelFont", align='left', parent=main_layout)
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=2, columnOffset=["left", 10], parent=main_layout)
+    preview_h_ap_text = view.create(cmds.text, label="New Horiz Aperture: N/A", align='left')
+    preview_v_ap_text = view.create(cmds.text, label="New Vert Aperture: N/A", align='left')
+    preview_aspect_text = view.create(cmds.text, label="New Aspect Ratio: N/A", align='left')
+    preview_fl_text = view.create(cmds.text, label="New Focal Length: N/A", align='left')
+    cmds.setParent("..")
+
+    cmds.rowLayout(numberOfColumns=2, columnAttach=[(1, 'both', 5), (2, 'both', 5)], parent=main_layout)
+    apply_button = view.create(
+        cmds.button, label="Apply", en=False,
+        annotation="Applies the specified aperture settings and adjusts focal length if enabled."
+    )
+    reset_button = view.create(
+        cmds.button, label="Reset", en=False,
+        annotation="Resets all settings and reloads data from the selected camera."
+    )
+    cmds.setParent("..")
+
+    batch_frame = cmds.frameLayout(
+        label="Batch: Multiple Cameras", collapsable=True, collapse=True, parent=main_layout,
+        expandCommand=lambda *args: build_batch_section()
+    )
+    cmds.setParent("..")
+
+    whatif_frame = cmds.frameLayout(
+        label="What-If: Presets x Cameras", collapsable=True, collapse=True, parent=main_layout,
+        expandCommand=lambda *args: build_whatif_section()
+    )
+    cmds.setParent("..")
+
+    cmds.separator(height=10, style="in", parent=main_layout)
+
+    cmds.rowLayout(numberOfColumns=2, columnAttach=[(1, 'both', 5), (2, 'both', 5)], parent=main_layout)
+    refresh_button = cmds.button(
+        label="Refresh",
+        annotation="Reloads data from the currently selected camera in the Maya scene."
+    )
+    cmds.button(label="Close", command=lambda *args: close_window())
+    cmds.setParent("..")
+
+    cmds.setParent("..")
+
+    cmds.textField(preset_filter_field, edit=True, textChangedCommand=lambda value: update_preset_filter(value))
+    cmds.textScrollList(preset_list, edit=True, selectCommand=lambda *args: apply_preset(_selected_preset_in_list()))
+    cmds.button(use_suggested_button, edit=True, command=lambda *args: apply_suggested_preset())
+    cmds.optionMenu(unit_menu, edit=True, changeCommand=lambda value: update_unit_and_fields(value))
+    cmds.floatField(new_aperture_field, edit=True, changeCommand=lambda value: update_aperture_field(new_aperture_field, value))
+    cmds.floatField(new_vertical_aperture_field, edit=True, changeCommand=lambda value: update_aperture_field(new_vertical_aperture_field, value))
+    cmds.checkBox(maintain_aspect_check, edit=True, changeCommand=lambda value: update_maintain_aspect(value))
+    cmds.checkBox(adjust_fl_check, edit=True, changeCommand=lambda value: update_adjust_focal_length(value))
+    cmds.checkBox(frame_range_check, edit=True, changeCommand=lambda value: update_frame_range_option(frame_range_check, 'preserve_fov_over_range', value))
+    cmds.checkBox(reduce_keys_check, edit=True, changeCommand=lambda value: update_frame_range_option(reduce_keys_check, 'reduce_keys', value))
+    cmds.button(apply_button, edit=True, command=lambda *args: instrument.profiled(apply_new_focal_length))
+    cmds.button(reset_button, edit=True, command=lambda *args: reset_inputs())
+    cmds.button(refresh_button, edit=True, command=lambda *args: refresh())
+    
+    def build_debug_menu():
+        cmds.menuItem(label="Instrument cmds Calls", checkBox=instrument.is_installed(), parent=debug_menu,
+                      command=lambda value: instrument.set_enabled(value),
+                      annotation="Time every cmds call the tool makes, grouped by refresh, preview and apply.")
+        cmds.menuItem(label="Print cmds Report", parent=debug_menu,
+                      command=lambda *args: print(instrument.format_report()))
+        cmds.menuItem(label="Save cmds Report...", parent=debug_menu, command=lambda *args: save_instrument_report())
+        cmds.menuItem(label="Clear cmds Report", parent=debug_menu, command=lambda *args: instrument.recorder.reset())
+        cmds.menuItem(divider=True, parent=debug_menu)
+        cmds.menuItem(label="Profile Next Apply", parent=debug_menu, command=lambda *args: instrument.profile_next(),
+                      annotation="Print a cProfile of the next Apply to the Script Editor.")
+
+    def close_window():
+        sync.stop()
+        cmds.window(window, edit=True, visible=False)
+
+    def on_scene_event(kind):
+        sync_state[kind] = True
+        view.schedule(sync_from_scene)
+
+    def sync_from_scene():
+        """Apply the scene events gathered since the last idle tick to current_data."""
+        pending = dict(sync_state)
+        sync_state.update(selection=False, attributes=False, deleted=False)
+        if current_data['camera_shape'] and not pending['deleted']:
+            # The loaded camera may have been renamed or deleted since it was loaded; find it by UUID.
+            transform, shape = sync.watched_camera()
+            if not shape:
+                pending['deleted'] = True
+            elif shape != current_data['camera_shape']:
+                current_data.update({'camera_shape': shape, 'camera_transform': transform})
+                sync.watch(shape, transform)
+                view.schedule(update_data_and_ui)
+        if pending['deleted']:
+            current_data.update({'camera_shape': None, 'camera_transform': None})
+            sync.watch(None)
+            suggest_closest_preset()
+            update_data_and_ui()
+        if pending['selection']:
+            # Selecting something that is not a camera keeps the loaded camera.
+            _, shape = sync.selected_camera()
+            if shape and shape != current_data['camera_shape']:
+                refresh()
+                return
+        if pending['attributes'] and current_data['camera_shape']:
+            whatif_state['stale'] = True
+            if _read_camera_attributes(current_data['camera_shape']):
+                suggest_closest_preset()
+                update_data_and_ui()
+
+    def _read_camera_attributes(shape):
+        """Load shape's filmback and focal length into current_data. Returns whether anything changed."""
+        values = {
+            'aperture': cmds.getAttr(shape + ".horizontalFilmAperture"),
+            'vertical_aperture': cmds.getAttr(shape + ".verticalFilmAperture"),
+            'focal_length': cmds.getAttr(shape + ".focalLength")
+        }
+        if all(current_data[key] == value for key, value in values.items()): return False
+        current_data.update(values)
+        current_data['initial_aspect_ratio'] = values['aperture'] / values['vertical_aperture'] if values['vertical_aperture'] != 0 else 1.0
+        return True
+
+    def revert_last_apply():
+        try:
+            restored = journal.revert()
+        except (OSError, ValueError) as e_revert:
+            cmds.warning(f"Could not revert from the filmback journal: {e_revert}")
+            return
+        if not restored:
+            cmds.warning("Nothing to revert in the filmback journal for this scene.")
+            return
+        print(f"Reverted the last apply on {restored} camera(s) from {journal.journal_path()}.")
+        refresh(force_reload_from_scene=True)
+
+    def export_camera_frames():
+        from cameraApertureFix import export
+        if not current_data['camera_shape']: cmds.warning("No camera selected."); return
+        paths = cmds.fileDialog2(fileFilter="Nuke chan (*.chan);;JSON Lines (*.jsonl)", dialogStyle=2, fileMode=0,
+                                 caption="Export Camera Frames")
+        if not paths: return
+        try:
+            frames = export.export_camera(current_data['camera_shape'], paths[0], unit=current_data['unit'])
+        except (OSError, RuntimeError) as e_export:
+            cmds.warning(f"Could not export {current_data['camera_transform']}: {e_export}")
+            return
+        print(f"Exported {frames} frames of {current_data['camera_transform']} to {paths[0]}.")
+
+    def export_batch_cameras():
+        from cameraApertureFix import export
+        if not batch_state['cameras']:
+            cmds.warning("Load cameras in the Batch section first."); return
+        folders = cmds.fileDialog2(dialogStyle=2, fileMode=3, caption="Export Batch Cameras")
+        if not folders: return
+        try:
+            paths = export.export_cameras(batch_state['cameras'], folders[0], unit=current_data['unit'])
+        except (OSError, RuntimeError, ValueError) as e_export:
+            cmds.warning(f"Could not export the batch cameras: {e_export}")
+            return
+        print(f"Exported {len(paths)} cameras to {folders[0]}.")
+
+    def audit_scene_filmbacks():
+        from cameraApertureFix import audit
+        rows = audit.audit_scene(sort_by="status")
+        if not rows:
+            cmds.warning("No cameras in the scene."); return
+        print(audit.format_table(rows))
+        unknown = sum(1 for row in rows if row.status == engine.MATCH_UNKNOWN)
+        print(f"Filmback audit: {len(rows)} cameras, {unknown} matching no preset.")
+        paths = cmds.fileDialog2(fileFilter="CSV (*.csv)", dialogStyle=2, fileMode=0, caption="Save Filmback Audit")
+        if not paths: return
+        try:
+            print(f"Filmback audit written to {audit.write_csv(rows, paths[0])}")
+        except OSError as e_csv:
+            cmds.warning(f"Could not write {paths[0]}: {e_csv}")
+
+    def save_instrument_report():
+        paths = cmds.fileDialog2(fileFilter="JSON (*.json)", dialogStyle=2, fileMode=0, caption="Save cmds Report")
+        if paths: print(f"cmds report written to {instrument.dump_json(paths[0])}")
+
+    def manage_vfa_field_state():
+        if not current_data['camera_shape']:
+            view.set(new_vertical_aperture_field, enable=False, value=0.0)
+            return
+
+        vfa_field_enabled = (
+            not current_data['maintain_aspect_ratio'] and
+            not current_data['preset_active']
+        )
+        view.set(new_vertical_aperture_field, enable=vfa_field_enabled)
+
+        if vfa_field_enabled:
+            display_v_ap = convert_aperture(current_data['vertical_aperture'], current_data['unit'])
+            view.set(new_vertical_aperture_field, value=display_v_ap)
+
+    def update_maintain_aspect(value):
+        view.note(maintain_aspect_check, value=value)
+        current_data['maintain_aspect_ratio'] = value
+        view.schedule(update_data_and_ui)
+
+    def update_adjust_focal_length(value):
+        view.note(adjust_fl_check, value=value)
+        current_data['adjust_focal_length'] = value
+        view.schedule(update_new_focal_length)
+
+    def update_frame_range_option(check, key, value):
+        view.note(check, value=value)
+        current_data[key] = value
+        view.schedule(update_data_and_ui)
+
+    def update_aperture_field(field, value):
+        view.note(field, value=value)
+        view.schedule(preview_after_field_edit)
+
+    def preview_after_field_edit():
+        update_new_focal_length()
+
+    def _conform_settings_from_ui():
+        vfa_manual_mode = (not current_data['maintain_aspect_ratio'] and
+                           not current_data['preset_active'])
+        return engine.ConformSettings(
+            preset=current_data['selected_preset_name'] if current_data['preset_active'] else None,
+            target_hfa=view.value(new_aperture_field),
+            target_vfa=view.value(new_vertical_aperture_field) if vfa_manual_mode else None,
+            unit=current_data['unit'],
+            maintain_aspect_ratio=current_data['maintain_aspect_ratio'],
+            adjust_focal_length=current_data['adjust_focal_length']
+        )
+
+    def _resolve_targets_from_ui():
+        settings = _conform_settings_from_ui()
+        return engine.resolve_targets(
+            current_data['aperture'], current_data['vertical_aperture'], current_data['focal_length'],
+            target_hfa=settings.target_hfa, target_vfa=settings.target_vfa, preset=settings.preset,
+            maintain_aspect_ratio=settings.maintain_aspect_ratio,
+            adjust_focal_length=settings.adjust_focal_length, unit=settings.unit
+        )
+
+    def build_batch_section():
+        if batch_widgets: return
+        cmds.columnLayout(adjustableColumn=True, rowSpacing=5, parent=batch_frame)
+        cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=[(1, 'both', 5), (2, 'both', 5)])
+        batch_widgets['set'] = cmds.textField(
+            placeholderText="Camera set (optional)",
+            annotation="Name of an object set to load cameras from. Leave empty to use the selection."
+        )
+        cmds.button(label="Load Cameras", command=lambda *args: load_batch_cameras(),
+                    annotation="Loads every selected camera, or every camera in the set, using the settings above.")
+        cmds.setParent("..")
+        batch_widgets['summary'] = view.create(cmds.text, label="No cameras loaded.", align='left')
+        batch_widgets['table'] = cmds.textScrollList(numberOfRows=8, allowMultiSelection=False, font="fixedWidthFont")
+        batch_widgets['apply'] = view.create(
+            cmds.button, label="Apply to All", en=False,
+            annotation="Applies the settings above to every loaded camera as one undo step. Cameras already at target are not touched."
+        )
+        cmds.setParent("..")
+        cmds.button(batch_widgets['apply'], edit=True, command=lambda *args: instrument.profiled(apply_batch_to_cameras))
+
+    def load_batch_cameras():
+        camera_set = cmds.textField(batch_widgets['set'], query=True, text=True)
+        batch_state['cameras'] = batch.camera_shapes(camera_set or None)
+        batch_state['connected'] = None
+        if not current_data['camera_shape']: refresh()
+        view.schedule(preview_batch)
+
+    def preview_batch():
+        if not batch_widgets: return
+        plan = None
+        if batch_state['cameras'] and current_data['camera_shape']:
+            try:
+                # Focal curve connections are read once per load; Apply to All queries them again.
+                if batch_state['connected'] is None:
+                    batch_state['connected'] = curves.focal_curves_by_camera(batch_state['cameras'])
+                    batch_state['destinations'] = curves.curve_destinations(
+                        {curve for camera_curves in batch_state['connected'] for curve in camera_curves})
+                plan = batch.plan_batch(batch_state['cameras'], _conform_settings_from_ui(),
+                                        connected=batch_state['connected'], destinations=batch_state['destinations'])
+            except Exception as e_batch:
+                cmds.warning(f"Could not read batch cameras, please load them again: {e_batch}")
+                batch_state['cameras'] = []
+
+        rows = batch.format_rows(plan) if plan else []
+        if rows != batch_state['rows']:
+            cmds.textScrollList(batch_widgets['table'], edit=True, removeAll=True, append=rows)
+            batch_state['rows'] = rows
+        if plan:
+            view.set(batch_widgets['summary'], l=batch.summarize(plan))
+        elif batch_state['cameras']:
+            view.set(batch_widgets['summary'], l="Select a reference camera and press Refresh.")
+        else:
+            view.set(batch_widgets['summary'], l="No cameras loaded.")
+        view.set(batch_widgets['apply'], en=bool(plan and (plan.write_hfa | plan.write_vfa | plan.write_fl).any()))
+
+    def apply_batch_to_cameras():
+        if not batch_state['cameras'] or not current_data['camera_shape']: return
+        try:
+            result = batch.apply_batch(batch.plan_batch(batch_state['cameras'], _conform_settings_from_ui()))
+            conflicts = f", {result.conflicts} with conflicting focal curves (focal length kept)" if result.conflicts else ""
+            print(f"Batch apply: {result.changed} cameras changed ({result.set_attrs} attributes, "
+                  f"{len(result.curves)} curves), {result.skipped} already at target, {result.invalid} invalid{conflicts}.")
+        except Exception as e_batch:
+            cmds.warning(f"Error applying batch changes: {e_batch}")
+            traceback.print_exc()
+        refresh(force_reload_from_scene=True)
+
+    def build_whatif_section():
+        if whatif_widgets:
+            view.schedule(preview_whatif)
+            return
+        cmds.columnLayout(adjustableColumn=True, rowSpacing=5, parent=whatif_frame)
+        cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=[(1, 'both', 5), (2, 'both', 5)])
+        whatif_widgets['mode'] = cmds.optionMenu(
+            label="Mode", changeCommand=lambda value: set_whatif_mode(value),
+            annotation="Maintain Aspect keeps each camera's aspect ratio; Preset Aspect uses the preset's vertical aperture."
+        )
+        cmds.menuItem(label="Maintain Aspect")
+        cmds.menuItem(label="Preset Aspect")
+        cmds.button(label="Export CSV...", command=lambda *args: export_whatif_csv(),
+                    annotation="Writes every preset x camera result in both modes to a CSV file.")
+        cmds.setParent("..")
+        whatif_widgets['summary'] = view.create(cmds.text, label="No cameras loaded.", align='left')
+        whatif_widgets['table'] = cmds.textScrollList(
+            numberOfRows=10, allowMultiSelection=False, font="fixedWidthFont",
+            annotation="Per preset (filtered by the preset search): its apertures and the range of aspect ratio and focal length over the cameras."
+        )
+        cmds.setParent("..")
+        view.schedule(preview_whatif)
+
+    def set_whatif_mode(value):
+        whatif_state['mode'] = 0 if value == "Maintain Aspect" else 1
+        view.schedule(preview_whatif)
+
+    def preview_whatif():
+        """Recompute the what-if matrix when its cameras or presets changed, then redraw the table."""
+        if not whatif_widgets: return
+        cameras = batch_state['cameras'] or ([current_data['camera_shape']] if current_data['camera_shape'] else [])
+        presets = get_catalog().search(current_data['preset_filter'], limit=PRESET_LIST_LIMIT)
+        key = (tuple(cameras), tuple(presets))
+        if key != whatif_state['key'] or whatif_state['stale']:
+            matrix = None
+            if cameras and presets:
+                try:
+                    matrix = whatif.compare(cameras, presets)
+                except Exception as e_whatif:
+                    cmds.warning(f"Could not read the what-if cameras: {e_whatif}")
+            whatif_state.update(key=key, stale=False, matrix=matrix, cameras=cameras)
+
+        matrix = whatif_state['matrix']
+        rows = whatif.summary_rows(matrix, whatif_state['mode'], current_data['unit']) if matrix else []
+        if rows != whatif_state['rows']:
+            cmds.textScrollList(whatif_widgets['table'], edit=True, removeAll=True, append=rows)
+            whatif_state['rows'] = rows
+        if matrix:
+            view.set(whatif_widgets['summary'], l=f"{len(matrix.presets)} presets x {len(cameras)} cameras, "
+                                                  f"apertures in {current_data['unit']}")
+        else:
+            view.set(whatif_widgets['summary'], l="No cameras loaded." if not cameras else "No presets match the search.")
+
+    def export_whatif_csv():
+        if not whatif_state['matrix']: cmds.warning("Nothing to export: load a camera first."); return
+        paths = cmds.fileDialog2(fileFilter="CSV (*.csv)", dialogStyle=2, fileMode=0, caption="Export What-If CSV")
+        if not paths: return
+        try:
+            rows = whatif.write_csv(whatif_state['matrix'], whatif_state['cameras'], paths[0], unit=current_data['unit'])
+        except OSError as e_csv:
+            cmds.warning(f"Could not write {paths[0]}: {e_csv}")
+            return
+        print(f"What-if comparison: {rows} rows written to {paths[0]}.")
+
+    def update_unit_and_fields(value):
+        view.note(unit_menu, value=value)
+        if not current_data['camera_shape'] : return
+        
+        current_data['unit'] = value
+        view.schedule(update_data_and_ui)
+
+    def _selected_preset_in_list():
+        selected_items = cmds.textScrollList(preset_list, query=True, selectItem=True)
+        return selected_items[0] if selected_items else "None"
+
+    def render_preset_list():
+        """Fill the preset list from the filter text and select the active preset, only touching what changed."""
+        items = ["None"] + get_catalog().search(current_data['preset_filter'], limit=PRESET_LIST_LIMIT)
+        if items != preset_list_state['items']:
+            cmds.textScrollList(preset_list, edit=True, removeAll=True, append=items)
+            preset_list_state.update({'items': items, 'selected': None})
+
+        selected_name = current_data['selected_preset_name'] or "None"
+        if selected_name not in items: selected_name = None
+        if selected_name == preset_list_state['selected']: return
+        if selected_name:
+            cmds.textScrollList(preset_list, edit=True, selectItem=selected_name)
+        else:
+            cmds.textScrollList(preset_list, edit=True, deselectAll=True)
+        preset_list_state['selected'] = selected_name
+
+    def update_preset_filter(value):
+        view.note(preset_filter_field, text=value)
+        current_data['preset_filter'] = value
+        view.schedule(render_preset_list)
+
+    def apply_preset(preset_name_val):
+        preset_list_state['selected'] = preset_name_val
+        if not current_data['camera_shape']: return
+
+        current_data['selected_preset_name'] = preset_name_val
+        current_data['preset_active'] = (preset_name_val != "None" and preset_name_val in get_catalog())
+        
+        view.schedule(update_data_and_ui)
+
+    def apply_suggested_preset():
+        if not current_data['suggested_preset']: return
+        if current_data['preset_filter']:
+            current_data['preset_filter'] = ""
+            view.set(preset_filter_field, text="")
+        apply_preset(current_data['suggested_preset'])
+
+    def suggest_closest_preset():
+        current_data['suggested_preset'] = None
+        if not current_data['camera_shape']:
+            view.set(suggested_preset_text, l="Closest Preset: N/A")
+            return
+
+        matches = get_catalog().nearest(convert_aperture(current_data['aperture'], 'mm'),
+                                        convert_aperture(current_data['vertical_aperture'], 'mm'), k=1)
+        if not matches:
+            view.set(suggested_preset_text, l="Closest Preset: N/A")
+            return
+        current_data['suggested_preset'] = matches[0].name
+        view.set(suggested_preset_text, l=f"Closest Preset: {matches[0].name} ({matches[0].deviation_mm:.2f} mm off)")
+
+    def _image_plane_path(shape):
+        for plane in cmds.listConnections(shape + ".imagePlane", type="imagePlane", shapes=True) or []:
+            image_name = cmds.getAttr(plane + ".imageName")
+            if image_name: return image_name
+        return None
+
+    def preselect_plate_preset():
+        """Select the preset detected from the camera's image plane headers, if it has an image plane."""
+        image_name = _image_plane_path(current_data['camera_shape']) if current_data['camera_shape'] else None
+        if not image_name:
+            view.set(plate_preset_text, l="Plate Preset: N/A")
+            return
+        detection = platemeta.detect_preset(image_name)
+        if not detection:
+            view.set(plate_preset_text, l="Plate Preset: no match in the plate headers")
+            return
+        current_data['preset_active'] = True
+        current_data['selected_preset_name'] = detection.preset
+        view.set(plate_preset_text, l=f"Plate Preset: {detection.preset} (from {detection.source})")
+
+    def refresh_camera_info_display():
+        if not current_data['camera_shape']:
+            view.set(current_camera_text, l="Camera: Please select a camera.")
+            view.set(current_focal_length_text, l="Focal Length: N/A")
+            view.set(current_aperture_text, l="Horiz Film Aperture: N/A")
+            view.set(current_vertical_aperture_text, l="Vert Film Aperture: N/A")
+            return
+
+        view.set(current_camera_text, l=f"Camera: {current_data['camera_transform']}")
+        view.set(current_focal_length_text, l=f"Focal Length: {current_data['focal_length']:.4f} mm")
+        
+        hfa_inch = current_data['aperture']
+        vfa_inch = current_data['vertical_aperture']
+        hfa_mm = hfa_inch * 25.4
+        vfa_mm = vfa_inch * 25.4
+        view.set(current_aperture_text, l=f"Horiz Film Aperture: {hfa_inch:.4f} Inch ({hfa_mm:.3f} mm)")
+        view.set(current_vertical_aperture_text, l=f"Vert Film Aperture: {vfa_inch:.4f} Inch ({vfa_mm:.3f} mm)")
+
+    def update_data_and_ui():
+        has_camera = bool(current_data['camera_shape'])
+
+        view.set(preset_filter_field, en=has_camera)
+        view.set(preset_list, en=has_camera)
+        view.set(use_suggested_button, en=bool(has_camera and current_data['suggested_preset']))
+        view.set(unit_menu, en=has_camera)
+        view.set(new_aperture_field, en=(has_camera and not current_data['preset_active']))
+        view.set(maintain_aspect_check, en=has_camera, v=current_data['maintain_aspect_ratio'])
+        view.set(adjust_fl_check, en=has_camera, v=current_data['adjust_focal_length'])
+        view.set(frame_range_check, en=has_camera)
+        view.set(reduce_keys_check, en=(has_camera and current_data['preserve_fov_over_range']))
+        view.set(apply_button, en=has_camera)
+        view.set(reset_button, en=has_camera)
+
+        refresh_camera_info_display()
+
+        if has_camera:
+            hfa_source_inches = current_data['aperture']
+            if current_data['preset_active']:
+                preset_hfa_mm, _ = get_catalog().filmback_mm(current_data['selected_preset_name'])
+                hfa_source_inches = convert_to_inches(preset_hfa_mm, "mm")
+            view.set(new_aperture_field, v=convert_aperture(hfa_source_inches, current_data['unit']))
+
+            manage_vfa_field_state() 
+            
+            view.set(unit_menu, v=current_data['unit'])
+
+        else: 
+            view.set(new_aperture_field, v=0.0)
+            view.set(new_vertical_aperture_field, v=0.0, en=False)
+            current_data['selected_preset_name'] = "None"
+
+        render_preset_list()
+
+        update_new_focal_length()
+
+    def update_new_focal_length():
+        preview_batch()
+        preview_whatif()
+
+        if not current_data['camera_shape']:
+            for PTV, PPL in [(preview_h_ap_text, "New Horiz Aperture"), (preview_v_ap_text, "New Vert Aperture"), 
+                             (preview_aspect_text, "New Aspect Ratio"), (preview_fl_text, "New Focal Length")]:
+                view.set(PTV, l=f"{PPL}: N/A")
+            view.set(apply_button, en=False)
+            return
+        
+        try:
+            vfa_manual_mode_active = (not current_data['maintain_aspect_ratio'] and
+                                      not current_data['preset_active'])
+            targets = _resolve_targets_from_ui()
+            new_h_aperture_in_inches = float(targets.hfa)
+            preview_v_ap_inch = float(targets.vfa)
+            can_apply_hfa = bool(targets.hfa_valid)
+            can_apply_vfa = bool(targets.vfa_valid)
+
+            if not can_apply_hfa:
+                view.set(preview_h_ap_text, l="New Horiz Aperture: Invalid (>0)")
+            if not can_apply_vfa:
+                view.set(preview_v_ap_text, l="New Vert Aperture: Invalid (>0)")
+
+            if not vfa_manual_mode_active or can_apply_vfa : 
+                view.set(new_vertical_aperture_field, v=convert_aperture(preview_v_ap_inch, current_data['unit']))
+
+            preview_aspect_ratio = float(targets.aspect_ratio)
+            fl_preview_label = "New Focal Length: Error"
+
+            if current_data['adjust_focal_length']:
+                if can_apply_hfa and current_data['aperture'] > 0:
+                    fl_preview_label = f"New Focal Length: {float(targets.focal_length):.3f} mm"
+                elif can_apply_hfa:
+                    fl_preview_label = f"New Focal Length: {current_data['focal_length']:.3f} mm (Orig HFA 0)"
+                else: 
+                    fl_preview_label = "New Focal Length: Invalid HFA"
+            else:
+                fl_preview_label = f"Focal Length: {current_data['focal_length']:.3f} mm (Unchanged)"
+
+            if can_apply_hfa:
+                view.set(preview_h_ap_text, l=f"New Horiz Aperture: {new_h_aperture_in_inches:.4f} Inch ({convert_aperture(new_h_aperture_in_inches, 'mm'):.3f} mm)")
+            if can_apply_vfa or not vfa_manual_mode_active: 
+                 view.set(preview_v_ap_text, l=f"New Vert Aperture: {preview_v_ap_inch:.4f} Inch ({convert_aperture(preview_v_ap_inch, 'mm'):.3f} mm)")
+            
+            view.set(preview_aspect_text, l=f"New Aspect Ratio: {preview_aspect_ratio:.4f}")
+            view.set(preview_fl_text, l=fl_preview_label)
+            
+            view.set(apply_button, en=(can_apply_hfa and can_apply_vfa))
+
+        except Exception as e_update:
+            print(f"Error during preview update: {e_update}")
+            traceback.print_exc()
+            for PTV, PPL in [(preview_h_ap_text, "Horiz Aperture"), (preview_v_ap_text, "Vert Aperture"), 
+                             (preview_aspect_text, "Aspect Ratio"), (preview_fl_text, "Focal Length")]:
+                view.set(PTV, l=f"New {PPL}: Error")
+            view.set(apply_button, en=False)
+
+    def apply_new_focal_length():
+        if not current_data['camera_shape']: cmds.warning("No camera selected."); return
+
+        cmds.undoInfo(openChunk=True)
+        try:
+            targets = _resolve_targets_from_ui()
+            applied_h_ap_inches = float(targets.hfa)
+
+            if not targets.hfa_valid:
+                cmds.warning("Horizontal Aperture must be positive."); cmds.undoInfo(closeChunk=True); return
+
+            if current_data['preserve_fov_over_range'] and framerange.is_aperture_animated(current_data['camera_shape']):
+                apply_over_frame_range(targets)
+                refresh(force_reload_from_scene=True)
+                return
+            
+            cmds.setAttr(current_data['camera_shape'] + ".horizontalFilmAperture", applied_h_ap_inches)
+            
+            if not targets.vfa_valid:
+                cmds.warning("Manual Vertical Aperture was invalid (<=0). VFA not changed from camera's current value.")
+
+            applied_v_ap_inches = float(targets.vfa)
+            if applied_v_ap_inches > 0:
+                 cmds.setAttr(current_data['camera_shape'] + ".verticalFilmAperture", applied_v_ap_inches)
+            else: 
+                print(f"Warning: Final vertical aperture value ({applied_v_ap_inches}) is invalid. Not setting.")
+
+            applied_fl = current_data['focal_length']
+            curve_scale = 1.0
+            if targets.fl_changed:
+                focal_attr = current_data['camera_shape'] + ".focalLength"
+                fl_scale = float(targets.fl_scale)
+                applied_fl = float(targets.focal_length)
+
+                if curves.retarget_focal_curves([current_data['camera_shape']], [fl_scale]):
+                    curve_scale = fl_scale
+                else:
+                    cmds.setAttr(focal_attr, applied_fl)
+
+            journal.record(
+                [current_data['camera_shape']],
+                current_data['aperture'], current_data['vertical_aperture'], current_data['focal_length'],
+                applied_h_ap_inches, applied_v_ap_inches if applied_v_ap_inches > 0 else current_data['vertical_aperture'],
+                applied_fl, curve_scale
+            )
+            refresh(force_reload_from_scene=True)
+
+        except Exception as e_apply:
+            cmds.warning(f"Error applying changes: {e_apply}")
+            traceback.print_exc()
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    def apply_over_frame_range(targets):
+        shape = current_data['camera_shape']
+        new_vfa = float(targets.vfa) if targets.vfa > 0 else current_data['vertical_aperture']
+        if current_data['adjust_focal_length']:
+            start = cmds.playbackOptions(q=True, minTime=True)
+            end = cmds.playbackOptions(q=True, maxTime=True)
+            result = framerange.retime_focal_length(
+                shape, float(targets.hfa), start, end,
+                reduce_tolerance=framerange.DEFAULT_REDUCE_TOLERANCE if current_data['reduce_keys'] else None
+            )
+            print(f"Focal length keyed over frames {start:g}-{end:g}: {result.keys} keys for {result.frames} frames.")
+        framerange.set_static(shape + ".horizontalFilmAperture", float(targets.hfa))
+        framerange.set_static(shape + ".verticalFilmAperture", new_vfa)
+        sync.watch(shape)  # Which attributes are animated has changed.
+        # The per-frame focal length cannot be described by one scale; the journal keeps the static values only.
+        journal.record(
+            [shape], current_data['aperture'], current_data['vertical_aperture'], current_data['focal_length'],
+            float(targets.hfa), new_vfa, current_data['focal_length'], float("nan")
+        )
+
+    def reset_inputs():
+        if not current_data['camera_shape']: cmds.warning("No camera selected."); return
+        
+        current_data.update({
+            'unit': 'Inch', 'maintain_aspect_ratio': True,
+            'preset_active': False, 'selected_preset_name': "None", 
+            'adjust_focal_length': True
+        })
+        refresh(force_reload_from_scene=True)
+
+    def refresh(force_reload_from_scene=False):
+        whatif_state['stale'] = True
+        sync.start()
+        if force_reload_from_scene: sync.invalidate()
+        new_cam_transform, new_cam_shape = sync.selected_camera()
+        previous_shape = current_data.get('camera_shape')
+        
+        if new_cam_shape and (new_cam_shape != current_data.get('camera_shape') or force_reload_from_scene):
+            try:
+                current_data.update({'camera_shape': new_cam_shape, 'camera_transform': new_cam_transform})
+                _read_camera_attributes(new_cam_shape)
+            except Exception as e_refresh:
+                print(f"Refresh: Error reading attributes from {new_cam_shape}: {e_refresh}")
+                current_data.update({'camera_shape': None, 'camera_transform': None}) 
+        elif not new_cam_shape: 
+             current_data.update({'camera_shape': None, 'camera_transform': None})
+        if current_data['camera_shape'] != sync.camera_shape:
+            sync.watch(current_data['camera_shape'], current_data['camera_transform'])
+
+
+        current_data['preset_active'] = False
+        current_data['selected_preset_name'] = "None"
+        current_data['maintain_aspect_ratio'] = True
+        current_data['adjust_focal_length'] = True
+        suggest_closest_preset()
+        # The plate preset is preselected only for a newly loaded camera; reloading the same one skips it.
+        if current_data['camera_shape'] != previous_shape: preselect_plate_preset()
+        
+        view.schedule(update_data_and_ui)
+
+    _window_session['refresh'] = refresh
+    cmds.showWindow(window)
+    refresh(force_reload_from_scene=True)
+    return window
@@ -0,0 +1,94 @@
+# cameraApertureFix - diffing widget view model
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# The tool's update functions describe the complete state every widget should
+# show. WidgetView remembers what each widget last rendered and, on render(),
+# issues one edit call per widget containing only the flags that changed.
+# Bursts of change callbacks are coalesced into a single deferred render per
+# idle tick with cmds.evalDeferred.
+
+import maya.cmds as cmds
+
+FLAG_ALIASES = {"en": "enable", "l": "label", "v": "value", "sl": "select", "vis": "visible"}
+TRACKED_FLAGS = ("enable", "label", "value", "visible")
+
+_UNSET = object()
+
+
+def _normalize(flags):
+    return {FLAG_ALIASES.get(flag, flag): value for flag, value in flags.items()}
+
+
+class WidgetView(object):
+    def __init__(self, window=None):
+        self.window = window
+        self._commands = {}
+        self._rendered = {}
+        self._pending = {}
+        self._scheduled = []
+        self._render_queued = False
+        self.edit_calls = 0
+        self.skipped_flags = 0
+        self.total_edit_calls = 0
+
+    def create(self, command, *args, **flags):
+        """Create a widget with command and remember the state it was created with."""
+        widget = command(*args, **flags)
+        flags = _normalize(flags)
+        self._commands[widget] = command
+        self._rendered[widget] = {flag: flags[flag] for flag in TRACKED_FLAGS if flag in flags}
+        return widget
+
+    def set(self, widget, **flags):
+        self._pending.setdefault(widget, {}).update(_normalize(flags))
+
+    def note(self, widget, **flags):
+        """Record a value the user already changed in the widget, so it is neither queried nor re-sent."""
+        flags = _normalize(flags)
+        self._rendered[widget].update(flags)
+        pending = self._pending.get(widget)
+        if pending:
+            for flag in flags: pending.pop(flag, None)
+
+    def value(self, widget, flag="value"):
+        pending = self._pending.get(widget, {})
+        if flag in pending: return pending[flag]
+        return self._rendered[widget].get(flag)
+
+    def render(self):
+        """Push pending state to the widgets and return the number of edit calls issued."""
+        self.edit_calls = 0
+        self.skipped_flags = 0
+        pending, self._pending = self._pending, {}
+        for widget, flags in pending.items():
+            rendered = self._rendered[widget]
+            changed = {flag: value for flag, value in flags.items() if rendered.get(flag, _UNSET) != value}
+            self.skipped_flags += len(flags) - len(changed)
+            if not changed: continue
+            self._commands[widget](widget, edit=True, **changed)
+            rendered.update(changed)
+            self.edit_calls += 1
+        self.total_edit_calls += self.edit_calls
+        return self.edit_calls
+
+    def schedule(self, callback):
+        """Run callback, then render, on the next idle tick. Repeated requests are coalesced."""
+        if callback not in self._scheduled: self._scheduled.append(callback)
+        if not self._render_queued:
+            self._render_queued = True
+            cmds.evalDeferred(self._run_scheduled, lowestPriority=True)
+
+    def _run_scheduled(self):
+        callbacks, self._scheduled = self._scheduled, []
+        self._render_queued = False
+        if self.window and not cmds.window(self.window, exists=True): return
+        for callback in callbacks:
+            callback()
+        self.render()
+
+    def report(self):
+        return f"{self.edit_calls} widget edits issued, {self.skipped_flags} unchanged flags skipped"
+
@@ -0,0 +1,84 @@
+# cameraApertureFix - preset what-if comparison
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Shows what every shot camera would end up with under every candidate preset
+# before anything is applied. The cameras are read in one API pass and the
+# whole presets x cameras (x frames) matrix comes from one
+# engine.preset_matrix broadcast; the window summarizes it per preset and
+# write_csv streams it out cell by cell. Only compare() touches Maya.
+
+import csv
+
+import numpy as np
+
+from cameraApertureFix import engine
+
+CSV_COLUMNS = ("mode", "preset", "camera", "frame", "hfa", "vfa", "aspect_ratio", "focal_length", "fl_scale")
+
+
+def compare(camera_shapes, presets=None, frames=None):
+    """Build the PresetMatrix of camera_shapes in the open scene, optionally sampling focal length at frames."""
+    from cameraApertureFix import audit, framerange
+    hfa, vfa, focal_length = audit.read_camera_attributes(camera_shapes)
+    if frames is not None:
+        frames = np.asarray(frames, dtype=np.float64)
+        focal_length = np.vstack([framerange.sampler(shape + ".focalLength")(frames) for shape in camera_shapes])
+    return engine.preset_matrix(hfa, vfa, focal_length, presets)
+
+
+def _span(values, spec):
+    low, high = float(np.min(values)), float(np.max(values))
+    if format(low, spec) == format(high, spec): return format(low, spec)
+    return f"{low:{spec}}-{high:{spec}}"
+
+
+def summary_rows(matrix, mode=0, unit="mm"):
+    """One fixed-width line per preset: its HFA, and the range of VFA, aspect and focal length over the cameras."""
+    spec = ".3f" if unit == "mm" else ".4f"
+    rows = []
+    for p, name in enumerate(matrix.presets):
+        hfa = engine.convert_aperture(matrix.hfa[mode, p], unit)
+        vfa = engine.convert_aperture(matrix.vfa[mode, p], unit)
+        rows.append(f"{name[:34]:<34} {_span(hfa, spec):>7} x {_span(vfa, spec):<15} "
+                    f"AR {_span(matrix.aspect_ratio[mode, p], '.3f'):<13} "
+                    f"FL {_span(matrix.focal_length[mode, p], '.2f')}")
+    return rows
+
+
+def write_csv(matrix, cameras, path, frames=None, unit="Inch"):
+    """Write every cell of matrix to a CSV file, one row per mode, preset, camera (and frame). Returns rows written.
+
+    cameras labels the camera axis; frames labels the frame axis when the
+    matrix was built from per-frame focal lengths (default: 0, 1, 2, ...).
+    Apertures are in unit. Raises ValueError if frames does not match the
+    frame axis.
+    """
+    per_frame = matrix.focal_length.ndim == 4
+    frame_labels = [""]
+    if per_frame:
+        frame_count = matrix.focal_length.shape[-1]
+        frame_labels = list(range(frame_count)) if frames is None else list(frames)
+        if len(frame_labels) != frame_count:
+            raise ValueError(f"{len(frame_labels)} frame labels for a matrix of {frame_count} frames.")
+    camera_count = len(cameras)
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_COLUMNS)
+        for mode, mode_name in enumerate(engine.MATRIX_MODES):
+            for p, preset in enumerate(matrix.presets):
+                hfa = engine.convert_aperture(matrix.hfa[mode, p], unit).tolist()
+                vfa = engine.convert_aperture(matrix.vfa[mode, p], unit).tolist()
+                aspect = matrix.aspect_ratio[mode, p].tolist()
+                focal_length = matrix.focal_length[mode, p].reshape(camera_count, -1).tolist()
+                fl_scale = np.broadcast_to(matrix.fl_scale[mode, p].reshape(camera_count, -1),
+                                           (camera_count, len(frame_labels))).tolist()
+                writer.writerows(
+                    (mode_name, preset, camera, frame, hfa[c], vfa[c], aspect[c], focal_length[c][f], fl_scale[c][f])
+                    for c, camera in enumerate(cameras) for f, frame in enumerate(frame_labels)
+                )
+                rows += camera_count * len(frame_labels)
+    return rows
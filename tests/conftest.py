@@ -0,0 +1,29 @@
+# cameraApertureFix - test configuration
+# Copyright (c) 2024 Giuseppe Pagnozzi
+#
+# It's licensed under the MIT License
+# visit https://opensource.org/licenses/MIT for the full terms.
+#
+# Runs the tests without Maya: benchmarks/fake_cmds.py stands in for
+# maya.cmds and maya.api.OpenMaya before any cameraApertureFix module loads.
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fake_cmds import FakeCmds
+
+_fake = FakeCmds().install()
+
+
+@pytest.fixture
+def fake_cmds():
+    """The maya.cmds stand-in, with an empty scene."""
+    _fake.reset()
+    yield _fake
+    _fake.reset()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from cameraApertureFix import batch, engine, journal
+
+SETTINGS = engine.ConformSettings(preset="Super 35mm Film")
+
+
+@pytest.fixture
+def shared_curve_scene(fake_cmds, tmp_path):
+    fake_cmds.scene_name = str(tmp_path / "shot.ma")
+    fake_cmds.add_camera("leftShape", hfa=1.417, vfa=0.945, focal_length=35.0)
+    fake_cmds.add_camera("rightShape", hfa=0.980, vfa=0.735, focal_length=35.0)
+    curve = fake_cmds.add_curve("rig_focalLength", [0.0, 10.0], [35.0, 50.0])
+    fake_cmds.connect_curve(curve, "leftShape.focalLength")
+    fake_cmds.connect_curve(curve, "rightShape.focalLength")
+    fake_cmds.add_camera("staticShape", hfa=1.417, vfa=0.945, focal_length=35.0)
+    return fake_cmds
+
+
+def test_shared_curve_needing_different_scales_is_a_conflict(shared_curve_scene):
+    plan = batch.plan_batch(["leftShape", "rightShape", "staticShape"], SETTINGS)
+    assert plan.status.tolist() == [batch.STATUS_CONFLICT, batch.STATUS_CONFLICT, batch.STATUS_CHANGE]
+    assert plan.write_fl.tolist() == [False, False, True]
+    assert "conflict" in batch.format_rows(plan)[0]
+    assert "2 with a shared focal curve" in batch.summarize(plan)
+
+
+def test_conflicting_cameras_journal_the_kept_focal_length(shared_curve_scene):
+    plan = batch.plan_batch(["leftShape", "rightShape", "staticShape"], SETTINGS)
+    result = batch.apply_batch(plan)
+    assert (result.changed, result.conflicts, result.curves) == (1, 2, [])
+    assert shared_curve_scene.curves["rig_focalLength"].values == [35.0, 50.0]
+
+    transaction, = journal.pending_reverts()
+    records = journal.read_records(transaction)
+    assert transaction.count == 3
+    np.testing.assert_allclose(records["new_fl"][:2], [35.0, 35.0])
+    np.testing.assert_allclose(records["curve_scale"][:2], [1.0, 1.0])
+    np.testing.assert_allclose(records["new_hfa"], plan.targets.hfa)
+    assert records["new_fl"][2] == pytest.approx(plan.targets.focal_length[2])
+
+
+def test_curve_shared_with_a_camera_outside_the_batch_is_a_conflict(shared_curve_scene):
+    plan = batch.plan_batch(["leftShape", "staticShape"], SETTINGS)
+    assert plan.status.tolist() == [batch.STATUS_CONFLICT, batch.STATUS_CHANGE]
+    result = batch.apply_batch(plan)
+    assert result.curves == []
+    assert shared_curve_scene.curves["rig_focalLength"].values == [35.0, 50.0]
@@ -0,0 +1,27 @@
+from cameraApertureFix import ui
+
+
+def label(fake_cmds, prefix):
+    return next(w.flags["label"] for w in fake_cmds.widgets.values()
+                if w.kind == "text" and w.flags.get("label", "").startswith(prefix))
+
+
+def test_loaded_camera_is_followed_through_rename_and_delete(fake_cmds):
+    fake_cmds.add_camera("shotCamShape", focal_length=35.0, transform="shotCam")
+    fake_cmds.select("shotCam")
+    ui.create_camera_tool_ui()
+    fake_cmds.process_idle()
+    assert label(fake_cmds, "Camera:") == "Camera: shotCam"
+
+    fake_cmds.rename("shotCam", "heroCam")
+    fake_cmds.rename("shotCamShape", "heroCamShape")
+    fake_cmds.process_idle()
+    assert label(fake_cmds, "Camera:") == "Camera: heroCam"
+    fake_cmds.setAttr("heroCamShape.focalLength", 50.0)
+    fake_cmds.fire("attributeChange", "heroCamShape.focalLength")
+    fake_cmds.process_idle()
+    assert label(fake_cmds, "Focal Length:") == "Focal Length: 50.0000 mm"
+
+    fake_cmds.delete("heroCamShape")
+    fake_cmds.process_idle()
+    assert label(fake_cmds, "Camera:") == "Camera: Please select a camera."
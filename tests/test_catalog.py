@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from cameraApertureFix.catalog import MM_PER_INCH, get_catalog, reload_catalog
+
+
+@pytest.fixture(autouse=True)
+def builtin_catalog():
+    yield
+    reload_catalog()
+
+
+def test_bad_row_leaves_none_of_its_file(tmp_path, capsys):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("name,horizontal,vertical\nGood,36,24\nBad,abc,24\n")
+    good = tmp_path / "good.csv"
+    good.write_text("name,horizontal,vertical\nOther,30,20\n")
+    catalog = reload_catalog([str(bad), str(good)])
+    assert "Good" not in catalog.names and "Other" in catalog.names
+    assert "bad.csv" in capsys.readouterr().out
+
+
+def test_null_aperture_is_a_warning_not_an_error(tmp_path, capsys):
+    path = tmp_path / "null.json"
+    path.write_text(json.dumps({"Null Gate": {"horizontal": None, "vertical": 24.0}}))
+    assert "Null Gate" not in reload_catalog([str(path)]).names
+    assert "null.json" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("unit", ["Inch", "inch", "INCH"])
+def test_inch_unit_is_case_insensitive(tmp_path, unit):
+    path = tmp_path / "inch.csv"
+    path.write_text(f"name,horizontal,vertical,unit\nInch Gate,1.0,0.5,{unit}\n")
+    reload_catalog([str(path)])
+    assert get_catalog().filmback_mm("Inch Gate") == pytest.approx((MM_PER_INCH, MM_PER_INCH / 2))
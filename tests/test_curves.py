@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+from cameraApertureFix import curves
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_retarget_matches_scale_key_and_keeps_tangent_types(fake_cmds, weighted):
+    results = []
+    for scale_with_bulk in (False, True):
+        fake_cmds.reset()
+        fake_cmds.add_camera("shotCamShape")
+        curve = fake_cmds.add_curve("shotCamShape_focalLength", [0.0, 10.0, 20.0, 30.0], [35.0, 40.0, 45.0, 50.0],
+                                    weighted=weighted)
+        fake_cmds.curves[curve].in_type = ["fixed", "auto", "spline", "fixed"]
+        fake_cmds.curves[curve].out_type = ["auto", "fixed", "spline", "fixed"]
+        fake_cmds.curves[curve].in_angle = [10.0, 20.0, 30.0, 40.0]
+        fake_cmds.curves[curve].out_angle = [10.0, 20.0, 30.0, 40.0]
+        fake_cmds.connect_curve(curve, "shotCamShape.focalLength")
+        if scale_with_bulk:
+            assert curves.retarget_focal_curves(["shotCamShape"], [0.5]) == [curve]
+        else:
+            fake_cmds.scaleKey(curve, valueScale=0.5, valuePivot=0.0)
+        results.append(fake_cmds.curves[curve])
+
+    expected, result = results
+    assert result.values == expected.values
+    assert result.in_type == ["fixed", "auto", "spline", "fixed"]
+    assert result.out_type == ["auto", "fixed", "spline", "fixed"]
+    for side in ("in", "out"):
+        for k, tangent_type in enumerate(getattr(result, side + "_type")):
+            if tangent_type != "fixed": continue
+            assert math.isclose(getattr(result, side + "_angle")[k], getattr(expected, side + "_angle")[k])
+            assert math.isclose(getattr(result, side + "_weight")[k], getattr(expected, side + "_weight")[k])
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from cameraApertureFix import audit, engine
+from cameraApertureFix.catalog import get_catalog, reload_catalog
+
+PRESET = "Super 35mm Film"
+OTHER_PRESET = "Arri Alexa Mini LF (Open Gate)"
+
+
+@pytest.fixture(autouse=True, scope="module")
+def builtin_catalog():
+    reload_catalog(paths=[])
+    yield
+    reload_catalog()
+
+
+def preset_inches(name):
+    return tuple(value / engine.MM_PER_INCH for value in get_catalog().filmback_mm(name))
+
+
+def test_maintain_aspect_keeps_camera_aspect_and_scales_focal_length():
+    targets = engine.resolve_targets([1.417, 0.980], [0.945, 0.735], [35.0, 50.0], preset=PRESET)
+    preset_hfa, _ = preset_inches(PRESET)
+    np.testing.assert_allclose(targets.hfa, preset_hfa)
+    np.testing.assert_allclose(targets.aspect_ratio, [1.417 / 0.945, 0.980 / 0.735])
+    np.testing.assert_allclose(targets.vfa, preset_hfa / np.array([1.417 / 0.945, 0.980 / 0.735]))
+    np.testing.assert_allclose(targets.fl_scale, preset_hfa / np.array([1.417, 0.980]))
+    np.testing.assert_allclose(targets.focal_length, [35.0, 50.0] * targets.fl_scale)
+    assert targets.preset_active.all() and targets.fl_changed.all()
+
+
+def test_preset_aspect_uses_preset_vertical_aperture():
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, preset=PRESET, maintain_aspect_ratio=False)
+    preset_hfa, preset_vfa = preset_inches(PRESET)
+    assert targets.hfa == pytest.approx(preset_hfa)
+    assert targets.vfa == pytest.approx(preset_vfa)
+    assert targets.aspect_ratio == pytest.approx(preset_hfa / preset_vfa)
+
+
+def test_manual_vfa_is_converted_from_unit():
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, target_hfa=36.0, target_vfa=24.0,
+                                     maintain_aspect_ratio=False, unit="mm")
+    assert targets.hfa == pytest.approx(36.0 / 25.4)
+    assert targets.vfa == pytest.approx(24.0 / 25.4)
+    assert targets.vfa_valid and not targets.preset_active
+
+
+def test_zero_manual_vfa_is_invalid_and_keeps_current_vfa():
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, target_hfa=1.0, target_vfa=0.0,
+                                     maintain_aspect_ratio=False)
+    assert not targets.vfa_valid
+    assert targets.vfa == pytest.approx(0.945)
+
+
+def test_zero_apertures():
+    # A zero target is invalid and leaves the focal length alone.
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, target_hfa=0.0)
+    assert not targets.hfa_valid
+    assert targets.fl_scale == 1.0 and not targets.fl_changed
+    # A camera with no aperture cannot be scaled, nor its aspect kept.
+    targets = engine.resolve_targets(0.0, 0.0, 35.0, target_hfa=1.0)
+    assert targets.hfa_valid
+    assert targets.fl_scale == 1.0 and targets.focal_length == 35.0
+    assert targets.vfa == 1.0 and targets.aspect_ratio == 1.0
+
+
+def test_fl_scale_without_adjust_focal_length():
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, target_hfa=0.980, adjust_focal_length=False)
+    assert targets.fl_scale == 1.0 and targets.focal_length == 35.0 and not targets.fl_changed
+    targets = engine.resolve_targets(1.417, 0.945, 35.0, target_hfa=1.417)
+    assert targets.fl_scale == pytest.approx(1.0) and not targets.fl_changed
+
+
+def test_unknown_preset_falls_back_to_target_hfa():
+    targets = engine.resolve_targets([1.417, 1.417], 0.945, 35.0, target_hfa=0.980, preset=["None", PRESET])
+    assert targets.preset_active.tolist() == [False, True]
+    assert targets.hfa[0] == pytest.approx(0.980)
+
+
+def test_preset_matrix_matches_resolve_targets():
+    hfa = np.array([1.417, 0.980, 0.0])
+    vfa = np.array([0.945, 0.735, 0.0])
+    focal_length = np.array([35.0, 50.0, 24.0])
+    presets = [PRESET, OTHER_PRESET]
+    matrix = engine.preset_matrix(hfa, vfa, focal_length, presets)
+    assert matrix.hfa.shape == (2, 2, 3)
+    for mode, maintain in enumerate((True, False)):
+        for p, preset in enumerate(presets):
+            targets = engine.resolve_targets(hfa, vfa, focal_length, preset=preset, maintain_aspect_ratio=maintain)
+            for field in ("hfa", "vfa", "aspect_ratio", "focal_length", "fl_scale"):
+                np.testing.assert_allclose(getattr(matrix, field)[mode, p], getattr(targets, field))
+
+
+def test_preset_matrix_per_frame_focal_length():
+    per_frame = np.array([[35.0, 40.0, 45.0], [50.0, 50.0, 50.0]])
+    matrix = engine.preset_matrix([1.417, 0.980], [0.945, 0.735], per_frame, [PRESET])
+    assert matrix.focal_length.shape == (2, 1, 2, 3)
+    preset_hfa, _ = preset_inches(PRESET)
+    np.testing.assert_allclose(matrix.focal_length[0, 0], per_frame * (preset_hfa / np.array([1.417, 0.980]))[:, None])
+
+
+def test_resolve_for_cameras_read_from_scene(fake_cmds):
+    fake_cmds.add_camera("shotCamShape", hfa=1.417, vfa=0.945, focal_length=35.0)
+    fake_cmds.add_camera("witnessCamShape", hfa=0.980, vfa=0.735, focal_length=50.0)
+    hfa, vfa, focal_length = audit.read_camera_attributes(["shotCamShape", "witnessCamShape"])
+    cameras = [engine.CameraFilmback(name, h, v, fl, ())
+               for name, h, v, fl in zip(["shotCamShape", "witnessCamShape"], hfa, vfa, focal_length)]
+    targets = engine.resolve_for_cameras(cameras, engine.ConformSettings(preset=PRESET))
+    expected = engine.resolve_targets(hfa, vfa, focal_length, preset=PRESET)
+    np.testing.assert_allclose(targets.focal_length, expected.focal_length)
+    np.testing.assert_allclose(targets.hfa, preset_inches(PRESET)[0])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from cameraApertureFix import export
+
+
+def rotation(axis, degrees):
+    """A Maya (row-vector) rotation about axis."""
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    matrix = np.eye(3)
+    matrix[i, i], matrix[i, j], matrix[j, i], matrix[j, j] = c, s, -s, c
+    return matrix
+
+
+def world_matrix(translate, rotate, rotate_order, scale=1.0):
+    matrix = np.eye(4)
+    matrix[:3, :3] = scale * np.eye(3)
+    for axis in export.ROTATE_ORDERS[rotate_order]:
+        index = "xyz".index(axis)
+        matrix[:3, :3] = matrix[:3, :3] @ rotation(index, rotate[index])
+    matrix[3, :3] = translate
+    return matrix.ravel()
+
+
+@pytest.mark.parametrize("rotate_order", range(6))
+def test_matrix_channels_recovers_translate_and_rotate(rotate_order):
+    translate, rotate = [1.0, -2.0, 3.5], [10.0, -35.0, 70.0]
+    channels = export.matrix_channels([world_matrix(translate, rotate, rotate_order, scale=2.0)], rotate_order)
+    np.testing.assert_allclose(channels, [translate + rotate], atol=1e-9)
+
+
+def test_chan_export_writes_world_space(fake_cmds, tmp_path):
+    fake_cmds.add_camera("shotCamShape", transform="shotCam")
+    fake_cmds.attrs["shotCam"] = {"translateX": 5.0, "worldMatrix[0]": world_matrix([1.0, 2.0, 3.0], [0.0, 90.0, 0.0], 0)}
+    path = str(tmp_path / "shot.chan")
+    assert export.export_camera("shotCamShape", path, start=1, end=2) == 2
+    first = [float(v) for v in open(path).readline().split()]
+    np.testing.assert_allclose(first[:7], [1.0, 1.0, 2.0, 3.0, 0.0, 90.0, 0.0], atol=1e-6)
+
+
+def test_export_paths_are_unique_per_full_path(tmp_path):
+    paths = [export.export_path(str(tmp_path), shape) for shape in ("|shotA|camShape", "|shotB|camShape")]
+    assert paths[0] != paths[1]
+    assert paths[0].endswith("shotA__camShape.jsonl")
+
+
+def test_export_is_attributed_when_instrumented(fake_cmds, tmp_path):
+    from cameraApertureFix import instrument
+    fake_cmds.add_camera("shotCamShape", transform="shotCam")
+    fake_cmds.connect_curve(fake_cmds.add_curve("shotCam_translateX", [1.0, 2.0], [0.0, 1.0]), "shotCam.translateX")
+    instrument.recorder.reset()
+    instrument.install()
+    try:
+        export.export_camera("shotCamShape", str(tmp_path / "shot.chan"), start=1, end=2)
+    finally:
+        instrument.uninstall()
+    commands = instrument.recorder.summary()["sections"]["export"]["commands"]
+    assert commands["getAttr"] >= 2
+
+
+def test_display_layer_connection_keeps_the_static_path(fake_cmds, tmp_path):
+    fake_cmds.add_camera("shotCamShape", transform="shotCam")
+    fake_cmds.connect_curve("layer1", "shotCam.drawOverride")
+    fake_cmds.reset_calls()
+    export.export_camera("shotCamShape", str(tmp_path / "shot.chan"), start=1, end=100)
+    assert fake_cmds.calls["getAttr"] == 5  # rotateOrder, one world matrix, three static camera attributes
+
+    fake_cmds.connect_curve(fake_cmds.add_curve("shotCam_rotateY", [1.0, 100.0], [0.0, 90.0]), "shotCam.rotateY")
+    fake_cmds.reset_calls()
+    export.export_camera("shotCamShape", str(tmp_path / "shot.chan"), start=1, end=100)
+    assert fake_cmds.calls["getAttr"] == 4 + 100
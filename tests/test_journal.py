@@ -0,0 +1,27 @@
+import pytest
+
+from cameraApertureFix import journal
+
+
+@pytest.fixture
+def scene(fake_cmds, tmp_path):
+    fake_cmds.scene_name = str(tmp_path / "shot.ma")
+    fake_cmds.add_camera("keyedShape", hfa=0.980, vfa=0.735, focal_length=50.0)
+    fake_cmds.add_camera("staticShape", hfa=0.980, vfa=0.735, focal_length=50.0)
+    curve = fake_cmds.add_curve("keyedShape_focalLength", [0.0, 10.0], [40.0, 60.0])
+    fake_cmds.connect_curve(curve, "keyedShape.focalLength")
+    return fake_cmds
+
+
+def test_revert_leaves_unscaled_focal_animation_alone(scene):
+    journal.record(["keyedShape", "staticShape"], 1.417, 0.945, 35.0, 0.980, 0.735, 50.0, 1.0)
+    assert journal.revert() == 2
+    assert scene.attrs["keyedShape"] == {"horizontalFilmAperture": 1.417, "verticalFilmAperture": 0.945,
+                                         "focalLength": 50.0}
+    assert scene.curves["keyedShape_focalLength"].values == [40.0, 60.0]
+    assert scene.attrs["staticShape"]["focalLength"] == 35.0
+
+
+def test_unresolved_cameras_are_not_journaled(scene):
+    with pytest.raises(ValueError, match="not full paths"):
+        journal.make_records(["keyedShape", "missingShape"], 1.0, 1.0, 35.0, 1.0, 1.0, 35.0, 1.0)
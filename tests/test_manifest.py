@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from cameraApertureFix import engine, manifest
+
+SETTINGS = engine.ConformSettings(preset="Super 35mm Film")
+
+
+def test_bad_lines_are_reported_and_the_rest_conformed():
+    lines = [
+        '{"name": "a", "hfa": 1.417, "vfa": 0.945, "fl": 35.0, "fl_frames": [35.0, 40.0]}',
+        '{"name": "b", "hfa": 1.417, "vfa": 0.945, "fl": 35.0, "fl_frames": ["x"]}',
+        '{"name": "c", "hfa": NaN, "vfa": 0.945, "fl": 35.0}',
+        '{"name": "d", "hfa": 1.417, "vfa": 0.945, "fl": 35.0, "fl_frames": [Infinity]}',
+        '{"name": "e", "hfa": 1.417, "vfa": 0.945, "fl": 35.0, "note": NaN}',
+        '{"name": "f"}',
+    ]
+    text, errors = manifest.conform_lines(lines, SETTINGS, first_line=10)
+    assert [number for number, _ in errors] == [11, 12, 13, 14, 15]
+    record, = [json.loads(line) for line in text.splitlines()]
+    assert record["name"] == "a"
+    assert record["fl_frames"][1] == pytest.approx(record["fl_frames"][0] * 40.0 / 35.0)
@@ -0,0 +1,51 @@
+import os
+import stat
+from unittest import mock
+
+from cameraApertureFix import engine, mayaascii
+
+CAMERA_SCENE = ('createNode transform -n "shotCam";\n'
+                'createNode camera -n "shotCamShape" -p "shotCam";\n'
+                '\tsetAttr ".cap" -type "double2" 1.417 0.945 ;\n'
+                '\tsetAttr ".fl" 35;\n')
+SETTINGS = engine.ConformSettings(preset="Super 35mm Film")
+
+
+def write_scene(path, text, mode):
+    path.write_text(text)
+    os.chmod(path, mode)
+    return str(path)
+
+
+def mode_of(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_in_place_keeps_permissions(tmp_path):
+    scene = write_scene(tmp_path / "shot.ma", CAMERA_SCENE, 0o664)
+    result = mayaascii.conform_file(scene, SETTINGS, in_place=True)
+    assert result.error is None and result.cameras == 1
+    assert mode_of(scene) == 0o664
+    assert os.listdir(tmp_path) == ["shot.ma"]
+
+
+def test_in_place_failure_removes_temporary_file(tmp_path):
+    scene = write_scene(tmp_path / "shot.ma", CAMERA_SCENE, 0o644)
+    with mock.patch.object(mayaascii, "rewrite_scene", side_effect=RuntimeError("disk full")):
+        result = mayaascii.conform_file(scene, SETTINGS, in_place=True)
+    assert result.error == "RuntimeError: disk full"
+    assert os.listdir(tmp_path) == ["shot.ma"]
+    assert (tmp_path / "shot.ma").read_text() == CAMERA_SCENE
+
+
+def test_output_dir_receives_unchanged_scenes(tmp_path):
+    source = tmp_path / "shots"
+    output = tmp_path / "conformed"
+    source.mkdir(); output.mkdir()
+    write_scene(source / "a.ma", CAMERA_SCENE, 0o664)
+    write_scene(source / "b.ma", 'createNode transform -n "group1";\n', 0o640)
+    results = list(mayaascii.conform_files([str(source)], SETTINGS, output_dir=str(output), processes=1))
+    assert [r.error for r in results] == [None, None]
+    assert sorted(os.listdir(output)) == ["a.ma", "b.ma"]
+    assert (output / "b.ma").read_text() == 'createNode transform -n "group1";\n'
+    assert mode_of(output / "a.ma") == 0o664 and mode_of(output / "b.ma") == 0o640
@@ -0,0 +1,41 @@
+import os
+import struct
+
+import pytest
+
+from cameraApertureFix import mayaascii, mayabinary
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def chunk(tag, body):
+    return tag + struct.pack(">I", len(body)) + body + b"\0" * (-len(body) % 4)
+
+
+def form(form_type, children):
+    return chunk(b"FOR4", form_type + b"".join(children))
+
+
+def test_empty_create_chunk_is_not_read_past_its_end(tmp_path):
+    path = tmp_path / "empty_create.mb"
+    # The empty chunk ends the file, so reading its flags byte would run off the end.
+    path.write_bytes(form(mayabinary.SCENE_FORM, [
+        form(mayabinary.CAMERA_FORM, [chunk(mayabinary.CREATE_TAG, b"\0shotCamShape\0shotCam\0")]),
+        form(mayabinary.CAMERA_FORM, [chunk(b"DBLE", b"fl\0\0" + struct.pack(">d", 50.0)),
+                                      chunk(mayabinary.CREATE_TAG, b"")]),
+    ]))
+    assert list(mayabinary.scan_scene(str(path))) == ["shotCam|shotCamShape"]
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(FIXTURES, "maya_saved.mb")),
+                    reason="needs tests/fixtures/maya_saved.mb and .ma, the same scene saved by Maya in both formats")
+def test_reader_agrees_with_maya_ascii_on_a_maya_saved_scene():
+    binary = mayabinary.scan_scene(os.path.join(FIXTURES, "maya_saved.mb"))
+    ascii_ = mayaascii.scan_scene(os.path.join(FIXTURES, "maya_saved.ma"))
+    assert binary.keys() == ascii_.keys()
+    for path, camera in ascii_.items():
+        expected, found = camera.filmback, binary[path].filmback
+        assert (found.hfa, found.vfa, found.focal_length) == pytest.approx(
+            (expected.hfa, expected.vfa, expected.focal_length))
+        assert found.focal_curves == expected.focal_curves
+        assert binary[path].startup == camera.startup
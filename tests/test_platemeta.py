@@ -0,0 +1,37 @@
+import os
+import struct
+
+import pytest
+
+from cameraApertureFix import platemeta
+
+
+def exr_attribute(name, attr_type, value, size=None):
+    return (name.encode() + b"\0" + attr_type.encode() + b"\0"
+            + struct.pack("<i", len(value) if size is None else size) + value)
+
+
+def test_negative_exr_attribute_size_is_rejected(tmp_path):
+    path = tmp_path / "plate.1001.exr"
+    path.write_bytes(platemeta.EXR_MAGIC + struct.pack("<i", 2)
+                     + exr_attribute("cameraModel", "string", b"ALEXA", size=-13) + b"\0" * 64)
+    with pytest.raises(ValueError, match="invalid EXR attribute size"):
+        platemeta.read_header(str(path))
+
+
+def test_find_sequence_lists_the_directory_again_only_when_it_changes(tmp_path, monkeypatch):
+    platemeta.clear_cache()
+    for frame in (1001, 1002):
+        (tmp_path / f"plate.{frame}.exr").write_bytes(b"")
+    first = str(tmp_path / "plate.1001.exr")
+    listings = []
+    listdir = os.listdir
+    monkeypatch.setattr(platemeta.os, "listdir", lambda directory: listings.append(directory) or listdir(directory))
+    assert len(platemeta.find_sequence(first)) == 2
+    assert len(platemeta.find_sequence(first)) == 2
+    assert len(listings) == 1
+
+    (tmp_path / "plate.1003.exr").write_bytes(b"")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1))
+    assert platemeta.find_sequence(first)[-1].endswith("plate.1003.exr")
+    assert len(listings) == 2
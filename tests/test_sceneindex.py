@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from cameraApertureFix import sceneindex
+from cameraApertureFix.catalog import reload_catalog
+
+
+def camera_scene(name, hfa_mm, vfa_mm):
+    return (f'createNode transform -n "{name}";\n'
+            f'createNode camera -n "{name}Shape" -p "{name}";\n'
+            f'\tsetAttr ".cap" -type "double2" {hfa_mm / 25.4} {vfa_mm / 25.4} ;\n')
+
+
+@pytest.fixture
+def index(tmp_path):
+    reload_catalog(paths=[])
+    shots = tmp_path / "shots"
+    shots.mkdir()
+    (shots / "full_frame.ma").write_text(camera_scene("ffCam", 36.0, 24.0))
+    (shots / "alexa.ma").write_text(camera_scene("alexaCam", 23.76, 13.365))
+    (shots / "odd.ma").write_text(camera_scene("oddCam", 30.0, 20.0))
+    with sceneindex.SceneIndex(str(tmp_path / "shots.db")) as scene_index:
+        scene_index.update([str(shots)], processes=1)
+        yield scene_index
+    reload_catalog()
+
+
+@pytest.mark.parametrize("preset", ["Maya (Default Camera)", "Full Frame 35mm (Photography)"])
+def test_presets_of_the_same_size_all_match(index, preset):
+    cameras = index.cameras_using_preset(preset)
+    assert [c.camera for c in cameras] == ["ffCam|ffCamShape"]
+    assert cameras[0].preset == preset and cameras[0].deviation_mm < 1e-9
+
+
+@pytest.mark.parametrize("preset", ["Arri Alexa Mini (16:9)", "Arri Alexa Classic (16:9)"])
+def test_alexa_16_9_presets_match(index, preset):
+    assert [c.camera for c in index.cameras_using_preset(preset)] == ["alexaCam|alexaCamShape"]
+
+
+def test_queries_follow_catalog_changes_without_rescanning(index, tmp_path):
+    assert [c.camera for c in index.mismatched_cameras()] == ["oddCam|oddCamShape"]
+    catalog = tmp_path / "studio.json"
+    catalog.write_text(json.dumps({"Studio Gate": {"horizontal": 30.0, "vertical": 20.0}}))
+    reload_catalog([str(catalog)])
+    assert index.mismatched_cameras() == []
+    assert [c.camera for c in index.cameras_using_preset("Studio Gate")] == ["oddCam|oddCamShape"]
+
+
+def test_unknown_preset_raises(index):
+    with pytest.raises(KeyError):
+        index.cameras_using_preset("No Such Preset")
+
+
+def test_file_deleted_after_listing_is_treated_as_missing(index, tmp_path, monkeypatch):
+    shots = tmp_path / "shots"
+    listed = list(index.find_scenes([str(shots)]))
+    (shots / "odd.ma").unlink()
+    monkeypatch.setattr(index, "find_scenes", lambda paths: iter(listed))
+    stats = index.update([str(shots)], processes=1)
+    assert stats.removed == 1
+    assert index.mismatched_cameras() == []
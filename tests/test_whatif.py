@@ -0,0 +1,31 @@
+import csv
+
+import numpy as np
+import pytest
+
+from cameraApertureFix import engine, whatif
+from cameraApertureFix.catalog import reload_catalog
+
+PRESETS = ["Super 35mm Film"]
+
+
+@pytest.fixture(autouse=True)
+def builtin_catalog():
+    reload_catalog(paths=[])
+    yield
+    reload_catalog()
+
+
+def test_write_csv_per_frame_matrix(tmp_path):
+    focal_length = np.array([[35.0, 40.0, 45.0], [50.0, 50.0, 50.0]])
+    matrix = engine.preset_matrix([1.417, 0.980], [0.945, 0.735], focal_length, PRESETS)
+    path = str(tmp_path / "whatif.csv")
+    assert whatif.write_csv(matrix, ["a", "b"], path) == 2 * 2 * 3
+    with open(path, newline="") as stream:
+        rows = list(csv.DictReader(stream))
+    assert [row["frame"] for row in rows[:3]] == ["0", "1", "2"]
+    assert float(rows[1]["focal_length"]) == pytest.approx(float(matrix.focal_length[0, 0, 0, 1]))
+
+    assert whatif.write_csv(matrix, ["a", "b"], path, frames=[1001, 1002, 1003]) == 12
+    with pytest.raises(ValueError, match="2 frame labels"):
+        whatif.write_csv(matrix, ["a", "b"], path, frames=[1001, 1002])